@@ -0,0 +1,116 @@
+# api_metrics.py
+# Instrumentación de las llamadas a MLB StatsAPI.
+# install() envuelve statsapi.get (que usan también schedule, boxscore_data, lookup_team, etc.)
+# para contar requests y medir su latencia por endpoint, y avisar a listeners registrados.
+
+import threading
+import time
+from collections import defaultdict
+from typing import Callable, Dict, List
+
+import statsapi
+
+_lock = threading.Lock()
+_listeners: List[Callable[[str, float, bool], None]] = []
+_counts: Dict[str, int] = defaultdict(int)
+_errors: Dict[str, int] = defaultdict(int)
+_elapsed: Dict[str, float] = defaultdict(float)
+_original_get = None
+
+
+def install():
+    """Envuelve statsapi.get una sola vez por proceso (llamadas repetidas no hacen nada)."""
+    global _original_get
+    with _lock:
+        if _original_get is not None:
+            return
+        _original_get = statsapi.get
+
+        def instrumented_get(endpoint, params=None, *args, **kwargs):
+            start = time.perf_counter()
+            ok = False
+            try:
+                result = _original_get(endpoint, {} if params is None else params, *args, **kwargs)
+                ok = True
+                return result
+            finally:
+                _record(endpoint, time.perf_counter() - start, ok)
+
+        statsapi.get = instrumented_get
+
+
+def uninstall():
+    """Restaura el statsapi.get original."""
+    global _original_get
+    with _lock:
+        if _original_get is not None:
+            statsapi.get = _original_get
+            _original_get = None
+
+
+def _record(endpoint: str, elapsed_s: float, ok: bool):
+    with _lock:
+        _counts[endpoint] += 1
+        _elapsed[endpoint] += elapsed_s
+        if not ok:
+            _errors[endpoint] += 1
+        listeners = list(_listeners)
+    for listener in listeners:
+        try:
+            listener(endpoint, elapsed_s, ok)
+        except Exception as e:
+            print(f"Error en listener de api_metrics: {e}")
+
+
+def add_listener(listener: Callable[[str, float, bool], None]):
+    """Registra una función listener(endpoint, elapsed_s, ok) que se llama en cada request."""
+    install()
+    with _lock:
+        _listeners.append(listener)
+
+
+def remove_listener(listener: Callable[[str, float, bool], None]):
+    with _lock:
+        if listener in _listeners:
+            _listeners.remove(listener)
+
+
+def snapshot() -> Dict:
+    """Contadores acumulados del proceso: total y por endpoint (requests, errores, segundos)."""
+    with _lock:
+        return {
+            'requests': sum(_counts.values()),
+            'errors': sum(_errors.values()),
+            'elapsed_s': round(sum(_elapsed.values()), 4),
+            'by_endpoint': {
+                endpoint: {'requests': _counts[endpoint], 'errors': _errors[endpoint],
+                           'elapsed_s': round(_elapsed[endpoint], 4)}
+                for endpoint in sorted(_counts)
+            }
+        }
+
+
+def diff(before: Dict, after: Dict) -> Dict:
+    """Diferencia entre dos snapshots (requests hechos entre ambos)."""
+    by_endpoint = {}
+    for endpoint, stats in after['by_endpoint'].items():
+        prev = before['by_endpoint'].get(endpoint, {'requests': 0, 'errors': 0, 'elapsed_s': 0.0})
+        if stats['requests'] != prev['requests']:
+            by_endpoint[endpoint] = {
+                'requests': stats['requests'] - prev['requests'],
+                'errors': stats['errors'] - prev['errors'],
+                'elapsed_s': round(stats['elapsed_s'] - prev['elapsed_s'], 4)
+            }
+    return {
+        'requests': after['requests'] - before['requests'],
+        'errors': after['errors'] - before['errors'],
+        'elapsed_s': round(after['elapsed_s'] - before['elapsed_s'], 4),
+        'by_endpoint': by_endpoint
+    }
+
+
+def reset():
+    with _lock:
+        _counts.clear()
+        _errors.clear()
+        _elapsed.clear()
@@ -0,0 +1,361 @@
+#!/usr/bin/env python3
+"""
+API JSON sin Streamlit para predicciones, optimización DFS y backtests.
+Un proceso de larga vida mantiene el modelo Over/Under cargado (PredictionService, con
+MicroBatcher para agrupar pedidos concurrentes) y el optimizador importado. Los pedidos
+idénticos que llegan a la vez se resuelven una sola vez y el resultado queda en cache.
+
+Uso:
+    python api_server.py --port 8767
+    python benchmarks/api_load_test.py --url http://127.0.0.1:8767
+
+Endpoints:
+    POST /predictions     {"date": "2025-06-20"} o {"games": [...], "include_probabilities": false}
+                          (con home_id, away_id y date por juego, las stats de equipo salen del
+                          team feature store si existe, como en el entrenamiento)
+    POST /optimize        {"players": [...]} o {"date": "2025-06-20", "teams": [...]}
+    POST /optimize/multi  igual que /optimize más {"lineups": 20, "min_unique": 2}
+    POST /backtest        {"start": "2025-04-01", "end": "2025-06-30"}
+    GET  /stats
+    GET  /health
+"""
+
+import argparse
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict, defaultdict, deque
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from prediction_service import DEFAULT_HOST, PredictionService, _clean
+
+DEFAULT_PORT = 8767
+DEFAULT_OPTIMIZER_WORKERS = 4   # procesos CBC simultáneos como máximo
+MAX_LINEUPS = 150
+RESULT_CACHE_SIZE = 256
+RESULT_CACHE_TTL = 300          # segundos; los jugadores de una fecha cambian poco durante el día
+
+
+class ResultCache:
+    """
+    Cache LRU con TTL que además une pedidos concurrentes: si un pedido igual ya se está
+    calculando, los demás esperan ese resultado en vez de repetir el trabajo.
+    """
+
+    def __init__(self, max_entries: int = RESULT_CACHE_SIZE, ttl: float = RESULT_CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: OrderedDict = OrderedDict()
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._counters = {'hits': 0, 'misses': 0, 'coalesced': 0}
+
+    @staticmethod
+    def key(*parts) -> str:
+        return hashlib.sha1(json.dumps(parts, sort_keys=True, default=str).encode()).hexdigest()
+
+    def get_or_compute(self, key: str, compute: Callable[[], Dict]) -> Dict:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and time.time() - entry[0] < self.ttl:
+                self._entries.move_to_end(key)
+                self._counters['hits'] += 1
+                return entry[1]
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = self._inflight[key] = Future()
+                self._counters['misses'] += 1
+            else:
+                self._counters['coalesced'] += 1
+        if not owner:
+            return future.result()
+
+        try:
+            result = compute()
+        except Exception as e:
+            with self._lock:
+                self._inflight.pop(key, None)
+            future.set_exception(e)
+            raise
+        with self._lock:
+            self._entries[key] = (time.time(), result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._inflight.pop(key, None)
+        future.set_result(result)
+        return result
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            counters = dict(self._counters)
+            size = len(self._entries)
+        lookups = counters['hits'] + counters['misses'] + counters['coalesced']
+        return {**counters, 'entries': size,
+                'hit_rate': round((counters['hits'] + counters['coalesced']) / lookups, 3) if lookups else None}
+
+
+def run_backtest(model, start: Optional[str] = None, end: Optional[str] = None, chunksize: int = 5000) -> Dict:
+    """
+    Evalúa el modelo sobre los juegos finalizados del almacén (over_under_games) entre start y end.
+    Reporta MAE, RMSE y sesgo contra el total real; si el histórico del dashboard tiene la línea
+    oficial del juego, también la tasa de acierto over/under (mismo criterio que compute_accuracy).
+    Ojo: fechas dentro de la ventana de entrenamiento del modelo dan métricas optimistas.
+    """
+    from data_manager.over_under_results import get_results
+    from data_manager.over_under_store import iter_games
+
+    frames = []
+    for chunk in iter_games(start, end, chunksize):
+        predictions = model.predict_over_under(chunk)
+        frames.append(pd.DataFrame({
+            'game_id': chunk['game_id'].to_numpy(),
+            'date': chunk['date'].to_numpy(),
+            'total_runs': chunk['total_runs'].to_numpy(dtype=float),
+            'linea_predicha': pd.to_numeric(pd.Series([p['linea_predicha'] for p in predictions], dtype=object),
+                                            errors='coerce').to_numpy(dtype=float)
+        }))
+    if not frames:
+        return {'games': 0, 'model_version': model.version, 'start': start, 'end': end}
+    df = pd.concat(frames, ignore_index=True)
+    df = df[np.isfinite(df['linea_predicha'])]
+
+    try:
+        official = get_results(start, end)
+        lines = dict(zip(official['game_id'], official['linea_oficial']))
+    except Exception:
+        # Sin tabla de histórico todavía: solo métricas de error
+        lines = {}
+    df['linea_oficial'] = pd.to_numeric(df['game_id'].map(lines), errors='coerce')
+
+    error = df['linea_predicha'] - df['total_runs']
+    graded = df['linea_oficial'].notna()
+    hits = (((df['total_runs'] > df['linea_oficial']) & (df['linea_predicha'] > df['linea_oficial']))
+            | ((df['total_runs'] < df['linea_oficial']) & (df['linea_predicha'] < df['linea_oficial'])))
+    daily = (df.assign(abs_error=error.abs()).groupby('date')
+             .agg(games=('game_id', 'size'), mae=('abs_error', 'mean')).reset_index())
+    return _clean({
+        'model_version': model.version,
+        'start': start or (df['date'].min() if len(df) else None),
+        'end': end or (df['date'].max() if len(df) else None),
+        'games': int(len(df)),
+        'mae': round(float(error.abs().mean()), 4) if len(df) else None,
+        'rmse': round(float(np.sqrt((error ** 2).mean())), 4) if len(df) else None,
+        'bias': round(float(error.mean()), 4) if len(df) else None,
+        'graded_games': int(graded.sum()),
+        'accuracy': round(float(hits[graded].mean()), 4) if graded.any() else None,
+        'daily': daily.round(4).to_dict('records')
+    })
+
+
+class ApiService:
+    """Modelo y optimizador en memoria, con batching de predicciones y cache de resultados."""
+
+    def __init__(self, max_batch: int = 256, max_wait_ms: float = 5.0,
+                 optimizer_workers: int = DEFAULT_OPTIMIZER_WORKERS):
+        # Modelo cargado una vez y pedidos concurrentes agrupados por el MicroBatcher
+        self.predictions = PredictionService(max_batch, max_wait_ms)
+        # Importar pulp y el optimizador al arrancar, no en el primer pedido
+        from dfs_optimizer.optimize_lineup import optimize_multiple_lineups
+        self._optimize_multiple = optimize_multiple_lineups
+        self._optimizer_slots = threading.BoundedSemaphore(optimizer_workers)
+        self.optimizations = ResultCache()
+        self.backtests = ResultCache(max_entries=32, ttl=3600)
+        self._latencies: Dict[str, deque] = defaultdict(lambda: deque(maxlen=1000))
+        self._errors: Dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+        self._started_at = time.time()
+
+    # --- predicciones -------------------------------------------------------------------
+    def slate_predictions(self, fecha: str) -> Dict:
+        """Predicciones del slate de una fecha (bundle compartido por fecha, ver slate_bundle)."""
+        from slate_bundle import get_slate_bundle
+        bundle = get_slate_bundle(fecha)
+        return _clean({'date': fecha, 'juegos': bundle['juegos'], 'predictions': bundle['predictions'],
+                       'timings': bundle['timings']})
+
+    def predict(self, body: Dict) -> Dict:
+        if body.get('date'):
+            return self.slate_predictions(str(body['date']))
+        games = body.get('games')
+        if not isinstance(games, list):
+            raise ValueError("Se requiere 'date' o una lista 'games'")
+        return {'predictions': self.predictions.predict(games, bool(body.get('include_probabilities')))}
+
+    # --- optimización -------------------------------------------------------------------
+    @staticmethod
+    def _players(body: Dict) -> List[Dict]:
+        players = body.get('players')
+        if players is None and body.get('date'):
+            from data_manager.query import get_players_by_date
+            players = get_players_by_date(str(body['date']))
+            teams = set(body.get('teams') or [])
+            if teams:
+                players = [p for p in players if p.get('team') in teams]
+        if not isinstance(players, list):
+            raise ValueError("Se requiere 'players' o 'date'")
+        invalid = [p.get('name') for p in players
+                   if not isinstance(p.get('salary'), (int, float)) or not isinstance(p.get('fppg'), (int, float))]
+        if invalid:
+            raise ValueError(f"Jugadores sin salary/fppg numéricos: {invalid[:10]}")
+        return players
+
+    def optimize(self, body: Dict, n_lineups: int = 1, min_unique: int = 1) -> Dict:
+        from run_daily_optimizer import MIN_PLAYERS_REQUIRED
+
+        players = self._players(body)
+        if len(players) < MIN_PLAYERS_REQUIRED:
+            raise ValueError(f"Se requieren al menos {MIN_PLAYERS_REQUIRED} jugadores, llegaron {len(players)}")
+        if not 1 <= n_lineups <= MAX_LINEUPS:
+            raise ValueError(f"lineups debe estar entre 1 y {MAX_LINEUPS}")
+
+        def solve():
+            with self._optimizer_slots:
+                start = time.perf_counter()
+                lineups = self._optimize_multiple(players, n_lineups, min_unique)
+                return _clean({'lineups': lineups, 'solve_s': round(time.perf_counter() - start, 4),
+                               'players': len(players)})
+
+        key = ResultCache.key('optimize', players, n_lineups, min_unique)
+        return self.optimizations.get_or_compute(key, solve)
+
+    def optimize_single(self, body: Dict) -> Dict:
+        result = self.optimize(body)
+        if not result['lineups']:
+            return {'status': 'error', 'message': "No se encontró una solución factible."}
+        return dict(result['lineups'][0], solve_s=result['solve_s'])
+
+    def optimize_multi(self, body: Dict) -> Dict:
+        return self.optimize(body, int(body.get('lineups', 20)), int(body.get('min_unique', 1)))
+
+    # --- backtest -------------------------------------------------------------------------
+    def backtest(self, body: Dict) -> Dict:
+        model = self.predictions._get_model()
+        start, end = body.get('start'), body.get('end')
+        key = ResultCache.key('backtest', start, end, model.version)
+        return self.backtests.get_or_compute(key, lambda: run_backtest(model, start, end))
+
+    # --- métricas -------------------------------------------------------------------------
+    def record(self, route: str, elapsed_s: float, ok: bool):
+        with self._lock:
+            self._latencies[route].append(elapsed_s * 1000)
+            if not ok:
+                self._errors[route] += 1
+
+    def stats(self) -> Dict:
+        with self._lock:
+            latencies = {route: np.array(values) for route, values in self._latencies.items()}
+            errors = dict(self._errors)
+        routes = {
+            route: {
+                'requests': int(len(values)),
+                'errors': errors.get(route, 0),
+                'latency_ms_p50': round(float(np.percentile(values, 50)), 2),
+                'latency_ms_p95': round(float(np.percentile(values, 95)), 2),
+                'latency_ms_p99': round(float(np.percentile(values, 99)), 2)
+            }
+            for route, values in latencies.items() if len(values)
+        }
+        return _clean({
+            'uptime_s': round(time.time() - self._started_at, 1),
+            'model': self.predictions.stats(),
+            'optimizations': self.optimizations.stats(),
+            'backtests': self.backtests.stats(),
+            'routes': routes
+        })
+
+    def close(self):
+        self.predictions.close()
+
+
+def make_server(service: ApiService, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT) -> ThreadingHTTPServer:
+    post_routes = {
+        '/predictions': service.predict,
+        '/optimize': service.optimize_single,
+        '/optimize/multi': service.optimize_multi,
+        '/backtest': service.backtest
+    }
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def _send(self, status: int, payload: Dict):
+            body = json.dumps(payload, default=str).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path == '/health':
+                self._send(200, {'status': 'ok', 'model_version': service.predictions.model.version})
+            elif self.path == '/stats':
+                self._send(200, service.stats())
+            else:
+                self._send(404, {'error': f"Ruta no soportada: {self.path}"})
+
+        def do_POST(self):
+            handler = post_routes.get(self.path)
+            if handler is None:
+                self._send(404, {'error': f"Ruta no soportada: {self.path}"})
+                return
+            start = time.perf_counter()
+            ok = False
+            try:
+                length = int(self.headers.get('Content-Length', 0))
+                body = json.loads(self.rfile.read(length) or b'{}')
+                payload = handler(body)
+                ok = True
+                self._send(200, payload)
+            except (ValueError, json.JSONDecodeError) as e:
+                self._send(400, {'error': str(e)})
+            except Exception as e:
+                self._send(500, {'error': str(e)})
+            finally:
+                service.record(self.path, time.perf_counter() - start, ok)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    return server
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="API JSON de predicciones, optimización y backtests")
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--max-batch', type=int, default=256)
+    parser.add_argument('--max-wait-ms', type=float, default=5.0)
+    parser.add_argument('--optimizer-workers', type=int, default=DEFAULT_OPTIMIZER_WORKERS)
+    args = parser.parse_args(argv)
+
+    service = ApiService(args.max_batch, args.max_wait_ms, args.optimizer_workers)
+    server = make_server(service, args.host, args.port)
+    print(f"API escuchando en http://{args.host}:{args.port} "
+          f"(modelo {service.predictions.model.version or 'pickle legacy'})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
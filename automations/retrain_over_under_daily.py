@@ -9,6 +9,8 @@ Puede ser ejecutado manualmente o configurado con crontab.
 import sys
 import os
 import logging
+import argparse
+import json
 from datetime import datetime, timedelta
 import pandas as pd
 
@@ -16,7 +18,8 @@ import pandas as pd
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from mlb_stats_integration import update_daily_player_stats
-from over_under_model import retrain_daily, create_over_under_dataset
+from over_under_model import retrain_daily
+from run_metrics import RunMetrics
 
 # Configurar logging
 logging.basicConfig(
@@ -28,10 +31,14 @@ logging.basicConfig(
     ]
 )
 
-def main():
+def main(profile: bool = False, trace_memory: bool = False):
     """
     Función principal que ejecuta el re-entrenamiento diario.
+    Cada etapa queda medida (tiempo, filas, requests, memoria) en data/run_metrics_*.json;
+    con profile=True además se guarda un .prof de cProfile por etapa en data/profiles/.
     """
+    run = RunMetrics('retrain_over_under', profile=profile, trace_memory=trace_memory)
+    status = 'error'
     try:
         logging.info("Iniciando re-entrenamiento diario del modelo Over/Under")
         
@@ -39,37 +46,29 @@ def main():
         yesterday = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
         logging.info(f"Actualizando stats de jugadores para {yesterday}")
         
-        stats_file = update_daily_player_stats(yesterday)
+        with run.stage('player_stats') as stage:
+            stats_file = update_daily_player_stats(yesterday)
+            stage.rows = len(pd.read_csv(stats_file)) if stats_file else 0
         if stats_file:
             logging.info(f"Stats actualizados guardados en: {stats_file}")
         else:
             logging.warning("No se pudieron actualizar stats de jugadores")
         
-        # 2. Crear dataset Over/Under para el día anterior
-        logging.info(f"Creando dataset Over/Under para {yesterday}")
-        dataset = create_over_under_dataset(yesterday)
-        
-        if not dataset.empty:
-            # Guardar dataset
-            os.makedirs('data', exist_ok=True)
-            dataset_file = f"data/over_under_daily_{yesterday.replace('-', '')}.csv"
-            dataset.to_csv(dataset_file, index=False)
-            logging.info(f"Dataset guardado en: {dataset_file}")
-        else:
-            logging.warning("No se pudo crear dataset Over/Under")
-        
-        # 3. Re-entrenar modelo
-        logging.info("Iniciando re-entrenamiento del modelo")
-        result = retrain_daily()
+        # 2. Agregar los juegos finalizados al almacén y re-entrenar en forma incremental
+        logging.info(f"Re-entrenando modelo Over/Under con datos hasta {yesterday}")
+        result = retrain_daily(yesterday, run_metrics=run)
         
         if result['success']:
-            logging.info(f"Modelo re-entrenado exitosamente")
-            logging.info(f"MAE: {result['mae']:.2f}")
+            logging.info(f"Modelo re-entrenado exitosamente (versión {result['version']}, "
+                         f"{result['update']['mode']}, {result['update']['fit_s']}s)")
+            logging.info(f"Juegos nuevos en el almacén: {result['backfill']['games']}")
+            logging.info(f"Holdout: {result['holdout_games']} juegos")
+            logging.info(f"MAE: {result['mae']:.2f} (baseline {result['baseline_mae']:.2f})")
             logging.info(f"RMSE: {result['rmse']:.2f}")
             
             # Guardar métricas de rendimiento
+            os.makedirs('data', exist_ok=True)
             metrics_file = f"data/model_metrics_{datetime.now().strftime('%Y%m%d')}.json"
-            import json
             with open(metrics_file, 'w') as f:
                 json.dump(result, f, indent=2)
             logging.info(f"Métricas guardadas en: {metrics_file}")
@@ -79,11 +78,18 @@ def main():
             return 1
         
         logging.info("Re-entrenamiento diario completado exitosamente")
+        status = 'ok'
         return 0
         
     except Exception as e:
         logging.error(f"Error crítico en re-entrenamiento diario: {e}")
         return 1
+    finally:
+        run_file = run.save(status)
+        for stage in run.stages:
+            logging.info(f"Etapa {stage['stage']}: {stage['elapsed_s']}s, filas={stage['rows']}, "
+                         f"requests={stage['requests']}, pico RSS del proceso={stage['process_peak_rss_mb']} MB")
+        logging.info(f"Métricas de la corrida guardadas en: {run_file}")
 
 def cleanup_old_files():
     """
@@ -125,11 +131,16 @@ def cleanup_old_files():
         logging.warning(f"Error en limpieza de archivos: {e}")
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Re-entrenamiento diario del modelo Over/Under")
+    parser.add_argument('--profile', action='store_true', help="Guardar un perfil cProfile por etapa")
+    parser.add_argument('--trace-memory', action='store_true', help="Medir pico de memoria con tracemalloc")
+    args = parser.parse_args()
+
     # Ejecutar limpieza
     cleanup_old_files()
     
     # Ejecutar re-entrenamiento
-    exit_code = main()
+    exit_code = main(profile=args.profile, trace_memory=args.trace_memory)
     
     if exit_code == 0:
         print("✅ Re-entrenamiento completado exitosamente")
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Backfill histórico de datos Over/Under.
+Procesa fechas en paralelo, guarda cada fecha terminada en el almacén SQLite junto
+con su checkpoint y, al re-ejecutarse, retoma desde las fechas que faltan.
+
+Uso:
+    python backfill_over_under.py --start 2025-04-01 --end 2025-06-30 --workers 8
+"""
+
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+from data_manager.db import DB_PATH
+from data_manager.over_under_store import (
+    SOURCE_BREF,
+    SOURCE_FEATURE_STORE,
+    get_completed_dates,
+    init_over_under_store,
+    save_date
+)
+from over_under_model import create_over_under_dataset
+
+DEFAULT_WORKERS = 4
+
+
+def date_range(start_date: str, end_date: str) -> List[str]:
+    """Lista de fechas 'YYYY-MM-DD' entre start_date y end_date (inclusive)."""
+    current = datetime.strptime(start_date, '%Y-%m-%d')
+    end = datetime.strptime(end_date, '%Y-%m-%d')
+    fechas = []
+    while current <= end:
+        fechas.append(current.strftime('%Y-%m-%d'))
+        current += timedelta(days=1)
+    return fechas
+
+
+def _process_date(fecha: str, feature_store=None):
+    """Descarga el dataset de una fecha y deja solo los juegos finalizados."""
+    dataset = create_over_under_dataset(fecha, raise_errors=True, feature_store=feature_store)
+    if dataset.empty:
+        return dataset
+    return dataset.dropna(subset=['total_runs'])
+
+
+def run_backfill(start_date: str, end_date: str, workers: int = DEFAULT_WORKERS,
+                 db_path: str = DB_PATH, force: bool = False, feature_store=None) -> Dict:
+    """
+    Ejecuta el backfill para el rango indicado.
+    Las fechas ya completadas se saltan salvo que force=True. Las fechas que fallan
+    no se marcan como completadas, así se reintentan en la siguiente ejecución.
+    Con feature_store (TeamFeatureStore ya construido para el rango) las stats de
+    equipo de cada juego son point-in-time, y las fechas guardadas antes con el snapshot
+    de Baseball Reference se vuelven a procesar.
+    """
+    init_over_under_store(db_path)
+    fechas = date_range(start_date, end_date)
+    feature_source = SOURCE_FEATURE_STORE if feature_store is not None else SOURCE_BREF
+    # Sin store cuenta cualquier fecha ya guardada (no se pisan fechas point-in-time)
+    completed = set() if force else get_completed_dates(db_path, feature_source)
+    # No se marca como completada una fecha que todavía puede tener juegos por terminar
+    today = datetime.now().strftime('%Y-%m-%d')
+    pending = [f for f in fechas if f not in completed and f < today]
+
+    summary = {
+        'dates_total': len(fechas),
+        'dates_skipped': len(fechas) - len(pending),
+        'dates_done': 0,
+        'dates_failed': [],
+        'games': 0,
+        'elapsed_s': 0.0
+    }
+    print(f"Backfill {start_date} -> {end_date}: {len(pending)} fechas pendientes, "
+          f"{summary['dates_skipped']} ya completadas o en curso ({workers} workers)")
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(_process_date, fecha, feature_store): fecha for fecha in pending}
+        for future in as_completed(futures):
+            fecha = futures[future]
+            try:
+                dataset = future.result()
+                # Un solo escritor: el hilo principal guarda cada fecha apenas termina
+                save_date(fecha, dataset, db_path, feature_source)
+                summary['dates_done'] += 1
+                summary['games'] += len(dataset)
+                print(f"  - {fecha}: {len(dataset)} juegos válidos guardados")
+            except Exception as e:
+                summary['dates_failed'].append(fecha)
+                print(f"  - Error procesando {fecha}: {e}")
+
+    summary['elapsed_s'] = round(time.perf_counter() - start, 2)
+    print(f"Backfill terminado: {summary['dates_done']} fechas, {summary['games']} juegos, "
+          f"{len(summary['dates_failed'])} fallidas, {summary['elapsed_s']}s")
+    return summary
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Backfill histórico de datos Over/Under")
+    parser.add_argument('--start', required=True, help="Fecha inicial YYYY-MM-DD")
+    parser.add_argument('--end', required=True, help="Fecha final YYYY-MM-DD")
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS)
+    parser.add_argument('--db', default=DB_PATH, help="Ruta de la base SQLite")
+    parser.add_argument('--force', action='store_true', help="Reprocesar fechas ya completadas")
+    parser.add_argument('--feature-store', default=None,
+                        help="Ruta de un TeamFeatureStore (.npz) para usar stats point-in-time")
+    args = parser.parse_args(argv)
+
+    feature_store = None
+    if args.feature_store:
+        from team_feature_store import TeamFeatureStore
+        feature_store = TeamFeatureStore.load(args.feature_store)
+    summary = run_backfill(args.start, args.end, args.workers, args.db, args.force, feature_store)
+    return 1 if summary['dates_failed'] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
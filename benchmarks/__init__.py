@@ -0,0 +1,2 @@
+# benchmarks/__init__.py
+# Scripts de benchmark para MLB Betting Bot
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Prueba de carga de api_server.py: muchos clientes concurrentes contra /predictions,
+/optimize, /optimize/multi y (opcional) /backtest, con latencias p50/p95/p99 y throughput
+por endpoint. Sin --url levanta el servidor en este mismo proceso en un puerto libre.
+Los juegos y jugadores son sintéticos, así no hace falta la base ni la red.
+
+Uso:
+    python benchmarks/api_load_test.py --clients 16 --requests 200
+    python benchmarks/api_load_test.py --url http://127.0.0.1:8767 --unique-payloads
+    python benchmarks/api_load_test.py --endpoints predictions backtest --backtest-start 2025-04-01
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from benchmarks.over_under_bench import synthetic_season
+
+ENDPOINTS = {
+    'predictions': '/predictions',
+    'optimize': '/optimize',
+    'multi': '/optimize/multi',
+    'backtest': '/backtest'
+}
+DEFAULT_ENDPOINTS = ['predictions', 'optimize', 'multi']
+
+
+def synthetic_players(n: int, seed: int) -> List[Dict]:
+    """n jugadores con salario y FPPG aleatorios (salarios en múltiplos de 100, como FanDuel)."""
+    rng = random.Random(seed)
+    return [{'player_id': seed * 1000 + i, 'name': f"Player {seed}-{i}", 'team': 'HOME' if i % 2 else 'AWAY',
+             'position': 'OF', 'salary': rng.randrange(2000, 12000, 100), 'fppg': round(rng.uniform(4, 16), 2)}
+            for i in range(n)]
+
+
+def build_payloads(endpoints: List[str], n_payloads: int, games_per_request: int, players: int,
+                   lineups: int, backtest_start: str, backtest_end: str) -> Dict[str, List[Dict]]:
+    season = synthetic_season(max(games_per_request * n_payloads, games_per_request), seed=7)
+    season = season.drop(columns=['total_runs'])
+    payloads = {}
+    for name in endpoints:
+        if name == 'predictions':
+            payloads[name] = [{'games': season.iloc[i * games_per_request:(i + 1) * games_per_request]
+                               .to_dict('records'), 'include_probabilities': True} for i in range(n_payloads)]
+        elif name == 'optimize':
+            payloads[name] = [{'players': synthetic_players(players, seed)} for seed in range(n_payloads)]
+        elif name == 'multi':
+            payloads[name] = [{'players': synthetic_players(players, seed), 'lineups': lineups, 'min_unique': 2}
+                              for seed in range(n_payloads)]
+        elif name == 'backtest':
+            payloads[name] = [{'start': backtest_start, 'end': backtest_end}]
+    return payloads
+
+
+def _post(url: str, payload: Dict, timeout: float) -> int:
+    request = urllib.request.Request(url, data=json.dumps(payload).encode(),
+                                     headers={'Content-Type': 'application/json'})
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            response.read()
+            return response.status
+    except urllib.error.HTTPError as e:
+        return e.code
+
+
+def _get(url: str, timeout: float = 10) -> Dict:
+    with urllib.request.urlopen(url, timeout=timeout) as response:
+        return json.loads(response.read())
+
+
+def load_endpoint(base_url: str, name: str, payloads: List[Dict], n_requests: int, clients: int,
+                  timeout: float) -> Dict:
+    """n_requests pedidos a un endpoint desde `clients` hilos, rotando los payloads."""
+    latencies = []
+    statuses = {}
+    lock = threading.Lock()
+    url = base_url + ENDPOINTS[name]
+
+    def one(i: int):
+        start = time.perf_counter()
+        try:
+            status = _post(url, payloads[i % len(payloads)], timeout)
+        except Exception as e:
+            status = type(e).__name__
+        elapsed = (time.perf_counter() - start) * 1000
+        with lock:
+            latencies.append(elapsed)
+            statuses[status] = statuses.get(status, 0) + 1
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        list(pool.map(one, range(n_requests)))
+    wall_s = time.perf_counter() - start
+    values = np.array(latencies)
+    return {
+        'endpoint': ENDPOINTS[name],
+        'requests': n_requests,
+        'clients': clients,
+        'errors': n_requests - statuses.get(200, 0),
+        'statuses': {str(k): v for k, v in statuses.items()},
+        'wall_s': round(wall_s, 3),
+        'requests_per_s': round(n_requests / wall_s, 2) if wall_s > 0 else None,
+        'latency_ms_p50': round(float(np.percentile(values, 50)), 2),
+        'latency_ms_p95': round(float(np.percentile(values, 95)), 2),
+        'latency_ms_p99': round(float(np.percentile(values, 99)), 2),
+        'latency_ms_max': round(float(values.max()), 2)
+    }
+
+
+def run(base_url: str = None, endpoints: List[str] = None, n_requests: int = 200, clients: int = 16,
+        unique_payloads: bool = False, games_per_request: int = 15, players: int = 18, lineups: int = 5,
+        backtest_start: str = None, backtest_end: str = None, timeout: float = 60) -> Dict:
+    endpoints = endpoints or DEFAULT_ENDPOINTS
+    server = service = None
+    if base_url is None:
+        from api_server import ApiService, make_server
+        service = ApiService()
+        server = make_server(service, port=0)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    try:
+        # Con payloads repetidos se mide el camino caliente (cache y pedidos unidos);
+        # con payloads únicos, el costo real del modelo y del solver
+        n_payloads = n_requests if unique_payloads else 4
+        payloads = build_payloads(endpoints, n_payloads, games_per_request, players, lineups,
+                                  backtest_start, backtest_end)
+        results = []
+        for name in endpoints:
+            result = load_endpoint(base_url, name, payloads[name], n_requests, clients, timeout)
+            print(f"  {result['endpoint']}: {result['requests_per_s']} req/s, p50 {result['latency_ms_p50']} ms, "
+                  f"p95 {result['latency_ms_p95']} ms, errores {result['errors']}", file=sys.stderr)
+            results.append(result)
+        server_stats = _get(base_url + '/stats')
+    finally:
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+            service.close()
+
+    return {
+        'benchmark': 'api_load_test',
+        'base_url': base_url,
+        'settings': {'requests': n_requests, 'clients': clients, 'unique_payloads': unique_payloads,
+                     'games_per_request': games_per_request, 'players': players, 'lineups': lineups},
+        'results': results,
+        'server': server_stats
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Prueba de carga de la API JSON")
+    parser.add_argument('--url', default=None, help="API ya corriendo (por defecto se levanta en el proceso)")
+    parser.add_argument('--endpoints', nargs='+', choices=sorted(ENDPOINTS), default=DEFAULT_ENDPOINTS)
+    parser.add_argument('--requests', type=int, default=200, help="Pedidos por endpoint")
+    parser.add_argument('--clients', type=int, default=16, help="Clientes concurrentes")
+    parser.add_argument('--unique-payloads', action='store_true', help="Un payload distinto por pedido (sin cache)")
+    parser.add_argument('--games', type=int, default=15, help="Juegos por pedido de predicción")
+    parser.add_argument('--players', type=int, default=18, help="Jugadores por pedido de optimización")
+    parser.add_argument('--lineups', type=int, default=5, help="Alineaciones por pedido a /optimize/multi")
+    parser.add_argument('--backtest-start', default=None)
+    parser.add_argument('--backtest-end', default=None)
+    parser.add_argument('--timeout', type=float, default=60)
+    parser.add_argument('--json', dest='json_path', default=None, help="Ruta para guardar el reporte")
+    args = parser.parse_args(argv)
+
+    report = run(args.url.rstrip('/') if args.url else None, args.endpoints, args.requests, args.clients,
+                 args.unique_payloads, args.games, args.players, args.lineups,
+                 args.backtest_start, args.backtest_end, args.timeout)
+    print(json.dumps(report, indent=2))
+    if args.json_path:
+        os.makedirs(os.path.dirname(args.json_path) or '.', exist_ok=True)
+        with open(args.json_path, 'w') as f:
+            json.dump(report, f, indent=2)
+    return 0 if all(r['errors'] == 0 for r in report['results']) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
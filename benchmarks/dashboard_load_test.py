@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+"""
+Prueba de carga de la capa de datos del dashboard: muchas sesiones simuladas en paralelo
+contra el stand-in local de MLB StatsAPI, sobre un slate de 15 juegos.
+Cada sesión hace varios renders como los de dashboard/app.py (juegos del día, slate con
+predicciones, clima, rosters de un juego y grilla DFS) y optimiza una alineación cada
+--optimize-every renders. Reporta latencias p50/p95/p99 por paso y por render, throughput,
+hit rate de cada loader cacheado (vía dashboard_profiler), requests que llegaron al stand-in
+y crecimiento de memoria entre rondas (tracemalloc).
+
+La base SQLite es temporal (o la de --db), así la corrida no escribe estadios ni snapshots
+sintéticos en la base real. Con --with-refresher se escriben antes los snapshots del
+refresher y el dashboard los lee en vez de descargar.
+
+Uso:
+    python benchmarks/dashboard_load_test.py --sessions 24 --renders 5
+    python benchmarks/dashboard_load_test.py --sessions 40 --rounds 3 --latency-ms 120
+    python benchmarks/dashboard_load_test.py --with-refresher --json data/dashboard_load.json
+"""
+
+import argparse
+import contextlib
+import json
+import logging
+import os
+import random
+import resource
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from typing import Dict, List
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from mlb_api import StandInMLBServer, point_statsapi_at
+
+STEPS = ['juegos', 'slate', 'weather', 'rosters', 'grid', 'optimize']
+
+
+def use_database(db_path: str):
+    """
+    Apunta data_manager a db_path. Debe llamarse antes de importar dashboard.app: los módulos
+    con db_path=DB_PATH por defecto lo toman al importarse, query/results/insert/venues al llamar.
+    """
+    import data_manager.db
+    data_manager.db.DB_PATH = db_path
+    for name in ('query', 'results', 'insert', 'venues'):
+        module = __import__(f'data_manager.{name}', fromlist=['DB_PATH'])
+        module.DB_PATH = db_path
+
+
+def _quiet_streamlit():
+    # Sin runtime de Streamlit, cada st.* avisa que falta el ScriptRunContext
+    for name in list(logging.root.manager.loggerDict):
+        if name.startswith('streamlit'):
+            logging.getLogger(name).setLevel(logging.ERROR)
+
+
+def _roster_dicts(jugadores: List[Dict], team_name: str) -> List[Dict]:
+    """Mismas claves que arma mostrar_roster_por_posiciones, sin dibujar el roster."""
+    return [{
+        'player_id': j.get('person', {}).get('id'),
+        'name': j.get('person', {}).get('fullName', ''),
+        'team': team_name,
+        'position': j.get('position', {}).get('abbreviation', ''),
+        'jersey': j.get('jerseyNumber', '')
+    } for j in jugadores]
+
+
+@contextlib.contextmanager
+def _silenced_stdout():
+    """stdout a /dev/null, también a nivel de descriptor: el solver CBC escribe desde su subproceso."""
+    sys.stdout.flush()
+    saved = os.dup(1)
+    with open(os.devnull, 'w') as devnull:
+        os.dup2(devnull.fileno(), 1)
+        try:
+            with contextlib.redirect_stdout(devnull), warnings.catch_warnings():
+                warnings.simplefilter('ignore', DeprecationWarning)
+                yield
+        finally:
+            os.dup2(saved, 1)
+            os.close(saved)
+
+
+def _fill_grid(grid, seed: int):
+    """Completa salario/FPPG de los bateadores que no están en la base, como haría el usuario."""
+    rng = np.random.default_rng(seed)
+    faltan = grid['salary'] <= 0
+    grid.loc[faltan, 'salary'] = rng.integers(20, 120, faltan.sum()) * 100
+    grid.loc[faltan, 'fppg'] = rng.uniform(4, 16, faltan.sum()).round(2)
+    return grid
+
+
+def _percentiles(values: List[float]) -> Dict:
+    if not values:
+        return {'count': 0}
+    arr = np.array(values)
+    return {
+        'count': len(values),
+        'p50_ms': round(float(np.percentile(arr, 50)), 2),
+        'p95_ms': round(float(np.percentile(arr, 95)), 2),
+        'p99_ms': round(float(np.percentile(arr, 99)), 2),
+        'max_ms': round(float(arr.max()), 2)
+    }
+
+
+class LoadRecorder:
+    """Latencias por paso, errores, perfiles de render y bundles vistos, compartidos entre hilos."""
+
+    def __init__(self):
+        self.steps: Dict[str, List[float]] = {step: [] for step in STEPS}
+        self.renders: List[float] = []
+        self.errors: Dict[str, int] = {}
+        self.loaders: Dict[str, Dict] = {}
+        self.bundle_calls = 0
+        self.bundle_builds = set()
+        self._lock = threading.Lock()
+
+    def step(self, name: str, elapsed_s: float):
+        with self._lock:
+            self.steps[name].append(elapsed_s * 1000)
+
+    def error(self, name: str, e: Exception):
+        key = f"{name}: {type(e).__name__}"
+        with self._lock:
+            self.errors[key] = self.errors.get(key, 0) + 1
+
+    def render(self, profile: Dict, bundle_created_at: float = None):
+        with self._lock:
+            self.renders.append(profile['total_ms'])
+            for name, stats in profile['loaders'].items():
+                total = self.loaders.setdefault(name, {'calls': 0, 'hits': 0, 'misses': 0})
+                for key in total:
+                    total[key] += stats[key]
+            if bundle_created_at is not None:
+                self.bundle_calls += 1
+                self.bundle_builds.add(bundle_created_at)
+
+    def cache_report(self) -> Dict:
+        loaders = {name: dict(stats, hit_rate=round(stats['hits'] / stats['calls'], 4) if stats['calls'] else None)
+                   for name, stats in sorted(self.loaders.items())}
+        builds = len(self.bundle_builds)
+        loaders['slate_bundle'] = {
+            'calls': self.bundle_calls, 'builds': builds,
+            'hit_rate': round(1 - builds / self.bundle_calls, 4) if self.bundle_calls else None
+        }
+        return loaders
+
+
+def run_session(app, session: int, fecha: str, renders: int, optimize_every: int, think_s: float,
+                recorder: LoadRecorder):
+    """Una sesión del dashboard: `renders` reruns del script, eligiendo juego como el selectbox."""
+    from dashboard_profiler import profile_render, section
+
+    rng = random.Random(session)
+    for render in range(renders):
+        bundle = None
+        with profile_render(session_id=f"load-{session}", context={'fecha': fecha, 'render': render}) as profile:
+            def timed_step(name, fn, *args):
+                start = time.perf_counter()
+                try:
+                    with section(name):
+                        return fn(*args)
+                except Exception as e:
+                    recorder.error(name, e)
+                    return None
+                finally:
+                    recorder.step(name, time.perf_counter() - start)
+
+            juegos = timed_step('juegos', app.obtener_juegos_del_dia, fecha) or []
+            bundle = timed_step('slate', app.cargar_slate, fecha)
+            if juegos:
+                juego = rng.choice(juegos)
+                timed_step('weather', app.obtener_weather_info, juego['game_id'])
+
+                def rosters():
+                    return [jugador for equipo in (juego['home_name'], juego['away_name'])
+                            for jugador in _roster_dicts(app.obtener_roster_estructurado(equipo, fecha), equipo)]
+
+                roster = timed_step('rosters', rosters) or []
+                grid = timed_step('grid', lambda: app.build_player_grid(roster, app.obtener_jugadores_base(fecha)))
+                if grid is not None and not grid.empty and render % optimize_every == optimize_every - 1:
+                    def optimize():
+                        jugadores, errores = app.validate_player_grid(_fill_grid(grid, session * 100 + render),
+                                                                      app.MIN_PLAYERS_REQUIRED)
+                        if errores:
+                            raise ValueError(errores[0])
+                        resultado = app.run_optimizer(players_data=jugadores)
+                        if resultado.get('status') != 'success':
+                            raise RuntimeError(resultado.get('message', resultado.get('status')))
+                        return resultado
+
+                    timed_step('optimize', optimize)
+        recorder.render(profile.to_dict(), bundle.get('created_at') if bundle else None)
+        if think_s:
+            time.sleep(think_s)
+
+
+def _memory_point(label: str) -> Dict:
+    current, peak = tracemalloc.get_traced_memory() if tracemalloc.is_tracing() else (None, None)
+    return {
+        'label': label,
+        'traced_mb': round(current / 2 ** 20, 2) if current is not None else None,
+        'traced_peak_mb': round(peak / 2 ** 20, 2) if peak is not None else None,
+        'max_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 2)
+    }
+
+
+def run(fecha: str = None, sessions: int = 24, renders: int = 5, rounds: int = 2, games: int = 15,
+        latency_ms: float = 80.0, optimize_every: int = 5, think_ms: float = 0.0, with_refresher: bool = False,
+        db_path: str = None, track_memory: bool = True, top_allocations: int = 5) -> Dict:
+    fecha = fecha or date.today().strftime('%Y-%m-%d')
+    tmp_dir = None
+    if db_path is None:
+        tmp_dir = tempfile.TemporaryDirectory(prefix='dashboard_load_')
+        db_path = os.path.join(tmp_dir.name, 'mlb_data.db')
+    use_database(db_path)
+
+    import api_metrics
+    api_metrics.install()
+    import streamlit
+    _quiet_streamlit()
+    from dashboard import app
+    _quiet_streamlit()
+    from refresher import refresh_date
+    from data_manager.snapshots import init_snapshot_store
+
+    server = StandInMLBServer(games_per_day=games, latency_ms=latency_ms).start()
+    restore = point_statsapi_at(server.base_url)
+    recorder = LoadRecorder()
+    memory = []
+    round_stats = []
+    try:
+        app.invalidar_caches()
+        if with_refresher:
+            init_snapshot_store(db_path)
+            with contextlib.redirect_stdout(sys.stderr):
+                refresh_date(fecha, db_path)
+        server.request_counts.clear()
+        api_before = api_metrics.snapshot()
+
+        if track_memory:
+            tracemalloc.start()
+        memory.append(_memory_point('inicio'))
+        baseline = tracemalloc.take_snapshot() if track_memory else None
+        warm = None
+
+        # La salida del optimizador y del slate va a /dev/null; el progreso, a stderr
+        with _silenced_stdout():
+            for r in range(rounds):
+                start = time.perf_counter()
+                renders_before = len(recorder.renders)
+                with ThreadPoolExecutor(max_workers=sessions) as pool:
+                    futures = [pool.submit(run_session, app, r * sessions + s, fecha, renders, optimize_every,
+                                           think_ms / 1000, recorder) for s in range(sessions)]
+                    for future in futures:
+                        future.result()
+                wall_s = time.perf_counter() - start
+                n_renders = len(recorder.renders) - renders_before
+                round_stats.append({'round': r + 1, 'wall_s': round(wall_s, 3), 'renders': n_renders,
+                                    'renders_per_s': round(n_renders / wall_s, 2) if wall_s > 0 else None})
+                memory.append(_memory_point(f"ronda {r + 1}"))
+                if r == 0 and track_memory:
+                    warm = tracemalloc.take_snapshot()
+                print(f"  ronda {r + 1}: {n_renders} renders en {wall_s:.2f}s, "
+                      f"{memory[-1]['traced_mb']} MB trazados", file=sys.stderr)
+
+        top_growth = []
+        if track_memory:
+            final = tracemalloc.take_snapshot().filter_traces([tracemalloc.Filter(False, tracemalloc.__file__)])
+            # Desde el fin de la primera ronda (caches ya llenos): lo que sigue creciendo es sospechoso
+            reference = warm if rounds > 1 else baseline
+            top_growth = [{'where': str(stat.traceback[0]), 'size_diff_kb': round(stat.size_diff / 1024, 1),
+                           'count_diff': stat.count_diff}
+                          for stat in final.compare_to(reference, 'lineno')[:top_allocations]]
+            tracemalloc.stop()
+
+        api_used = api_metrics.diff(api_before, api_metrics.snapshot())
+    finally:
+        restore()
+        server.stop()
+        if tmp_dir is not None:
+            tmp_dir.cleanup()
+
+    total_wall = sum(r['wall_s'] for r in round_stats)
+    traced = [m['traced_mb'] for m in memory if m['traced_mb'] is not None]
+    return {
+        'benchmark': 'dashboard_load_test',
+        'settings': {'fecha': fecha, 'sessions': sessions, 'renders': renders, 'rounds': rounds, 'games': games,
+                     'latency_ms': latency_ms, 'optimize_every': optimize_every, 'think_ms': think_ms,
+                     'with_refresher': with_refresher},
+        'renders': dict(_percentiles(recorder.renders), total=len(recorder.renders),
+                        renders_per_s=round(len(recorder.renders) / total_wall, 2) if total_wall else None),
+        'steps': {name: _percentiles(values) for name, values in recorder.steps.items()},
+        'rounds': round_stats,
+        'errors': recorder.errors,
+        'cache': recorder.cache_report(),
+        'upstream': {'requests': api_used['requests'], 'by_route': dict(server.request_counts),
+                     'requests_per_render': round(api_used['requests'] / len(recorder.renders), 3)
+                     if recorder.renders else None},
+        'memory': {
+            'points': memory,
+            'growth_mb': round(traced[-1] - traced[0], 2) if traced else None,
+            'growth_after_warmup_mb': round(traced[-1] - traced[1], 2) if len(traced) > 2 else None,
+            'top_growth': top_growth
+        }
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Prueba de carga de la capa de datos del dashboard")
+    parser.add_argument('--date', default=None, help="Fecha del slate (por defecto hoy)")
+    parser.add_argument('--sessions', type=int, default=24, help="Sesiones simultáneas")
+    parser.add_argument('--renders', type=int, default=5, help="Renders por sesión y ronda")
+    parser.add_argument('--rounds', type=int, default=2, help="Rondas (la primera llena los caches)")
+    parser.add_argument('--games', type=int, default=15, help="Juegos del slate en el stand-in")
+    parser.add_argument('--latency-ms', type=float, default=80.0, help="Latencia simulada del stand-in")
+    parser.add_argument('--optimize-every', type=int, default=5, help="Optimizar una vez cada N renders")
+    parser.add_argument('--think-ms', type=float, default=0.0, help="Pausa entre renders de una sesión")
+    parser.add_argument('--with-refresher', action='store_true', help="Servir desde snapshots del refresher")
+    parser.add_argument('--db', default=None, help="Base SQLite a usar (por defecto una temporal)")
+    parser.add_argument('--no-memory', action='store_true', help="Sin tracemalloc (latencias sin su overhead)")
+    parser.add_argument('--json', dest='json_path', default=None, help="Ruta para guardar el reporte")
+    args = parser.parse_args(argv)
+
+    report = run(args.date, args.sessions, args.renders, args.rounds, args.games, args.latency_ms,
+                 max(args.optimize_every, 1), args.think_ms, args.with_refresher, args.db, not args.no_memory)
+    print(json.dumps(report, indent=2))
+    if args.json_path:
+        os.makedirs(os.path.dirname(args.json_path) or '.', exist_ok=True)
+        with open(args.json_path, 'w') as f:
+            json.dump(report, f, indent=2)
+    return 1 if report['errors'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
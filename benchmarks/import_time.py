@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Benchmark de tiempo de importación de los módulos principales.
+Cada import se mide en un intérprete nuevo para reflejar el costo real de un arranque en frío.
+Con --importtime agrega, por módulo, el desglose de `python -X importtime` (los imports
+más caros) y con --budget compara contra benchmarks/startup_budget.json: tiempo máximo por
+módulo y librerías pesadas que no deben cargarse al importarlo. Sale con código 1 si algún
+módulo se pasa del presupuesto.
+
+Uso:
+    python benchmarks/import_time.py
+    python benchmarks/import_time.py --repeat 5 --json data/import_time.json
+    python benchmarks/import_time.py --budget --importtime
+    python benchmarks/import_time.py dashboard.app --importtime --top 25
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+from typing import Dict, List
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_BUDGET = os.path.join(ROOT_DIR, 'benchmarks', 'startup_budget.json')
+
+DEFAULT_MODULES = [
+    'mlb_stats_integration',
+    'over_under_model',
+    'run_daily_optimizer',
+    'data_manager',
+]
+
+# Librerías cuya carga se reporta (y que el presupuesto puede prohibir por módulo)
+HEAVY_MODULES = [
+    'pandas', 'numpy', 'statsapi', 'streamlit', 'plotly', 'plotly.express',
+    'sklearn', 'scipy', 'joblib', 'pulp',
+]
+
+_SNIPPET = (
+    "import sys, time, importlib, json; t = time.perf_counter(); "
+    "importlib.import_module({module!r}); elapsed = time.perf_counter() - t; "
+    "print(json.dumps({{'s': elapsed, 'loaded': [m for m in {heavy!r} if m in sys.modules]}}))"
+)
+
+_IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$')
+
+
+def _run_snippet(module: str, extra_args: List[str] = None) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, *(extra_args or []), '-c', _SNIPPET.format(module=module, heavy=HEAVY_MODULES)],
+        cwd=ROOT_DIR, capture_output=True, text=True
+    )
+
+
+def _error(proc: subprocess.CompletedProcess) -> str:
+    lines = [l for l in proc.stderr.strip().splitlines() if not l.startswith('import time:')]
+    return lines[-1] if lines else 'error desconocido'
+
+
+def measure_import(module: str, repeat: int = 3) -> Dict:
+    """Importa `module` en `repeat` intérpretes nuevos y retorna los tiempos en segundos."""
+    times: List[float] = []
+    loaded: List[str] = []
+    error = None
+    for _ in range(repeat):
+        proc = _run_snippet(module)
+        if proc.returncode != 0:
+            error = _error(proc)
+            break
+        result = json.loads(proc.stdout.strip().splitlines()[-1])
+        times.append(result['s'])
+        loaded = result['loaded']
+    return {
+        'module': module,
+        'runs': len(times),
+        'median_s': round(statistics.median(times), 4) if times else None,
+        'min_s': round(min(times), 4) if times else None,
+        'heavy_loaded': loaded,
+        'error': error,
+    }
+
+
+def parse_importtime(stderr: str) -> List[Dict]:
+    """Líneas de `-X importtime` como dicts: module, self_us, cumulative_us y depth (anidamiento)."""
+    records = []
+    for line in stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            records.append({'module': name, 'self_us': int(self_us), 'cumulative_us': int(cumulative_us),
+                            'depth': (len(indent) - 1) // 2})
+    return records
+
+
+def importtime_breakdown(module: str, top: int = 15) -> Dict:
+    """
+    Corre `python -X importtime -c "import module"` y retorna los imports más caros de su
+    árbol: por tiempo acumulado (imports directos, agrupados por paquete raíz) y por tiempo propio.
+    """
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', f"import {module}"],
+                          cwd=ROOT_DIR, capture_output=True, text=True)
+    if proc.returncode != 0:
+        return {'module': module, 'error': _error(proc)}
+    records = parse_importtime(proc.stderr)
+    # La salida está en post-orden: el árbol del módulo son las líneas anidadas justo antes de la suya
+    end = next((i for i in range(len(records) - 1, -1, -1)
+                if records[i]['module'] == module and records[i]['depth'] == 0), None)
+    if end is None:
+        return {'module': module, 'error': 'sin datos de -X importtime'}
+    start = end
+    while start > 0 and records[start - 1]['depth'] > 0:
+        start -= 1
+    target, tree = records[end], records[start:end]
+    roots: Dict[str, int] = {}
+    for r in tree:
+        if r['depth'] == 1:
+            root = r['module'].split('.')[0]
+            roots[root] = roots.get(root, 0) + r['cumulative_us']
+    by_self = sorted(tree + [target], key=lambda r: r['self_us'], reverse=True)[:top]
+    return {
+        'module': module,
+        'total_ms': round(target['cumulative_us'] / 1000, 2),
+        'modules_imported': len(tree) + 1,
+        'top_cumulative_ms': [{'module': name, 'ms': round(us / 1000, 2)}
+                              for name, us in sorted(roots.items(), key=lambda kv: kv[1], reverse=True)[:top]],
+        'top_self_ms': [{'module': r['module'], 'ms': round(r['self_us'] / 1000, 2)} for r in by_self],
+        'error': None,
+    }
+
+
+def load_budget(path: str = DEFAULT_BUDGET) -> Dict:
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def check_budget(results: List[Dict], budget: Dict) -> List[str]:
+    """Violaciones del presupuesto: tiempo por encima de max_s o librerías prohibidas cargadas."""
+    violations = []
+    by_module = {r['module']: r for r in results}
+    for module, limits in budget.get('modules', {}).items():
+        result = by_module.get(module)
+        if result is None:
+            continue
+        if result['error']:
+            violations.append(f"{module}: no se pudo importar ({result['error']})")
+            continue
+        max_s = limits.get('max_s')
+        if max_s is not None and result['median_s'] > max_s:
+            violations.append(f"{module}: {result['median_s']:.3f}s > presupuesto {max_s:.3f}s")
+        forbidden = sorted(set(limits.get('forbidden', [])) & set(result['heavy_loaded']))
+        if forbidden:
+            violations.append(f"{module}: carga {', '.join(forbidden)} al importarse")
+    return violations
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark de tiempo de importación")
+    parser.add_argument('modules', nargs='*', default=None,
+                        help="Módulos a medir (por defecto, los del presupuesto o DEFAULT_MODULES)")
+    parser.add_argument('--repeat', type=int, default=None, help="Intérpretes por módulo (por defecto 3)")
+    parser.add_argument('--importtime', action='store_true', help="Desglose con python -X importtime")
+    parser.add_argument('--top', type=int, default=10, help="Imports más caros a mostrar por módulo")
+    parser.add_argument('--budget', nargs='?', const=DEFAULT_BUDGET, default=None,
+                        help="Verificar contra un presupuesto JSON (por defecto benchmarks/startup_budget.json)")
+    parser.add_argument('--json', dest='json_path', default=None, help="Ruta para guardar el reporte")
+    args = parser.parse_args(argv)
+
+    budget = load_budget(args.budget) if args.budget else None
+    modules = args.modules or (list(budget['modules']) if budget else DEFAULT_MODULES)
+    repeat = args.repeat or (budget or {}).get('repeat', 3)
+
+    results = [measure_import(m, repeat) for m in modules]
+
+    print(f"{'Módulo':<40} {'mediana (s)':>12} {'mín (s)':>10}  librerías pesadas")
+    for r in results:
+        if r['error']:
+            print(f"{r['module']:<40} ERROR: {r['error']}")
+        else:
+            limit = (budget or {}).get('modules', {}).get(r['module'], {}).get('max_s')
+            limit_str = f" / {limit:.2f}" if limit is not None else ""
+            print(f"{r['module']:<40} {r['median_s']:>12.4f} {r['min_s']:>10.4f}  "
+                  f"{', '.join(r['heavy_loaded']) or '-'}{'  (presupuesto' + limit_str + 's)' if limit_str else ''}")
+
+    breakdowns = []
+    if args.importtime:
+        for module in modules:
+            breakdown = importtime_breakdown(module, args.top)
+            breakdowns.append(breakdown)
+            if breakdown['error']:
+                continue
+            print(f"\n{module}: {breakdown['total_ms']} ms, {breakdown['modules_imported']} módulos")
+            for item in breakdown['top_cumulative_ms']:
+                print(f"    {item['module']:<36} {item['ms']:>10.2f} ms")
+
+    violations = check_budget(results, budget) if budget else []
+    if budget:
+        print()
+        if violations:
+            print("❌ Fuera de presupuesto:")
+            for v in violations:
+                print(f"  - {v}")
+        else:
+            print("✅ Dentro del presupuesto de arranque")
+
+    if args.json_path:
+        os.makedirs(os.path.dirname(args.json_path) or '.', exist_ok=True)
+        with open(args.json_path, 'w') as f:
+            json.dump({'python': sys.version.split()[0], 'results': results, 'importtime': breakdowns,
+                       'budget': args.budget, 'violations': violations}, f, indent=2)
+        print(f"Reporte guardado en: {args.json_path}")
+
+    return 1 if violations or any(r['error'] for r in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Benchmark del modelo Over/Under sobre temporadas sintéticas.
+Genera juegos con el esquema de OverUnderModel.feature_columns y mide, para cada
+combinación de tamaño de datos y de hiperparámetros (n_estimators, max_depth, n_jobs):
+entrenamiento (fit_over_under_model), predicción juego por juego vs slate completo,
+cálculo de confianza por árbol y tamaño del modelo. El reporte es JSON.
+No usa la red ni el registro real: el clima viene en la temporada sintética y el
+modelo se guarda en un registro temporal.
+
+Uso:
+    python benchmarks/over_under_bench.py
+    python benchmarks/over_under_bench.py --rows 5000 50000 200000 --n-estimators 100 300 \\
+        --max-depth 10 None --n-jobs 1 -1 --json data/over_under_bench.json
+"""
+
+import argparse
+import json
+import os
+import pickle
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+from model_registry import process_rss_mb
+from over_under_model import OverUnderModel
+
+GAMES_PER_DAY = 15
+DEFAULT_ROWS = [5000, 50000]
+DEFAULT_N_ESTIMATORS = [50, 100, 200]
+DEFAULT_MAX_DEPTH = [10, None]
+DEFAULT_N_JOBS = [1, -1]
+
+
+def synthetic_season(n_rows: int, seed: int = 42, start_date: str = '2025-03-27') -> pd.DataFrame:
+    """
+    Temporada sintética de n_rows juegos (GAMES_PER_DAY por fecha) con las columnas de
+    OverUnderModel.feature_columns, más game_id, date, over_under y total_runs.
+    El total de carreras sale de una Poisson cuya media depende de ofensiva, pitcheo y clima.
+    """
+    rng = np.random.default_rng(seed)
+    start = datetime.strptime(start_date, '%Y-%m-%d')
+    day = np.arange(n_rows) // GAMES_PER_DAY
+    df = pd.DataFrame({
+        'game_id': 700000 + np.arange(n_rows),
+        'home_team': 'Home',
+        'away_team': 'Away',
+        'home_avg_runs': rng.uniform(3.0, 6.0, n_rows),
+        'away_avg_runs': rng.uniform(3.0, 6.0, n_rows),
+        'home_era': rng.uniform(2.8, 5.5, n_rows),
+        'away_era': rng.uniform(2.8, 5.5, n_rows),
+        'home_whip': rng.uniform(1.0, 1.5, n_rows),
+        'away_whip': rng.uniform(1.0, 1.5, n_rows),
+        'temp_celsius': rng.uniform(8.0, 36.0, n_rows),
+        'wind_kph': rng.uniform(0.0, 30.0, n_rows),
+        'is_dome': (rng.random(n_rows) < 0.25).astype(int)
+    })
+    dates = np.array([(start + timedelta(days=d)).strftime('%Y-%m-%d') for d in range(int(day[-1]) + 1)])
+    df.insert(1, 'date', dates[day])
+    expected = (
+        0.55 * (df['home_avg_runs'] + df['away_avg_runs'])
+        + 0.9 * (df['home_era'] + df['away_era'] - 8.0)
+        + 2.5 * (df['home_whip'] + df['away_whip'] - 2.6)
+        + 0.04 * (df['temp_celsius'] - 20.0) * (1 - df['is_dome'])
+        + 3.5
+    ).clip(lower=2.0)
+    df['total_runs'] = rng.poisson(expected)
+    df['over_under'] = (np.round(expected * 2) / 2).clip(6.5, 11.5)
+    return df
+
+
+def weather_table(df: pd.DataFrame) -> pd.DataFrame:
+    """Tabla de clima indexada por game_id, en el formato de get_weather_table."""
+    return df.set_index('game_id')[OverUnderModel.WEATHER_COLUMNS]
+
+
+def _timed(fn, repeat: int = 1) -> float:
+    """Mediana en segundos de `repeat` ejecuciones de fn()."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def bench_config(train_df: pd.DataFrame, slate_df: pd.DataFrame, batch_df: pd.DataFrame,
+                 params: Dict, registry_dir: str, single_games: int = 50, repeat: int = 3) -> Dict:
+    """Entrena un modelo con params sobre train_df y mide entrenamiento, predicción y confianza."""
+    model = OverUnderModel(model_path=os.path.join(registry_dir, 'none.pkl'),
+                           registry_dir=registry_dir, model_params=params)
+    rss_before = process_rss_mb()
+    start = time.perf_counter()
+    result = model.fit_over_under_model(train_df)
+    fit_s = time.perf_counter() - start
+    if not result['success']:
+        return {'params': params, 'rows': len(train_df), 'error': result.get('error')}
+
+    slate_weather = weather_table(slate_df)
+    batch_weather = weather_table(batch_df)
+    singles = [slate_df.iloc[[i % len(slate_df)]] for i in range(single_games)]
+
+    def predict_singles():
+        for game in singles:
+            model.predict_over_under(game, slate_weather)
+
+    single_s = _timed(predict_singles, repeat)
+    slate_s = _timed(lambda: model.predict_over_under(slate_df, slate_weather), repeat)
+    batch_s = _timed(lambda: model.predict_over_under(batch_df, batch_weather), repeat)
+    batch_probs_s = _timed(lambda: model.predict_over_under(batch_df, batch_weather,
+                                                            include_probabilities=True), repeat)
+    features, _ = model.prepare_features_batch(batch_df, batch_weather)
+    confidence_s = _timed(lambda: model._ensemble_stats(features), repeat)
+    sklearn_predict_s = _timed(lambda: model.model.predict(features), repeat)
+    rss_after = process_rss_mb()
+
+    return {
+        'params': {k: params[k] for k in ('n_estimators', 'max_depth', 'n_jobs')},
+        'rows': int(len(train_df)),
+        'fit_s': round(fit_s, 4),
+        'fit_rows_per_s': round(len(train_df) / fit_s, 1) if fit_s > 0 else None,
+        'mae': round(float(result['mae']), 4),
+        'rmse': round(float(result['rmse']), 4),
+        'single_ms_per_game': round(single_s * 1000 / single_games, 4),
+        'slate_games': int(len(slate_df)),
+        'slate_ms': round(slate_s * 1000, 4),
+        'slate_ms_per_game': round(slate_s * 1000 / len(slate_df), 4),
+        'batch_games': int(len(batch_df)),
+        'batch_ms_per_game': round(batch_s * 1000 / len(batch_df), 5),
+        'batch_probabilities_ms_per_game': round(batch_probs_s * 1000 / len(batch_df), 5),
+        'confidence_ms_per_game': round(confidence_s * 1000 / len(batch_df), 5),
+        'sklearn_predict_ms_per_game': round(sklearn_predict_s * 1000 / len(batch_df), 5),
+        'single_vs_batch_speedup': round((single_s / single_games) / (batch_s / len(batch_df)), 1)
+        if batch_s > 0 else None,
+        'n_trees': len(model.model.estimators_),
+        'tree_nodes': int(sum(tree.tree_.node_count for tree in model.model.estimators_)),
+        'model_mb': round(len(pickle.dumps(model.model, protocol=pickle.HIGHEST_PROTOCOL)) / 1024 ** 2, 2),
+        'rss_delta_mb': round(rss_after - rss_before, 1) if None not in (rss_before, rss_after) else None
+    }
+
+
+def run(rows: List[int], n_estimators: List[int], max_depths: List, n_jobs: List[int],
+        slate_size: int = GAMES_PER_DAY, batch_size: int = 1000, single_games: int = 50,
+        repeat: int = 3, seed: int = 42) -> Dict:
+    """Corre el grid completo y retorna el reporte."""
+    import sklearn
+
+    results = []
+    with tempfile.TemporaryDirectory(prefix='over_under_bench_') as registry_dir:
+        for n_rows in rows:
+            season = synthetic_season(n_rows, seed)
+            holdout = synthetic_season(max(slate_size, batch_size), seed + 1)
+            slate_df, batch_df = holdout.iloc[:slate_size], holdout.iloc[:batch_size]
+            for trees in n_estimators:
+                for depth in max_depths:
+                    for jobs in n_jobs:
+                        params = {'n_estimators': trees, 'max_depth': depth, 'n_jobs': jobs}
+                        result = bench_config(season, slate_df, batch_df,
+                                              dict(OverUnderModel.DEFAULT_PARAMS, **params),
+                                              registry_dir, single_games, repeat)
+                        print(f"  rows={n_rows} trees={trees} depth={depth} n_jobs={jobs}: "
+                              f"fit {result.get('fit_s')}s, slate {result.get('slate_ms')}ms, "
+                              f"batch {result.get('batch_ms_per_game')}ms/juego", file=sys.stderr)
+                        results.append(result)
+
+    return {
+        'benchmark': 'over_under',
+        'created_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'machine': {
+            'platform': platform.platform(),
+            'processor': platform.processor() or platform.machine(),
+            'cpu_count': os.cpu_count(),
+            'python': platform.python_version(),
+            'sklearn': sklearn.__version__,
+            'numpy': np.__version__
+        },
+        'settings': {'slate_size': slate_size, 'batch_size': batch_size,
+                     'single_games': single_games, 'repeat': repeat, 'seed': seed},
+        'features': OverUnderModel.FEATURE_COLUMNS,
+        'results': results
+    }
+
+
+def _depth(value: str):
+    return None if value.lower() == 'none' else int(value)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark de entrenamiento e inferencia Over/Under")
+    parser.add_argument('--rows', type=int, nargs='+', default=DEFAULT_ROWS, help="Juegos por temporada sintética")
+    parser.add_argument('--n-estimators', type=int, nargs='+', default=DEFAULT_N_ESTIMATORS)
+    parser.add_argument('--max-depth', type=_depth, nargs='+', default=DEFAULT_MAX_DEPTH, help="Usar None sin límite")
+    parser.add_argument('--n-jobs', type=int, nargs='+', default=DEFAULT_N_JOBS)
+    parser.add_argument('--slate-size', type=int, default=GAMES_PER_DAY)
+    parser.add_argument('--batch-size', type=int, default=1000)
+    parser.add_argument('--single-games', type=int, default=50, help="Juegos predichos uno por uno")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--json', dest='json_path', default=None, help="Ruta para guardar el reporte")
+    args = parser.parse_args(argv)
+
+    report = run(args.rows, args.n_estimators, args.max_depth, args.n_jobs, args.slate_size,
+                 args.batch_size, args.single_games, args.repeat, args.seed)
+
+    print(json.dumps(report, indent=2))
+    if args.json_path:
+        os.makedirs(os.path.dirname(args.json_path) or '.', exist_ok=True)
+        with open(args.json_path, 'w') as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Benchmark de descarga de un slate completo: statsapi síncrono vs cliente asyncio.
+Por defecto corre contra el stand-in local, así funciona sin acceso a la red.
+
+Uso:
+    python benchmarks/slate_fetch.py --games 15 --latency-ms 80 --concurrency 10
+    python benchmarks/slate_fetch.py --live --date 2025-06-26
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import statsapi
+from mlb_api import StandInMLBServer, fetch_slate_sync, point_statsapi_at
+from mlb_api.async_client import MLB_API_BASE_URL
+
+
+def fetch_slate_statsapi(fecha: str) -> int:
+    """Mismo trabajo que fetch_slate, pero request por request con statsapi. Retorna # de requests."""
+    schedule = statsapi.get('schedule', {'sportId': 1, 'date': fecha, 'hydrate': 'weather'})
+    games = [g for day in schedule.get('dates', []) for g in day.get('games', [])]
+    requests_made = 1
+    for game in games:
+        statsapi.get('game_boxscore', {'gamePk': game['gamePk']})
+        requests_made += 1
+    team_ids = sorted({g['teams'][side]['team']['id'] for g in games for side in ('home', 'away')})
+    for team_id in team_ids:
+        statsapi.get('team_roster', {'teamId': team_id, 'rosterType': 'active'})
+        requests_made += 1
+    return requests_made
+
+
+def run(fecha: str, base_url: str, concurrency: int) -> dict:
+    start = time.perf_counter()
+    n_sync = fetch_slate_statsapi(fecha)
+    sync_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    slate = fetch_slate_sync(fecha, base_url=base_url, max_concurrency=concurrency)
+    async_s = time.perf_counter() - start
+
+    return {
+        'date': fecha,
+        'games': len(slate['boxscores']),
+        'requests': n_sync,
+        'sync_s': round(sync_s, 3),
+        'async_s': round(async_s, 3),
+        'speedup': round(sync_s / async_s, 2) if async_s > 0 else None,
+        'concurrency': concurrency,
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark de descarga de slate")
+    parser.add_argument('--date', default='2025-06-26')
+    parser.add_argument('--games', type=int, default=15)
+    parser.add_argument('--latency-ms', type=float, default=80.0, help="Latencia simulada del stand-in")
+    parser.add_argument('--concurrency', type=int, default=10)
+    parser.add_argument('--live', action='store_true', help="Usar la API real en vez del stand-in")
+    parser.add_argument('--json', dest='json_path', default=None)
+    args = parser.parse_args(argv)
+
+    if args.live:
+        result = run(args.date, MLB_API_BASE_URL, args.concurrency)
+    else:
+        with StandInMLBServer(games_per_day=args.games, latency_ms=args.latency_ms) as server:
+            restore = point_statsapi_at(server.base_url)
+            try:
+                result = run(args.date, server.base_url, args.concurrency)
+            finally:
+                restore()
+        result['latency_ms'] = args.latency_ms
+
+    print(json.dumps(result, indent=2))
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump(result, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,167 @@
+# boxscore_parser.py
+# Parser columnar de boxscores MLB.
+# Extrae las líneas de bateo y pitcheo de ambos equipos directamente a arreglos
+# preasignados por juego y concatena todos los juegos en una sola tabla tipada.
+
+import numpy as np
+import pandas as pd
+from typing import Dict, Iterable, List, Tuple
+
+SIDES = ('home', 'away')
+
+# (columna, campo en la API, dtype)
+BATTING_COLUMNS = [
+    ('ab', 'atBats', np.int16),
+    ('h', 'hits', np.int16),
+    ('hr', 'homeRuns', np.int16),
+    ('r', 'runs', np.int16),
+    ('rbi', 'rbi', np.int16),
+    ('bb', 'baseOnBalls', np.int16),
+    ('so', 'strikeOuts', np.int16),
+    ('sb', 'stolenBases', np.int16),
+    ('obp', 'obp', np.float32),
+    ('slg', 'slg', np.float32),
+]
+
+PITCHING_COLUMNS = [
+    ('outs', 'inningsPitched', np.int16),
+    ('h', 'hits', np.int16),
+    ('r', 'runs', np.int16),
+    ('er', 'earnedRuns', np.int16),
+    ('bb', 'baseOnBalls', np.int16),
+    ('so', 'strikeOuts', np.int16),
+    ('hr', 'homeRuns', np.int16),
+    ('pitches', 'numberOfPitches', np.int16),
+]
+
+KINDS = {
+    'batting': BATTING_COLUMNS,
+    'pitching': PITCHING_COLUMNS,
+}
+
+
+def innings_to_outs(value) -> int:
+    """Convierte innings lanzados en formato MLB ('5.2' = 5 innings y 2 outs) a outs."""
+    try:
+        text = str(value)
+        if '.' in text:
+            whole, partial = text.split('.', 1)
+            return int(whole or 0) * 3 + int(partial[:1] or 0)
+        return int(float(text)) * 3
+    except (TypeError, ValueError):
+        return 0
+
+
+def _to_number(value) -> float:
+    """Convierte valores de la API (int, float o strings como '.333') a número."""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _team_name(boxscore: Dict, side: str) -> str:
+    """Nombre del equipo para un lado del boxscore (home/away)."""
+    team_info = boxscore.get('teamInfo', {}).get(side, {})
+    side_data = boxscore.get(side, {})
+    return (
+        team_info.get('name')
+        or side_data.get('team', {}).get('name')
+        or team_info.get('teamName')
+        or side_data.get('team', {}).get('teamName')
+        or side_data.get('teamName', '')
+    )
+
+
+def _parse_game(boxscore: Dict, game_id, fecha: str) -> Dict[str, Dict[str, np.ndarray]]:
+    """
+    Parsea un boxscore a columnas numpy por tipo de línea (batting/pitching).
+    Los arreglos se preasignan con el número de jugadores del juego y se recortan
+    a las filas efectivamente llenadas.
+    """
+    sides = [s for s in SIDES if 'players' in boxscore.get(s, {})]
+    capacity = sum(len(boxscore[s]['players']) for s in sides)
+
+    result = {}
+    for kind, columns in KINDS.items():
+        player_id = np.zeros(capacity, dtype=np.int64)
+        name = np.empty(capacity, dtype=object)
+        team = np.empty(capacity, dtype=object)
+        values = {col: np.zeros(capacity, dtype=dtype) for col, _, dtype in columns}
+        n = 0
+        for side in sides:
+            team_name = _team_name(boxscore, side)
+            for player_data in boxscore[side]['players'].values():
+                line = player_data.get('stats', {}).get(kind)
+                if not line:
+                    continue
+                person = player_data.get('person', {})
+                player_id[n] = person.get('id', 0) or 0
+                name[n] = person.get('fullName', '')
+                team[n] = team_name
+                for col, field, dtype in columns:
+                    if col == 'outs':
+                        values[col][n] = innings_to_outs(line.get(field, 0))
+                    else:
+                        values[col][n] = _to_number(line.get(field, 0))
+                n += 1
+
+        columns_out = {'player_id': player_id[:n], 'name': name[:n], 'team': team[:n]}
+        columns_out.update({col: arr[:n] for col, arr in values.items()})
+        columns_out['game_id'] = np.full(n, int(game_id), dtype=np.int64)
+        columns_out['date'] = np.full(n, fecha, dtype=object)
+        result[kind] = columns_out
+    return result
+
+
+class ColumnarBoxscoreParser:
+    """
+    Acumula boxscores de varios juegos en columnas y los concatena una sola vez
+    en DataFrames tipados (uno para bateo y otro para pitcheo).
+    """
+
+    def __init__(self):
+        self._chunks: Dict[str, List[Dict[str, np.ndarray]]] = {kind: [] for kind in KINDS}
+        self.games_parsed = 0
+
+    def add_game(self, boxscore: Dict, game_id, fecha: str = '') -> Tuple[int, int]:
+        """Agrega un juego. Retorna (filas de bateo, filas de pitcheo) agregadas."""
+        parsed = _parse_game(boxscore, game_id, fecha)
+        for kind, columns in parsed.items():
+            self._chunks[kind].append(columns)
+        self.games_parsed += 1
+        return len(parsed['batting']['player_id']), len(parsed['pitching']['player_id'])
+
+    def to_frames(self) -> Dict[str, pd.DataFrame]:
+        """Concatena todos los juegos en un DataFrame tipado por tipo de línea."""
+        return {kind: _build_frame(self._chunks[kind], columns) for kind, columns in KINDS.items()}
+
+
+def _build_frame(chunks: List[Dict[str, np.ndarray]], columns) -> pd.DataFrame:
+    names = ['player_id', 'name', 'team'] + [col for col, _, _ in columns] + ['game_id', 'date']
+    if chunks:
+        data = {col: np.concatenate([chunk[col] for chunk in chunks]) for col in names}
+    else:
+        data = {col: np.array([], dtype=object) for col in names}
+        data.update({col: np.array([], dtype=dtype) for col, _, dtype in columns})
+        data['player_id'] = np.array([], dtype=np.int64)
+        data['game_id'] = np.array([], dtype=np.int64)
+    df = pd.DataFrame(data, columns=names)
+    for col in ('team', 'date'):
+        df[col] = df[col].astype('category')
+    return df
+
+
+def parse_boxscore(boxscore: Dict, game_id, fecha: str = '') -> Dict[str, pd.DataFrame]:
+    """Parsea un boxscore individual a DataFrames de bateo y pitcheo."""
+    parser = ColumnarBoxscoreParser()
+    parser.add_game(boxscore, game_id, fecha)
+    return parser.to_frames()
+
+
+def parse_boxscores(boxscores: Iterable[Tuple[object, Dict]], fecha: str = '') -> Dict[str, pd.DataFrame]:
+    """Parsea una secuencia de (game_id, boxscore) a una sola tabla por tipo de línea."""
+    parser = ColumnarBoxscoreParser()
+    for game_id, boxscore in boxscores:
+        parser.add_game(boxscore, game_id, fecha)
+    return parser.to_frames()
@@ -6,30 +6,46 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 import streamlit as st
-from streamlit_autorefresh import st_autorefresh
 from datetime import date, datetime, timedelta
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
 import numpy as np
-import json
+import sqlite3
 from typing import Dict, List
 
 # Importaciones locales
+# plotly (pestañas Over/Under y Resultados) y pulp (al optimizar) se importan en su primer uso
 from data_manager.query import get_players_by_date
-from data_manager.results import get_results_by_date
-from dfs_optimizer.optimize_lineup import optimize_lineup
-from analysis.compare_results import compare_lineup_vs_actual
+from dfs_optimizer.player_grid import build_player_grid, validate_player_grid
 from run_daily_optimizer import run_optimizer
 from mlb_stats_integration import (
-    obtener_partidos_con_probabilidades,
-    obtener_alineaciones_confirmadas,
-    obtener_datos_para_optimizacion,
     get_weather_and_stadium,
-    update_daily_player_stats,
-    get_match_real_stats
+    invalidate_bref_table,
+    update_daily_player_stats
+)
+from prediction_service import get_client
+from slate_bundle import bundle_from_payload, get_slate_bundle, invalidate_slate_bundle
+from data_manager.snapshots import latest_snapshot_version, load_snapshot
+from data_manager.over_under_results import (
+    count_results,
+    get_daily_accuracy,
+    get_results,
+    get_summary,
+    import_results_csv,
+    init_over_under_results,
+    upsert_results
+)
+from live_updates import LIVE_POLL_INTERVAL, get_tracker
+from dashboard_profiler import (
+    DEFAULT_LOG_PATH,
+    HISTORY_SIZE,
+    current_profile,
+    log_path_from_env,
+    profile_render,
+    profiled_cache,
+    profiling_enabled_by_env,
+    section,
+    timed
 )
-from over_under_model import over_under_model, create_over_under_dataset
 import statsapi
 
 # Configuración de la página
@@ -40,9 +56,6 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Auto-refresh cada 3 minutos
-st_autorefresh(interval=180000, key="data_refresh")
-
 # CSS personalizado para mejorar la apariencia
 st.markdown("""
 <style>
@@ -141,10 +154,46 @@ st.markdown('''
 MIN_PLAYERS_REQUIRED = 7
 JUGADORES_FILE = "data/manual_jugadores.csv"
 RESULTADOS_FILE = "data/manual_resultados.csv"
-OVER_UNDER_RESULTS_FILE = "data/over_under_results.csv"
+OVER_UNDER_RESULTS_FILE = "data/over_under_results.csv"  # histórico legado, se importa a SQLite
+HISTORICO_MAX_FILAS = 500
+
+# TTLs de los caches compartidos entre sesiones (segundos)
+TTL_JUEGOS = 300        # schedule del día
+TTL_WEATHER = 600       # clima y estadio por juego
+TTL_ROSTER = 1800       # rosters activos
+TTL_TEAM_IDS = 86400    # nombre de equipo -> team_id
+TTL_SERVICIO = 30       # estado del servicio de predicciones (sidebar)
+
+@profiled_cache(st.cache_resource(max_entries=64))
+def leer_snapshot(fecha_str: str, kind: str, version: int):
+    """Snapshot del refresher; una versión nunca cambia, así que se cachea sin TTL y se comparte entre sesiones."""
+    snapshot = load_snapshot(fecha_str, kind, version)
+    if snapshot and kind == 'slate':
+        snapshot['payload'] = bundle_from_payload(snapshot['payload'])
+    return snapshot
+
+def snapshot_actual(fecha_str: str, kind: str):
+    """Último snapshot de (fecha, tipo) escrito por refresher.py, o None si el refresher no corrió."""
+    version = latest_snapshot_version(fecha_str, kind)
+    return leer_snapshot(fecha_str, kind, version) if version else None
+
+@timed()
+def cargar_slate(fecha_str: str) -> Dict:
+    """Slate del día desde el último snapshot; sin refresher, se descarga directo (bundle compartido)."""
+    snapshot = snapshot_actual(fecha_str, 'slate')
+    if snapshot:
+        return dict(snapshot['payload'], snapshot_version=snapshot['version'])
+    return get_slate_bundle(fecha_str)
 
-@st.cache_data(ttl=300)  # Cache por 5 minutos
 def obtener_juegos_del_dia(fecha_str: str) -> List[Dict]:
+    """Juegos del día desde el snapshot del refresher, o desde la API con cache."""
+    snapshot = snapshot_actual(fecha_str, 'slate')
+    if snapshot:
+        return snapshot['payload']['juegos']
+    return descargar_juegos_del_dia(fecha_str)
+
+@profiled_cache(st.cache_data(ttl=TTL_JUEGOS))
+def descargar_juegos_del_dia(fecha_str: str) -> List[Dict]:
     """Obtiene juegos del día con cache."""
     try:
         juegos = statsapi.schedule(date=fecha_str)
@@ -168,7 +217,16 @@ def obtener_juegos_del_dia(fecha_str: str) -> List[Dict]:
         st.error(f"Error obteniendo juegos: {e}")
         return []
 
-@st.cache_data(ttl=600)  # Cache por 10 minutos
+@profiled_cache(st.cache_data(ttl=TTL_JUEGOS))
+def obtener_jugadores_base(fecha_str: str) -> List[Dict]:
+    """Salarios y FPPG cargados en daily_roster para la fecha, en una sola consulta."""
+    try:
+        return get_players_by_date(fecha_str)
+    except sqlite3.OperationalError:
+        # Base sin tabla daily_roster todavía
+        return []
+
+@profiled_cache(st.cache_data(ttl=TTL_WEATHER))
 def obtener_weather_info(game_id: str) -> Dict:
     """Obtiene información del clima y estadio."""
     return get_weather_and_stadium(game_id)
@@ -187,23 +245,59 @@ def mostrar_weather_card(weather_info: Dict):
         </div>
         """, unsafe_allow_html=True)
 
-def obtener_roster_estructurado(team_name: str) -> List[Dict]:
-    """Obtiene roster estructurado de un equipo."""
+@profiled_cache(st.cache_resource(ttl=TTL_TEAM_IDS))
+def obtener_team_ids() -> Dict[str, int]:
+    """Mapa nombre de equipo -> team_id de MLB, resuelto con una sola llamada y compartido entre sesiones."""
+    teams = statsapi.get('teams', {'sportId': 1}).get('teams', [])
+    return {t['name']: t['id'] for t in teams}
+
+def resolver_team_id(team_name: str):
+    """team_id de un equipo desde el mapa cacheado; si no está, usa lookup_team."""
     try:
+        team_id = obtener_team_ids().get(team_name)
+    except Exception as e:
+        print(f"Error obteniendo equipos de MLB: {e}")
+        team_id = None
+    if team_id is None:
         team_info = statsapi.lookup_team(team_name)
-        if not team_info:
+        team_id = team_info[0]['id'] if team_info else None
+    return team_id
+
+@profiled_cache(st.cache_data(ttl=TTL_ROSTER))
+def obtener_roster_activo(team_id: int) -> List[Dict]:
+    """Roster activo de un equipo (compartido entre sesiones durante TTL_ROSTER)."""
+    roster_data = statsapi.get('team_roster', {'teamId': team_id, 'rosterType': 'active'})
+    return roster_data.get('roster', [])
+
+def obtener_roster_estructurado(team_name: str, fecha_str: str = None) -> List[Dict]:
+    """Obtiene roster estructurado de un equipo (del snapshot del refresher si hay uno para la fecha)."""
+    snapshot = snapshot_actual(fecha_str, 'rosters') if fecha_str else None
+    if snapshot and team_name in snapshot['payload']['rosters']:
+        return snapshot['payload']['rosters'][team_name]
+    try:
+        team_id = resolver_team_id(team_name)
+        if team_id is None:
             return []
-        team_id = team_info[0]['id']
-        roster_data = statsapi.get('team_roster', {'teamId': team_id, 'rosterType': 'active'})
-        jugadores = roster_data.get('roster', [])
-        return jugadores
+        return obtener_roster_activo(team_id)
     except Exception as e:
         st.error(f"Error obteniendo roster para {team_name}: {e}")
         return []
 
-def mostrar_roster_por_posiciones(team_name: str) -> List[Dict]:
+@profiled_cache(st.cache_data(ttl=TTL_SERVICIO))
+def estado_servicio() -> Dict:
+    """Stats del servicio de predicciones; si no responde, no carga el modelo en el dashboard."""
+    return get_client().stats(local_fallback=False)
+
+def invalidar_caches():
+    """Descarta todos los caches compartidos: schedule, clima, rosters, equipos, slate y CSV de Baseball Reference."""
+    st.cache_data.clear()
+    st.cache_resource.clear()
+    invalidate_slate_bundle()
+    invalidate_bref_table()
+
+def mostrar_roster_por_posiciones(team_name: str, fecha_str: str = None) -> List[Dict]:
     """Muestra roster organizado por posiciones (pitchers, outfield, infield)."""
-    jugadores = obtener_roster_estructurado(team_name)
+    jugadores = obtener_roster_estructurado(team_name, fecha_str)
     if not jugadores:
         st.warning(f"No hay alineación confirmada para {team_name}.")
         return []
@@ -220,6 +314,7 @@ def mostrar_roster_por_posiciones(team_name: str) -> List[Dict]:
         jersey = jugador.get('jerseyNumber', '')
         
         jugador_data = {
+            'player_id': jugador.get('person', {}).get('id'),
             'name': nombre,
             'team': team_name,
             'position': posicion,
@@ -288,7 +383,7 @@ def mostrar_roster_dashboard(team_name: str) -> List[Dict]:
         })
     return roster_list
 
-def crear_over_under_heatmap(predictions: List[Dict]) -> go.Figure:
+def crear_over_under_heatmap(predictions: List[Dict]) -> 'go.Figure':
     """Crea heatmap para Over/Under predictions."""
     if not predictions:
         return None
@@ -319,6 +414,7 @@ def crear_over_under_heatmap(predictions: List[Dict]) -> go.Figure:
             accuracy.append(0.5)  # Gris
     
     # Crear heatmap
+    import plotly.graph_objects as go
     fig = go.Figure(data=go.Heatmap(
         z=[linea_oficial, linea_predicha, resultado_real],
         x=teams,
@@ -341,44 +437,51 @@ def crear_over_under_heatmap(predictions: List[Dict]) -> go.Figure:
     
     return fig
 
-def guardar_over_under_result(result_data: Dict):
-    """Guarda resultado Over/Under en CSV."""
-    try:
-        df = pd.DataFrame([result_data])
-        if os.path.exists(OVER_UNDER_RESULTS_FILE):
-            df.to_csv(OVER_UNDER_RESULTS_FILE, mode='a', header=False, index=False)
-        else:
-            df.to_csv(OVER_UNDER_RESULTS_FILE, index=False)
-        st.success("Resultado Over/Under guardado exitosamente.")
-    except Exception as e:
-        st.error(f"Error guardando resultado: {e}")
+@profiled_cache(st.cache_resource)
+def preparar_historico_over_under() -> bool:
+    """
+    Crea las tablas del histórico una vez por proceso. Si la tabla está vacía y existe el
+    CSV legado, lo importa (migración única).
+    """
+    init_over_under_results()
+    if count_results() == 0 and os.path.exists(OVER_UNDER_RESULTS_FILE):
+        importados = import_results_csv(OVER_UNDER_RESULTS_FILE)
+        print(f"{importados} resultados Over/Under importados desde {OVER_UNDER_RESULTS_FILE}")
+    return True
 
-def cargar_over_under_historico() -> pd.DataFrame:
-    """Carga histórico de resultados Over/Under."""
+def guardar_over_under_results(resultados: List[Dict]):
+    """Guarda resultados Over/Under (upsert por game_id: volver a guardar un juego lo corrige)."""
     try:
-        if os.path.exists(OVER_UNDER_RESULTS_FILE):
-            return pd.read_csv(OVER_UNDER_RESULTS_FILE)
-        return pd.DataFrame()
+        preparar_historico_over_under()
+        guardados = upsert_results(resultados)
+        st.success(f"{guardados} resultados Over/Under guardados exitosamente.")
     except Exception as e:
-        st.error(f"Error cargando histórico: {e}")
-        return pd.DataFrame()
+        st.error(f"Error guardando resultados: {e}")
 
+@timed()
 def tab_juegos_del_dia(fecha_str: str):
     """Tab para mostrar juegos del día con clima y Over/Under."""
     st.header("🏟️ Juegos del Día")
     
-    juegos = obtener_juegos_del_dia(fecha_str)
+    # Schedule, clima, stats y predicciones de todo el slate (snapshot del refresher o descarga directa)
+    try:
+        bundle = cargar_slate(fecha_str)
+    except Exception as e:
+        st.error(f"Error obteniendo juegos: {e}")
+        return
+    juegos = bundle['juegos']
     if not juegos:
         st.info("No hay juegos para esta fecha.")
         return
+    predictions = bundle['predictions']
+    origen = f"snapshot v{bundle['snapshot_version']}" if bundle.get('snapshot_version') else "descarga directa"
+    st.caption(f"Slate armado en {bundle['timings']['total_s']}s · {origen} · "
+               f"actualizado {datetime.fromtimestamp(bundle['created_at']).strftime('%H:%M:%S')}")
     
-    # Crear dataset para Over/Under predictions
-    juegos_df = pd.DataFrame(juegos)
-    if not juegos_df.empty:
-        # Obtener predicciones Over/Under
-        predictions = over_under_model.predict_over_under(juegos_df)
-    else:
-        predictions = []
+    # Estado en vivo compartido: solo las tarjetas de juegos no finalizados se refrescan solas
+    tracker = get_tracker(fecha_str)
+    tracker.poll()
+    boxscores = obtener_boxscores(fecha_str)
     
     # Mostrar cada juego
     for i, juego in enumerate(juegos):
@@ -386,20 +489,12 @@ def tab_juegos_del_dia(fecha_str: str):
             col1, col2 = st.columns([3, 1])
             
             with col1:
-                st.write(juego)  # DEPURACIÓN: Ver los datos del juego en el dashboard
-                # Mostrar score final si el partido está finalizado
-                score_info = ""
-                if juego['status'] == 'Final' and juego.get('home_score') is not None and juego.get('away_score') is not None:
-                    score_info = f"<p><strong>🏆 Score Final:</strong> {juego['away_name']} {juego['away_score']} - {juego['home_score']} {juego['home_name']}</p>"
-                
-                st.markdown(f"""
-                <div class="metric-card">
-                    <h4>{juego['away_name']} @ {juego['home_name']}</h4>
-                    <p><strong>Estado:</strong> {juego['status']}</p>
-                    <p><strong>Hora:</strong> {juego['game_datetime']}</p>
-                    {score_info}
-                </div>
-                """, unsafe_allow_html=True)
+                estado = tracker.get(juego['game_id'])
+                finalizado = estado['abstract_state'] == 'Final' if estado else juego['status'] == 'Final'
+                if finalizado:
+                    mostrar_tarjeta_juego(juego, estado, boxscores.get(juego['game_id']))
+                else:
+                    tarjeta_juego_en_vivo(fecha_str, juego)
             
             with col2:
                 if i < len(predictions):
@@ -412,11 +507,52 @@ def tab_juegos_del_dia(fecha_str: str):
                         )
             
             # Mostrar clima
-            weather_info = obtener_weather_info(juego['game_id'])
-            mostrar_weather_card(weather_info)
+            mostrar_weather_card(bundle['weather'].get(juego['game_id'], {}))
             
             st.divider()
 
+def obtener_boxscores(fecha_str: str) -> Dict[int, Dict]:
+    """Resumen de bateo por juego del último snapshot del refresher (vacío si no hay)."""
+    snapshot = snapshot_actual(fecha_str, 'boxscores')
+    return {b['game_id']: b for b in snapshot['payload']['boxscores']} if snapshot else {}
+
+def mostrar_tarjeta_juego(juego: Dict, estado: Dict = None, boxscore: Dict = None):
+    """Tarjeta de un juego con estado y marcador; estado (de live_updates) tiene prioridad sobre el schedule."""
+    status = estado['status'] if estado else juego['status']
+    away_score = estado['away_score'] if estado else juego.get('away_score')
+    home_score = estado['home_score'] if estado else juego.get('home_score')
+    score_info = ""
+    if away_score is not None and home_score is not None:
+        if status == 'Final':
+            titulo = "🏆 Score Final"
+        else:
+            inning = f" ({estado['inning_state']} {estado['inning']})" if estado and estado.get('inning') else ""
+            titulo = f"⚾ En juego{inning}"
+        score_info = f"<p><strong>{titulo}:</strong> {juego['away_name']} {away_score} - {home_score} {juego['home_name']}</p>"
+    if boxscore and boxscore['away'].get('hits') is not None:
+        score_info += f"<p><strong>Hits:</strong> {boxscore['away']['hits']} - {boxscore['home']['hits']}</p>"
+    
+    st.markdown(f"""
+    <div class="metric-card">
+        <h4>{juego['away_name']} @ {juego['home_name']}</h4>
+        <p><strong>Estado:</strong> {status}</p>
+        <p><strong>Hora:</strong> {juego['game_datetime']}</p>
+        {score_info}
+    </div>
+    """, unsafe_allow_html=True)
+
+@st.fragment(run_every=LIVE_POLL_INTERVAL)
+def tarjeta_juego_en_vivo(fecha_str: str, juego: Dict):
+    """
+    Tarjeta de un juego no finalizado. Se re-ejecuta sola cada LIVE_POLL_INTERVAL segundos
+    sin re-ejecutar el resto del dashboard (predicciones, DFS, etc.). El tracker compartido
+    hace como máximo una ronda de requests por intervalo, sin importar cuántas tarjetas o sesiones haya.
+    """
+    tracker = get_tracker(fecha_str)
+    tracker.poll()
+    mostrar_tarjeta_juego(juego, tracker.get(juego['game_id']), obtener_boxscores(fecha_str).get(juego['game_id']))
+
+@timed()
 def tab_optimizacion_dfs(fecha_str: str):
     """Tab para optimización DFS."""
     st.header("🎯 Optimización DFS")
@@ -438,8 +574,22 @@ def tab_optimizacion_dfs(fecha_str: str):
         equipos = [juego_seleccionado['home_name'], juego_seleccionado['away_name']]
         
         # Mostrar clima del juego seleccionado
-        weather_info = obtener_weather_info(game_id)
-        mostrar_weather_card(weather_info)
+        slate = snapshot_actual(fecha_str, 'slate')
+        weather_info = slate['payload']['weather'].get(game_id) if slate else None
+        mostrar_weather_card(weather_info or obtener_weather_info(game_id))
+        
+        # Alineación precalculada por el refresher para este juego (jugadores de la base de sus dos equipos)
+        dfs = snapshot_actual(fecha_str, 'dfs')
+        dfs_juego = ((dfs['payload'].get('games') or {}).get(str(game_id)) or {}) if dfs else {}
+        if (dfs_juego.get('result') or {}).get('status') == 'success':
+            resultado = dfs_juego['result']
+            with st.expander(f"⚡ Alineación precalculada de este juego ({dfs_juego['players']} jugadores "
+                             f"de sus equipos en la base, {dfs['created_at']})"):
+                mvp = resultado.get('mvp', {})
+                st.write(f"**MVP:** {mvp.get('name', '')} (${mvp.get('salary', 0)}) · FPPG {mvp.get('fppg', 0)}")
+                st.dataframe(pd.DataFrame(resultado.get('utility', [])), use_container_width=True)
+                st.caption(f"Salario: ${resultado.get('salary_used', 0)} · "
+                           f"Puntos proyectados: {resultado.get('projected_points', 0):.2f}")
         
         # Construir roster
         st.subheader("📋 Rosters Confirmados")
@@ -450,101 +600,51 @@ def tab_optimizacion_dfs(fecha_str: str):
         roster = []
         for i, equipo in enumerate(equipos):
             with col1 if i == 0 else col2:
-                equipo_roster = mostrar_roster_por_posiciones(equipo)
+                equipo_roster = mostrar_roster_por_posiciones(equipo, fecha_str)
                 roster.extend(equipo_roster)
         
         if not roster:
             st.warning("No se pudo obtener el roster para este juego.")
             return
         
-        # Formulario para FPPG y precio
-        st.subheader("💰 Ingresa FPPG y Precio FanDuel")
-        input_data = []
+        # Grilla editable (un solo widget) con salario y FPPG precargados desde daily_roster
+        st.subheader("💰 FPPG y Precio FanDuel")
+        grilla = build_player_grid(roster, obtener_jugadores_base(fecha_str))
+        if grilla.empty:
+            st.warning("No hay bateadores en los rosters de este juego.")
+            return
+        cargados = int(grilla['en_base'].sum())
+        st.caption(f"{cargados} de {len(grilla)} bateadores precargados desde la base local; "
+                   "completa o corrige el resto y desmarca a los inactivos.")
         
-        with st.form("fppg_precio_form"):
-            st.write("**Completa los datos para cada jugador:**")
-            
-            # Separar jugadores por equipo y filtrar solo bateadores (no pitchers)
-            bateadores_home = [j for j in roster if j.get('team') == equipos[0] and j.get('position') not in ['P', 'SP', 'RP', 'CP']]
-            bateadores_away = [j for j in roster if j.get('team') == equipos[1] and j.get('position') not in ['P', 'SP', 'RP', 'CP']]
-            
-            # Crear dos columnas para los equipos
-            col_home, col_away = st.columns(2)
-            
-            # Equipo Home (columna izquierda)
-            with col_home:
-                st.markdown(f"**{equipos[0]}**")
-                for jugador in bateadores_home:
-                    nombre = jugador.get('name', '')
-                    posicion = jugador.get('position', '')
-                    jersey = jugador.get('jersey', '')
-                    
-                    st.write(f"**{nombre}** ({posicion} #{jersey})")
-                    
-                    # Checkbox para marcar como activo/inactivo
-                    activo = st.checkbox("Activo", value=True, key=f"activo_{nombre}")
-                    
-                    if activo:
-                        cols = st.columns([1, 1])
-                        fppg = cols[0].number_input(f"FPPG", min_value=0.0, key=f"fppg_{nombre}")
-                        precio = cols[1].number_input(f"Precio", min_value=0, key=f"precio_{nombre}")
-                        
-                        jugador_copia = jugador.copy()
-                        jugador_copia['fppg'] = fppg
-                        jugador_copia['salary'] = precio
-                        jugador_copia['activo'] = True
-                        input_data.append(jugador_copia)
-                    else:
-                        st.info("Jugador marcado como inactivo - será excluido de la optimización")
-                        jugador_copia = jugador.copy()
-                        jugador_copia['activo'] = False
-                        input_data.append(jugador_copia)
-                    
-                    st.divider()
-            
-            # Equipo Away (columna derecha)
-            with col_away:
-                st.markdown(f"**{equipos[1]}**")
-                for jugador in bateadores_away:
-                    nombre = jugador.get('name', '')
-                    posicion = jugador.get('position', '')
-                    jersey = jugador.get('jersey', '')
-                    
-                    st.write(f"**{nombre}** ({posicion} #{jersey})")
-                    
-                    # Checkbox para marcar como activo/inactivo
-                    activo = st.checkbox("Activo", value=True, key=f"activo_{nombre}")
-                    
-                    if activo:
-                        cols = st.columns([1, 1])
-                        fppg = cols[0].number_input(f"FPPG", min_value=0.0, key=f"fppg_{nombre}")
-                        precio = cols[1].number_input(f"Precio", min_value=0, key=f"precio_{nombre}")
-                        
-                        jugador_copia = jugador.copy()
-                        jugador_copia['fppg'] = fppg
-                        jugador_copia['salary'] = precio
-                        jugador_copia['activo'] = True
-                        input_data.append(jugador_copia)
-                    else:
-                        st.info("Jugador marcado como inactivo - será excluido de la optimización")
-                        jugador_copia = jugador.copy()
-                        jugador_copia['activo'] = False
-                        input_data.append(jugador_copia)
-                    
-                    st.divider()
-            
+        with st.form(f"dfs_grid_form_{game_id}"):
+            input_data = st.data_editor(
+                grilla,
+                key=f"dfs_grid_{fecha_str}_{game_id}",
+                num_rows="fixed",
+                use_container_width=True,
+                disabled=['name', 'team', 'position', 'jersey', 'en_base'],
+                column_config={
+                    'player_id': st.column_config.NumberColumn("ID", format="%d"),
+                    'activo': st.column_config.CheckboxColumn("Activo"),
+                    'name': "Jugador",
+                    'team': "Equipo",
+                    'position': "Pos",
+                    'jersey': "#",
+                    'salary': st.column_config.NumberColumn("Precio", min_value=0, step=100, format="$%d"),
+                    'fppg': st.column_config.NumberColumn("FPPG", min_value=0.0, step=0.1, format="%.2f"),
+                    'en_base': st.column_config.CheckboxColumn("En base")
+                }
+            )
             submitted = st.form_submit_button("🚀 Optimizar Alineación")
         
         # Optimización
         if submitted:
-            # Filtrar solo jugadores activos
-            jugadores_activos = [j for j in input_data if j.get('activo', True)]
+            jugadores_activos, errores = validate_player_grid(input_data, MIN_PLAYERS_REQUIRED)
             
-            if len(jugadores_activos) < MIN_PLAYERS_REQUIRED:
-                st.error(f"Se requieren al menos {MIN_PLAYERS_REQUIRED} jugadores activos para optimizar. Tienes {len(jugadores_activos)}.")
-            # Solo validar FPPG y precio de los jugadores activos
-            elif any(j.get('activo', True) and (j.get('fppg', 0) <= 0 or j.get('salary', 0) <= 0) for j in jugadores_activos):
-                st.error("Todos los jugadores activos deben tener FPPG y precio válidos.")
+            if errores:
+                for error in errores:
+                    st.error(error)
             else:
                 # Debug: mostrar los datos de entrada al optimizador
                 st.subheader("🛠️ Debug: Jugadores activos enviados al optimizador")
@@ -600,7 +700,7 @@ def tab_optimizacion_dfs(fecha_str: str):
                     # Guardar datos
                     os.makedirs("data/opt_inputs", exist_ok=True)
                     file = f"data/opt_inputs/opt_inputs_{fecha_str}_{game_id}.csv"
-                    pd.DataFrame(input_data).to_csv(file, index=False)
+                    input_data.reset_index().to_csv(file, index=False)
                     st.info(f"Datos guardados en: {file}")
 
                     # --- What if: Mejor alineación para cada posible MVP ---
@@ -643,34 +743,21 @@ def tab_optimizacion_dfs(fecha_str: str):
                 else:
                     st.error(f"Error en optimización: {resultado.get('message', 'Desconocido')}")
 
+@timed()
 def tab_over_under(fecha_str: str):
     """Tab para Over/Under predictions y heatmap."""
     st.header("📊 Over/Under Analysis")
     
-    # Obtener predicciones para el día
-    juegos = obtener_juegos_del_dia(fecha_str)
-    if not juegos:
+    # Features y predicciones del bundle del slate (compartido con "Juegos del Día")
+    try:
+        bundle = cargar_slate(fecha_str)
+    except Exception as e:
+        st.error(f"Error obteniendo juegos: {e}")
+        return
+    if not bundle['juegos']:
         st.info("No hay juegos para esta fecha.")
         return
-    
-    # Construir features reales para cada juego
-    features = []
-    for juego in juegos:
-        try:
-            match_stats = get_match_real_stats(juego)
-            features.append({
-                'game_id': juego['game_id'],
-                'home_team': juego['home_name'],
-                'away_team': juego['away_name'],
-                **{k: match_stats[k] for k in [
-                    'home_avg_runs', 'away_avg_runs', 'home_era', 'away_era',
-                    'home_whip', 'away_whip'
-                ]}
-            })
-        except Exception as e:
-            print(f'Error obteniendo stats para {juego}: {e}')
-    juegos_df = pd.DataFrame(features)
-    predictions = over_under_model.predict_over_under(juegos_df) if not juegos_df.empty else []
+    predictions = [dict(p) for p in bundle['predictions']]
 
     # Mostrar predicciones
     if predictions:
@@ -680,8 +767,24 @@ def tab_over_under(fecha_str: str):
                 col1, col2, col3, col4 = st.columns(4)
                 col1.write(f"**{pred['away_team']} @ {pred['home_team']}**")
                 col2.metric("Línea Oficial", f"{pred.get('linea_oficial', 'N/A')}")
-                col3.metric("Línea Predicha", f"{pred['linea_predicha']:.1f}")
+                intervalo = (f"Intervalo p10–p90: {pred['intervalo_bajo']:.1f} – {pred['intervalo_alto']:.1f}"
+                             if pred.get('intervalo_bajo') is not None else None)
+                col3.metric("Línea Predicha", f"{pred['linea_predicha']:.1f}", help=intervalo)
                 col4.metric("Confianza", f"{pred['confidence']:.1%}")
+        # Probabilidades de líneas alternativas: búsquedas en la CDF de la distribución del bundle,
+        # sin volver a ejecutar el modelo
+        with st.expander("📊 P(Over) por línea alternativa"):
+            distribucion = bundle.get('distribution')
+            if distribucion is None:
+                st.info("Este snapshot del slate todavía no trae la distribución de carreras.")
+            else:
+                lineas = np.arange(6.5, 12.0, 1.0)
+                tabla = pd.DataFrame(
+                    distribucion.probability_table(lineas)['over'],
+                    index=[f"{p['away_team']} @ {p['home_team']}" for p in predictions],
+                    columns=[f"O {l:.1f}" for l in lineas]
+                )
+                st.dataframe(tabla.style.format("{:.1%}", na_rep="N/A"), use_container_width=True)
         # Heatmap
         st.subheader("🔥 Heatmap Comparativo")
         fig = crear_over_under_heatmap(predictions)
@@ -705,51 +808,49 @@ def tab_over_under(fecha_str: str):
         submitted = st.form_submit_button("💾 Guardar Resultados")
         
         if submitted:
-            for pred in predictions:
-                if pred.get('resultado_real', 0) > 0:
-                    result_data = {
-                        'date': fecha_str,
-                        'game_id': pred['game_id'],
-                        'away_team': pred['away_team'],
-                        'home_team': pred['home_team'],
-                        'linea_oficial': pred.get('linea_oficial'),
-                        'linea_predicha': pred.get('linea_predicha'),
-                        'resultado_real': pred.get('resultado_real'),
-                        'accuracy': 1 if pred.get('resultado_real') and pred.get('linea_oficial') and \
-                                    ((pred['resultado_real'] > pred['linea_oficial'] and pred.get('linea_predicha', 0) > pred['linea_oficial']) or \
-                                     (pred['resultado_real'] < pred['linea_oficial'] and pred.get('linea_predicha', 0) < pred['linea_oficial'])) else 0
-                    }
-                    guardar_over_under_result(result_data)
+            # accuracy se calcula al guardar (data_manager.over_under_results.compute_accuracy)
+            resultados = [{
+                'date': fecha_str,
+                'game_id': pred['game_id'],
+                'away_team': pred['away_team'],
+                'home_team': pred['home_team'],
+                'linea_oficial': pred.get('linea_oficial'),
+                'linea_predicha': pred.get('linea_predicha'),
+                'resultado_real': pred.get('resultado_real')
+            } for pred in predictions if pred.get('resultado_real', 0) > 0]
+            if resultados:
+                guardar_over_under_results(resultados)
 
+@timed()
 def tab_resultados_reales():
     """Tab para resultados reales e histórico."""
     st.header("📈 Resultados Reales & Histórico")
     
-    # Cargar histórico
-    historico = cargar_over_under_historico()
+    # Totales y tasas diarias salen de la tabla de agregados (unas filas por día)
+    preparar_historico_over_under()
+    resumen = get_summary()
     
-    if not historico.empty:
+    if resumen['total_games'] > 0:
         st.subheader("📊 Histórico de Resultados")
         
         # Métricas generales
-        total_games = len(historico)
-        accuracy_rate = historico['accuracy'].mean() * 100 if 'accuracy' in historico.columns else 0
-        
         col1, col2, col3 = st.columns(3)
-        col1.metric("Total Juegos", total_games)
-        col2.metric("Tasa de Acierto", f"{accuracy_rate:.1f}%")
-        col3.metric("Última Actualización", historico['date'].max() if 'date' in historico.columns else "N/A")
+        col1.metric("Total Juegos", resumen['total_games'])
+        col2.metric("Tasa de Acierto", f"{resumen['accuracy'] * 100:.1f}%")
+        col3.metric("Última Actualización", resumen['last_date'] or "N/A")
         
-        # Tabla de resultados
-        st.dataframe(historico, use_container_width=True)
+        # Tabla de resultados (los más recientes)
+        st.dataframe(get_results(limit=HISTORICO_MAX_FILAS), use_container_width=True)
+        if resumen['total_games'] > HISTORICO_MAX_FILAS:
+            st.caption(f"Mostrando los últimos {HISTORICO_MAX_FILAS} de {resumen['total_games']} juegos.")
         
-        # Gráfico de accuracy por fecha
-        if 'date' in historico.columns and 'accuracy' in historico.columns:
-            st.subheader("📈 Tasa de Acierto por Fecha")
-            accuracy_by_date = historico.groupby('date')['accuracy'].mean().reset_index()
-            fig = px.line(accuracy_by_date, x='date', y='accuracy', 
-                         title="Evolución de la Tasa de Acierto")
-            st.plotly_chart(fig, use_container_width=True)
+        # Gráfico de accuracy por fecha con ventanas móviles
+        st.subheader("📈 Tasa de Acierto por Fecha")
+        accuracy_by_date = get_daily_accuracy()
+        import plotly.express as px
+        fig = px.line(accuracy_by_date, x='date', y=['accuracy', 'rolling_7', 'rolling_30'],
+                      title="Evolución de la Tasa de Acierto")
+        st.plotly_chart(fig, use_container_width=True)
     else:
         st.info("No hay datos históricos disponibles. Ingresa resultados en la pestaña Over/Under.")
 
@@ -764,7 +865,7 @@ def main_dashboard():
     """, unsafe_allow_html=True)
     
     # Sidebar
-    with st.sidebar:
+    with st.sidebar, section('sidebar'):
         st.header("⚙️ Configuración")
         
         # Selección de fecha
@@ -774,6 +875,9 @@ def main_dashboard():
             max_value=date.today() + timedelta(days=7)
         )
         fecha_str = selected_date.strftime('%Y-%m-%d')
+        perfil = current_profile()
+        if perfil:
+            perfil.context['fecha'] = fecha_str
         
         st.write(f"**Fecha seleccionada:** {fecha_str}")
         
@@ -789,9 +893,33 @@ def main_dashboard():
         # Información del sistema
         st.markdown("---")
         st.subheader("ℹ️ Información")
-        st.write("• Auto-refresh cada 3 minutos")
+        st.write(f"• Marcadores en vivo cada {LIVE_POLL_INTERVAL} s")
         st.write("• Cache de datos activo")
-        st.write("• Modelo Over/Under entrenado")
+        st.caption(f"TTL: juegos {TTL_JUEGOS // 60} min · clima {TTL_WEATHER // 60} min · "
+                   f"rosters {TTL_ROSTER // 60} min · equipos {TTL_TEAM_IDS // 3600} h")
+        if st.button("🧹 Limpiar caches"):
+            invalidar_caches()
+            st.success("Caches limpiados; los datos se vuelven a descargar.")
+        servicio = estado_servicio()
+        if servicio['source'] == 'service':
+            st.write(f"• Modelo Over/Under: {servicio.get('model_version') or 'pickle legacy'} (servicio)")
+        else:
+            st.write("• Servicio de predicciones no disponible; se muestran los snapshots del refresher")
+        carga = servicio.get('model_load') or {}
+        if carga:
+            st.caption(f"Carga: {carga['load_s']}s · RSS: {carga['rss_after_mb']} MB"
+                       f"{' · mmap' if carga.get('mmap') else ''}")
+        if servicio.get('batcher'):
+            batcher = servicio['batcher']
+            st.caption(f"Servicio: p50 {batcher['latency_ms_p50']} ms · p95 {batcher['latency_ms_p95']} ms · "
+                       f"{batcher['requests_per_s']} req/s · lote medio {batcher['avg_batch_items']}")
+        
+        # Perfil de render (opt-in): el panel se dibuja al final, cuando el render terminó
+        st.checkbox("⏱️ Perfilar render", value=profiling_enabled_by_env(), key='perfil_render',
+                    help="Mide pestañas, loaders cacheados y requests a MLB StatsAPI de cada render.")
+        if st.session_state.get('perfil_render'):
+            st.checkbox("Guardar perfiles en JSONL", value=bool(log_path_from_env()), key='perfil_render_log',
+                        help=f"Agrega cada render a {log_path_from_env() or DEFAULT_LOG_PATH}")
     
     # Tabs principales
     tab1, tab2, tab3, tab4 = st.tabs([
@@ -813,5 +941,51 @@ def main_dashboard():
     with tab4:
         tab_resultados_reales()
 
+def id_sesion() -> str:
+    """session_id de Streamlit de la sesión actual (None fuera de un script run)."""
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+        ctx = get_script_run_ctx()
+        return ctx.session_id if ctx else None
+    except Exception:
+        return None
+
+def mostrar_perfil_render(perfil):
+    """Panel colapsable del sidebar con el último render y la evolución de los anteriores."""
+    registro = perfil.to_dict()
+    historial = st.session_state.setdefault('perfiles_render', [])
+    historial.append(registro)
+    del historial[:-HISTORY_SIZE]
+    
+    with st.sidebar.expander("⏱️ Perfil de render", expanded=False):
+        col1, col2 = st.columns(2)
+        col1.metric("Render", f"{registro['total_ms']:.0f} ms")
+        col2.metric("Requests API", registro['api_requests'], f"{registro['api_ms']:.0f} ms", delta_color="off")
+        
+        if registro['sections']:
+            st.markdown("**Pestañas y secciones**")
+            st.dataframe(pd.DataFrame.from_dict(registro['sections'], orient='index')
+                         .sort_values('ms', ascending=False), use_container_width=True)
+        if registro['loaders']:
+            st.markdown("**Loaders cacheados**")
+            loaders = pd.DataFrame.from_dict(registro['loaders'], orient='index')
+            loaders['hit_rate'] = (loaders['hits'] / loaders['calls']).round(2)
+            st.dataframe(loaders.sort_values('ms', ascending=False), use_container_width=True)
+        if registro['api']:
+            st.markdown("**MLB StatsAPI por endpoint**")
+            st.dataframe(pd.DataFrame.from_dict(registro['api'], orient='index')
+                         .sort_values('ms', ascending=False), use_container_width=True)
+        if len(historial) > 1:
+            st.markdown("**Renders de esta sesión (ms)**")
+            st.line_chart(pd.DataFrame({'total_ms': [r['total_ms'] for r in historial]}))
+        if st.session_state.get('perfil_render_log', bool(log_path_from_env())):
+            st.caption(f"Guardando en {log_path_from_env() or DEFAULT_LOG_PATH}")
+
 if __name__ == "__main__":
-    main_dashboard() 
\ No newline at end of file
+    perfilar = st.session_state.get('perfil_render', profiling_enabled_by_env())
+    guardar = st.session_state.get('perfil_render_log', bool(log_path_from_env()))
+    log_path = (log_path_from_env() or DEFAULT_LOG_PATH) if guardar else None
+    with profile_render(perfilar, session_id=id_sesion(), log_path=log_path) as perfil:
+        main_dashboard()
+    if perfil:
+        mostrar_perfil_render(perfil) 
\ No newline at end of file
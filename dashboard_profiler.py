@@ -0,0 +1,249 @@
+# dashboard_profiler.py
+# Perfil de render opcional del dashboard: tiempo de cada pestaña (o sección), cada loader
+# cacheado (con hit/miss) y cada request a MLB StatsAPI (vía listeners de api_metrics).
+# Se activa con DASHBOARD_PROFILE=1 o desde el sidebar; con DASHBOARD_PROFILE_LOG=<ruta>
+# cada render se agrega como una línea JSON para analizarlo offline.
+#
+# Cada sesión de Streamlit corre su script en un hilo propio, así que el render activo se
+# guarda por hilo. Los requests de hilos auxiliares (ej. el ThreadPoolExecutor del slate)
+# se atribuyen al render activo si hay uno solo, dentro de la sección que estaba abierta.
+
+import functools
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+import api_metrics
+
+PROFILE_ENV = 'DASHBOARD_PROFILE'
+PROFILE_LOG_ENV = 'DASHBOARD_PROFILE_LOG'
+DEFAULT_LOG_PATH = os.path.join('data', 'dashboard_profile.jsonl')
+HISTORY_SIZE = 20  # renders que el panel conserva por sesión
+
+_local = threading.local()
+_active_runs: List['RenderProfile'] = []
+_lock = threading.Lock()
+_log_lock = threading.Lock()
+_listener_installed = False
+
+
+def profiling_enabled_by_env() -> bool:
+    return os.environ.get(PROFILE_ENV, '').lower() in ('1', 'true', 'yes', 'si', 'sí')
+
+
+def log_path_from_env() -> Optional[str]:
+    return os.environ.get(PROFILE_LOG_ENV) or None
+
+
+class RenderProfile:
+    """Mediciones de un render (una ejecución del script del dashboard)."""
+
+    def __init__(self, session_id: str = None, context: Dict = None):
+        self.session_id = session_id
+        self.context = context or {}
+        self.started_at = time.time()
+        self.total_ms: Optional[float] = None
+        self.sections: Dict[str, Dict] = {}
+        self.loaders: Dict[str, Dict] = defaultdict(lambda: {'calls': 0, 'hits': 0, 'misses': 0, 'ms': 0.0})
+        self.api: Dict[str, Dict] = defaultdict(lambda: {'requests': 0, 'errors': 0, 'ms': 0.0})
+        self._stack: List[str] = []
+        self._start = time.perf_counter()
+        self._lock = threading.Lock()
+
+    @property
+    def current_section(self) -> Optional[str]:
+        return self._stack[-1] if self._stack else None
+
+    def _section(self, name: str) -> Dict:
+        return self.sections.setdefault(name, {'ms': 0.0, 'calls': 0, 'api_requests': 0, 'api_ms': 0.0})
+
+    def record_loader(self, name: str, elapsed_s: float, hit: bool):
+        with self._lock:
+            stats = self.loaders[name]
+            stats['calls'] += 1
+            stats['hits' if hit else 'misses'] += 1
+            stats['ms'] += elapsed_s * 1000
+
+    def record_api(self, endpoint: str, elapsed_s: float, ok: bool):
+        with self._lock:
+            stats = self.api[endpoint]
+            stats['requests'] += 1
+            stats['ms'] += elapsed_s * 1000
+            if not ok:
+                stats['errors'] += 1
+            if self._stack:
+                section = self._section(self._stack[-1])
+                section['api_requests'] += 1
+                section['api_ms'] += elapsed_s * 1000
+
+    def finish(self):
+        self.total_ms = (time.perf_counter() - self._start) * 1000
+
+    def to_dict(self) -> Dict:
+        def rounded(stats: Dict) -> Dict:
+            return {k: round(v, 2) if isinstance(v, float) else v for k, v in stats.items()}
+
+        with self._lock:
+            return {
+                'timestamp': datetime.fromtimestamp(self.started_at).strftime('%Y-%m-%d %H:%M:%S'),
+                'session_id': self.session_id,
+                'context': self.context,
+                'total_ms': round(self.total_ms, 2) if self.total_ms is not None else None,
+                'sections': {name: rounded(s) for name, s in self.sections.items()},
+                'loaders': {name: rounded(s) for name, s in self.loaders.items()},
+                'api': {name: rounded(s) for name, s in self.api.items()},
+                'api_requests': sum(s['requests'] for s in self.api.values()),
+                'api_ms': round(sum(s['ms'] for s in self.api.values()), 2)
+            }
+
+
+def _api_listener(endpoint: str, elapsed_s: float, ok: bool):
+    profile = current_profile()
+    if profile is None:
+        with _lock:
+            # Hilo auxiliar (pool del slate, etc.): solo se puede atribuir sin ambigüedad
+            profile = _active_runs[0] if len(_active_runs) == 1 else None
+    if profile is not None:
+        profile.record_api(endpoint, elapsed_s, ok)
+
+
+def _ensure_listener():
+    global _listener_installed
+    with _lock:
+        if _listener_installed:
+            return
+        _listener_installed = True
+    api_metrics.add_listener(_api_listener)
+
+
+def current_profile() -> Optional[RenderProfile]:
+    return getattr(_local, 'profile', None)
+
+
+@contextmanager
+def profile_render(enabled: bool = True, session_id: str = None, context: Dict = None,
+                   log_path: str = None):
+    """
+    Perfila un render completo; retorna el RenderProfile (o None si enabled es False).
+    Al terminar, si log_path está definido, agrega el render al JSONL.
+    """
+    if not enabled:
+        yield None
+        return
+    _ensure_listener()
+    profile = RenderProfile(session_id, context)
+    _local.profile = profile
+    with _lock:
+        _active_runs.append(profile)
+    try:
+        yield profile
+    finally:
+        profile.finish()
+        _local.profile = None
+        with _lock:
+            if profile in _active_runs:
+                _active_runs.remove(profile)
+        if log_path:
+            append_jsonl(profile.to_dict(), log_path)
+
+
+@contextmanager
+def section(name: str):
+    """Mide una sección (ej. una pestaña) del render activo; sin perfil activo no hace nada."""
+    profile = current_profile()
+    if profile is None:
+        yield
+        return
+    profile._stack.append(name)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        profile._stack.pop()
+        with profile._lock:
+            stats = profile._section(name)
+            stats['ms'] += elapsed_ms
+            stats['calls'] += 1
+
+
+def timed(name: str = None) -> Callable:
+    """Decorador: cada llamada a la función es una sección con su nombre."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with section(name or fn.__name__):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def profiled_cache(cache_decorator: Callable, name: str = None) -> Callable:
+    """
+    Aplica un decorador de cache (st.cache_data / st.cache_resource) y mide cada llamada.
+    Es hit cuando el cache respondió sin ejecutar la función original.
+
+        @profiled_cache(st.cache_data(ttl=300))
+        def descargar_juegos_del_dia(fecha_str): ...
+    """
+    def decorator(fn):
+        loader_name = name or fn.__name__
+
+        @functools.wraps(fn)
+        def miss(*args, **kwargs):
+            frames = getattr(_local, 'loader_frames', None)
+            if frames:
+                frames[-1]['miss'] = True
+            return fn(*args, **kwargs)
+
+        cached = cache_decorator(miss)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            profile = current_profile()
+            if profile is None:
+                return cached(*args, **kwargs)
+            frames = _local.__dict__.setdefault('loader_frames', [])
+            frame = {'miss': False}
+            frames.append(frame)
+            start = time.perf_counter()
+            try:
+                return cached(*args, **kwargs)
+            finally:
+                frames.pop()
+                profile.record_loader(loader_name, time.perf_counter() - start, not frame['miss'])
+
+        if hasattr(cached, 'clear'):
+            wrapper.clear = cached.clear
+        return wrapper
+    return decorator
+
+
+def append_jsonl(record: Dict, log_path: str = DEFAULT_LOG_PATH):
+    """Agrega un render al log JSONL (una línea por render)."""
+    try:
+        os.makedirs(os.path.dirname(log_path) or '.', exist_ok=True)
+        line = json.dumps(record, default=str)
+        with _log_lock, open(log_path, 'a', encoding='utf-8') as f:
+            f.write(line + '\n')
+    except Exception as e:
+        print(f"Error escribiendo perfil de render en {log_path}: {e}")
+
+
+def load_jsonl(log_path: str = DEFAULT_LOG_PATH) -> List[Dict]:
+    """Lee un log JSONL de renders (ignora líneas corruptas)."""
+    if not os.path.exists(log_path):
+        return []
+    records = []
+    with open(log_path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+    return records
@@ -0,0 +1,242 @@
+# over_under_results.py
+# Módulo para el histórico de resultados Over/Under ingresados desde el dashboard.
+# Cada juego se guarda una sola vez (upsert por game_id) y los agregados diarios y de
+# ventanas móviles (7 y 30 días) se mantienen en la tabla over_under_daily, recalculando
+# solo las fechas afectadas por cada guardado. Así la pestaña de histórico lee unas
+# pocas filas por día aunque haya años de resultados.
+
+import os
+import sqlite3
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List
+import pandas as pd
+from data_manager.db import DB_PATH
+
+RESULT_COLUMNS = [
+    'game_id', 'date', 'away_team', 'home_team',
+    'linea_oficial', 'linea_predicha', 'resultado_real', 'accuracy'
+]
+ROLLING_WINDOWS = (7, 30)
+
+
+def init_over_under_results(db_path: str = DB_PATH):
+    """
+    Crea las tablas over_under_results y over_under_daily si no existen.
+    """
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS over_under_results (
+            game_id INTEGER PRIMARY KEY,
+            date TEXT NOT NULL,
+            away_team TEXT,
+            home_team TEXT,
+            linea_oficial REAL,
+            linea_predicha REAL,
+            resultado_real REAL,
+            accuracy INTEGER,
+            updated_at TEXT
+        )
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_over_under_results_date ON over_under_results (date)')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS over_under_daily (
+            date TEXT PRIMARY KEY,
+            games INTEGER,
+            hits INTEGER,
+            accuracy REAL,
+            mae REAL,
+            rolling_7 REAL,
+            rolling_30 REAL
+        )
+    ''')
+    conn.commit()
+    conn.close()
+
+
+def compute_accuracy(linea_oficial, linea_predicha, resultado_real) -> int:
+    """
+    1 si la predicción quedó del mismo lado de la línea oficial que el resultado real, 0 si no.
+    Sin línea oficial, sin predicción o con push cuenta como 0 (mismo criterio que el CSV original).
+    """
+    if resultado_real is None or linea_oficial is None or linea_predicha is None:
+        return 0
+    if resultado_real > linea_oficial and linea_predicha > linea_oficial:
+        return 1
+    if resultado_real < linea_oficial and linea_predicha < linea_oficial:
+        return 1
+    return 0
+
+
+def _row(result: Dict) -> tuple:
+    values = {k: result.get(k) for k in RESULT_COLUMNS}
+    for key in ('linea_oficial', 'linea_predicha', 'resultado_real'):
+        if values[key] is not None and pd.isna(values[key]):
+            values[key] = None
+    if values['accuracy'] is None or pd.isna(values['accuracy']):
+        values['accuracy'] = compute_accuracy(values['linea_oficial'], values['linea_predicha'],
+                                              values['resultado_real'])
+    values['game_id'] = int(values['game_id'])
+    values['date'] = str(values['date'])
+    values['accuracy'] = int(values['accuracy'])
+    return tuple(values[k] for k in RESULT_COLUMNS)
+
+
+def _refresh_aggregates(conn: sqlite3.Connection, dates: Iterable[str]):
+    """
+    Recalcula over_under_daily para las fechas indicadas y las ventanas móviles de los días
+    afectados (un cambio en un día afecta a los max(ROLLING_WINDOWS) días siguientes).
+    """
+    dates = sorted(set(dates))
+    if not dates:
+        return
+    placeholders = ', '.join('?' for _ in dates)
+    conn.execute(f'DELETE FROM over_under_daily WHERE date IN ({placeholders})', dates)
+    conn.execute(f'''
+        INSERT INTO over_under_daily (date, games, hits, accuracy, mae)
+        SELECT date, COUNT(*), SUM(accuracy), AVG(accuracy),
+               AVG(ABS(linea_predicha - resultado_real))
+        FROM over_under_results
+        WHERE date IN ({placeholders})
+        GROUP BY date
+    ''', dates)
+
+    # Ventanas por calendario: los días sin juegos no cuentan como fallos
+    span = max(ROLLING_WINDOWS)
+    start = (datetime.strptime(dates[0], '%Y-%m-%d') - timedelta(days=span)).strftime('%Y-%m-%d')
+    end = (datetime.strptime(dates[-1], '%Y-%m-%d') + timedelta(days=span)).strftime('%Y-%m-%d')
+    windows = ', '.join(
+        f'''SUM(hits) OVER (ORDER BY julianday(date) RANGE BETWEEN {w - 1} PRECEDING AND CURRENT ROW) * 1.0 /
+            SUM(games) OVER (ORDER BY julianday(date) RANGE BETWEEN {w - 1} PRECEDING AND CURRENT ROW) AS rolling_{w}'''
+        for w in ROLLING_WINDOWS
+    )
+    rows = conn.execute(f'''
+        SELECT date, {', '.join(f'rolling_{w}' for w in ROLLING_WINDOWS)} FROM (
+            SELECT date, {windows} FROM over_under_daily WHERE date >= ? AND date <= ?
+        ) WHERE date >= ?
+    ''', (start, end, dates[0])).fetchall()
+    conn.executemany(
+        f"UPDATE over_under_daily SET {', '.join(f'rolling_{w} = ?' for w in ROLLING_WINDOWS)} WHERE date = ?",
+        [(*row[1:], row[0]) for row in rows]
+    )
+
+
+def upsert_results(results: List[Dict], db_path: str = DB_PATH) -> int:
+    """
+    Guarda resultados (uno por juego). Un juego ya guardado se actualiza en vez de duplicarse.
+    Cada dict necesita game_id y date; accuracy se calcula si no viene.
+    Retorna la cantidad de juegos guardados.
+    """
+    rows = [_row(r) for r in results]
+    if not rows:
+        return 0
+    now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    updates = ', '.join(f'{c} = excluded.{c}' for c in RESULT_COLUMNS[1:])
+    conn = sqlite3.connect(db_path)
+    try:
+        with conn:
+            # Fechas viejas de juegos que cambian de fecha también deben recalcularse
+            ids = [row[0] for row in rows]
+            old_dates = []
+            for i in range(0, len(ids), 500):
+                chunk = ids[i:i + 500]
+                old_dates += [d for (d,) in conn.execute(
+                    f"SELECT DISTINCT date FROM over_under_results WHERE game_id IN ({', '.join('?' for _ in chunk)})",
+                    chunk
+                )]
+            conn.executemany(f'''
+                INSERT INTO over_under_results ({', '.join(RESULT_COLUMNS)}, updated_at)
+                VALUES ({', '.join('?' for _ in RESULT_COLUMNS)}, ?)
+                ON CONFLICT(game_id) DO UPDATE SET {updates}, updated_at = excluded.updated_at
+            ''', [(*row, now) for row in rows])
+            _refresh_aggregates(conn, [row[1] for row in rows] + old_dates)
+    finally:
+        conn.close()
+    return len(rows)
+
+
+def get_results(start: str = None, end: str = None, limit: int = None, db_path: str = DB_PATH) -> pd.DataFrame:
+    """Resultados por juego (más recientes primero), opcionalmente filtrados por rango de fechas."""
+    query = f"SELECT {', '.join(RESULT_COLUMNS)} FROM over_under_results WHERE 1 = 1"
+    params = []
+    if start:
+        query += ' AND date >= ?'
+        params.append(start)
+    if end:
+        query += ' AND date <= ?'
+        params.append(end)
+    query += ' ORDER BY date DESC, game_id'
+    if limit:
+        query += ' LIMIT ?'
+        params.append(limit)
+    conn = sqlite3.connect(db_path)
+    try:
+        return pd.read_sql_query(query, conn, params=params)
+    finally:
+        conn.close()
+
+
+def get_daily_accuracy(start: str = None, end: str = None, db_path: str = DB_PATH) -> pd.DataFrame:
+    """Agregados diarios ya materializados: juegos, aciertos, tasa, MAE y tasas móviles."""
+    query = 'SELECT * FROM over_under_daily WHERE 1 = 1'
+    params = []
+    if start:
+        query += ' AND date >= ?'
+        params.append(start)
+    if end:
+        query += ' AND date <= ?'
+        params.append(end)
+    conn = sqlite3.connect(db_path)
+    try:
+        return pd.read_sql_query(query + ' ORDER BY date', conn, params=params)
+    finally:
+        conn.close()
+
+
+def get_summary(db_path: str = DB_PATH) -> Dict:
+    """Totales del histórico a partir de la tabla diaria (no recorre los juegos)."""
+    conn = sqlite3.connect(db_path)
+    try:
+        games, hits, last_date = conn.execute(
+            'SELECT COALESCE(SUM(games), 0), COALESCE(SUM(hits), 0), MAX(date) FROM over_under_daily'
+        ).fetchone()
+    finally:
+        conn.close()
+    return {
+        'total_games': int(games),
+        'hits': int(hits),
+        'accuracy': hits / games if games else None,
+        'last_date': last_date
+    }
+
+
+def import_results_csv(csv_path: str, db_path: str = DB_PATH) -> int:
+    """
+    Importa el histórico legado (data/over_under_results.csv). Si un juego aparece varias
+    veces se conserva la última fila. Retorna la cantidad de juegos importados.
+    """
+    if not os.path.exists(csv_path):
+        return 0
+    df = pd.read_csv(csv_path)
+    if df.empty or 'game_id' not in df.columns:
+        return 0
+    df = df.dropna(subset=['game_id', 'date']).drop_duplicates('game_id', keep='last')
+    df = df.reindex(columns=RESULT_COLUMNS).astype(object)
+    df = df.where(pd.notna(df), None)
+    return upsert_results(df.to_dict('records'), db_path)
+
+
+def count_results(db_path: str = DB_PATH) -> int:
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute('SELECT COUNT(*) FROM over_under_results').fetchone()[0]
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    import sys
+    init_over_under_results()
+    csv_path = sys.argv[1] if len(sys.argv) > 1 else os.path.join('data', 'over_under_results.csv')
+    n = import_results_csv(csv_path)
+    print(f"{n} juegos importados desde {csv_path} a {DB_PATH}")
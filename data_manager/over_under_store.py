@@ -0,0 +1,182 @@
+# over_under_store.py
+# Módulo para el almacén persistente de juegos Over/Under usados como datos de entrenamiento.
+# Cada fecha procesada se guarda junto con su checkpoint en una sola transacción,
+# así un backfill interrumpido puede retomarse desde la última fecha completada.
+
+import sqlite3
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+import numpy as np
+import pandas as pd
+from data_manager.db import DB_PATH
+
+# Origen de las stats de equipo de cada fecha guardada
+SOURCE_BREF = 'bref'  # snapshot actual de Baseball Reference (incluye juegos posteriores a la fecha)
+SOURCE_FEATURE_STORE = 'team_feature_store'  # point-in-time (team_feature_store.py)
+
+GAME_COLUMNS = [
+    'game_id', 'date', 'home_team', 'away_team',
+    'home_avg_runs', 'away_avg_runs', 'home_era', 'away_era',
+    'home_whip', 'away_whip', 'temp_celsius', 'wind_kph', 'is_dome', 'total_runs'
+]
+
+
+def init_over_under_store(db_path: str = DB_PATH):
+    """
+    Crea las tablas over_under_games y over_under_checkpoints si no existen.
+    """
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS over_under_games (
+            game_id INTEGER PRIMARY KEY,
+            date TEXT,
+            home_team TEXT,
+            away_team TEXT,
+            home_avg_runs REAL,
+            away_avg_runs REAL,
+            home_era REAL,
+            away_era REAL,
+            home_whip REAL,
+            away_whip REAL,
+            temp_celsius REAL,
+            wind_kph REAL,
+            is_dome INTEGER,
+            total_runs REAL
+        )
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_over_under_games_date ON over_under_games (date)')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS over_under_checkpoints (
+            date TEXT PRIMARY KEY,
+            n_games INTEGER,
+            finished_at TEXT
+        )
+    ''')
+    columns = {row[1] for row in cursor.execute('PRAGMA table_info(over_under_checkpoints)')}
+    if 'feature_source' not in columns:
+        # Las fechas guardadas antes de esta columna usaron Baseball Reference
+        cursor.execute(f"ALTER TABLE over_under_checkpoints ADD COLUMN feature_source TEXT DEFAULT '{SOURCE_BREF}'")
+    conn.commit()
+    conn.close()
+
+
+def save_date(fecha: str, games: pd.DataFrame, db_path: str = DB_PATH, feature_source: str = SOURCE_BREF):
+    """
+    Guarda los juegos de una fecha y marca la fecha como completada en la misma transacción,
+    junto con el origen de sus stats de equipo. Re-guardar una fecha reemplaza sus juegos
+    (upsert por game_id).
+    """
+    conn = sqlite3.connect(db_path)
+    try:
+        with conn:
+            if not games.empty:
+                rows = games.reindex(columns=GAME_COLUMNS).astype(object)
+                rows = rows.where(pd.notna(rows), None)
+                conn.executemany(
+                    f"INSERT OR REPLACE INTO over_under_games ({', '.join(GAME_COLUMNS)}) "
+                    f"VALUES ({', '.join('?' for _ in GAME_COLUMNS)})",
+                    rows.itertuples(index=False, name=None)
+                )
+            conn.execute(
+                'INSERT OR REPLACE INTO over_under_checkpoints (date, n_games, finished_at, feature_source) '
+                'VALUES (?, ?, ?, ?)',
+                (fecha, len(games), datetime.now().strftime('%Y-%m-%d %H:%M:%S'), feature_source)
+            )
+    finally:
+        conn.close()
+
+
+def get_completed_dates(db_path: str = DB_PATH, feature_source: str = None) -> Set[str]:
+    """
+    Devuelve el conjunto de fechas ya completadas en el almacén.
+    Con feature_source=SOURCE_FEATURE_STORE, solo las guardadas point-in-time; con SOURCE_BREF
+    (o None) cuentan todas, así un backfill sin store no pisa fechas del store.
+    """
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    if feature_source and feature_source != SOURCE_BREF:
+        cursor.execute('SELECT date FROM over_under_checkpoints WHERE feature_source = ?', (feature_source,))
+    else:
+        cursor.execute('SELECT date FROM over_under_checkpoints')
+    rows = cursor.fetchall()
+    conn.close()
+    return {row[0] for row in rows}
+
+
+def get_feature_sources(start_date: Optional[str] = None, end_date: Optional[str] = None,
+                        db_path: str = DB_PATH) -> Dict[str, int]:
+    """Cantidad de fechas completadas por origen de stats de equipo en el rango."""
+    clauses, params = ['1 = 1'], []
+    if start_date:
+        clauses.append('date >= ?')
+        params.append(start_date)
+    if end_date:
+        clauses.append('date <= ?')
+        params.append(end_date)
+    conn = sqlite3.connect(db_path)
+    try:
+        rows = conn.execute(f"SELECT COALESCE(feature_source, '{SOURCE_BREF}'), COUNT(*) FROM over_under_checkpoints "
+                            f"WHERE {' AND '.join(clauses)} GROUP BY 1", params).fetchall()
+    finally:
+        conn.close()
+    return dict(rows)
+
+
+def _where_dates(start_date: Optional[str], end_date: Optional[str]) -> Tuple[str, List[str]]:
+    clauses = ['total_runs IS NOT NULL']
+    params = []
+    if start_date:
+        clauses.append('date >= ?')
+        params.append(start_date)
+    if end_date:
+        clauses.append('date <= ?')
+        params.append(end_date)
+    return ' AND '.join(clauses), params
+
+
+def iter_games(start_date: Optional[str] = None, end_date: Optional[str] = None,
+               chunksize: int = 5000, db_path: str = DB_PATH) -> Iterator[pd.DataFrame]:
+    """
+    Itera los juegos finalizados del almacén en bloques ordenados por fecha,
+    sin cargar todo el rango en memoria.
+    """
+    where, params = _where_dates(start_date, end_date)
+    conn = sqlite3.connect(db_path)
+    try:
+        query = f"SELECT * FROM over_under_games WHERE {where} ORDER BY date, game_id"
+        for chunk in pd.read_sql_query(query, conn, params=params, chunksize=chunksize):
+            yield chunk
+    finally:
+        conn.close()
+
+
+def load_training_frame(feature_columns: List[str], start_date: Optional[str] = None,
+                        end_date: Optional[str] = None, chunksize: int = 5000,
+                        db_path: str = DB_PATH) -> pd.DataFrame:
+    """
+    Carga features y total_runs de los juegos finalizados en arreglos float32 preasignados,
+    llenándolos bloque a bloque. Retorna un DataFrame compacto con 'date', las features y 'total_runs'.
+    """
+    where, params = _where_dates(start_date, end_date)
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    cursor.execute(f"SELECT COUNT(*) FROM over_under_games WHERE {where}", params)
+    n = cursor.fetchone()[0]
+    conn.close()
+
+    X = np.empty((n, len(feature_columns)), dtype=np.float32)
+    y = np.empty(n, dtype=np.float32)
+    dates = np.empty(n, dtype=object)
+    offset = 0
+    for chunk in iter_games(start_date, end_date, chunksize, db_path):
+        size = min(len(chunk), n - offset)
+        X[offset:offset + size] = chunk[feature_columns].to_numpy(dtype=np.float32)[:size]
+        y[offset:offset + size] = chunk['total_runs'].to_numpy(dtype=np.float32)[:size]
+        dates[offset:offset + size] = chunk['date'].to_numpy()[:size]
+        offset += size
+
+    df = pd.DataFrame(X[:offset], columns=feature_columns)
+    df.insert(0, 'date', dates[:offset])
+    df['total_runs'] = y[:offset]
+    return df
@@ -0,0 +1,145 @@
+# snapshots.py
+# Módulo para el almacén de snapshots del dashboard.
+# refresher.py escribe periódicamente el slate, rosters, boxscores y optimizaciones de cada
+# fecha como snapshots versionados (JSON comprimido); el dashboard solo lee el último.
+# La base usa WAL para que las lecturas no se bloqueen mientras el refresher escribe.
+
+import json
+import sqlite3
+import zlib
+from datetime import datetime
+from typing import Dict, List, Optional
+from data_manager.db import DB_PATH
+
+SNAPSHOT_KINDS = ('slate', 'rosters', 'boxscores', 'dfs')
+DEFAULT_KEEP = 20  # versiones que se conservan por fecha y tipo
+
+
+def init_snapshot_store(db_path: str = DB_PATH):
+    """
+    Crea la tabla dashboard_snapshots si no existe y activa el modo WAL.
+    """
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    cursor.execute('PRAGMA journal_mode=WAL')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS dashboard_snapshots (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            date TEXT NOT NULL,
+            kind TEXT NOT NULL,
+            version INTEGER NOT NULL,
+            created_at TEXT NOT NULL,
+            build_s REAL,
+            payload BLOB NOT NULL,
+            UNIQUE (date, kind, version)
+        )
+    ''')
+    conn.commit()
+    conn.close()
+
+
+def save_snapshot(fecha: str, kind: str, payload, build_s: float = None, db_path: str = DB_PATH) -> int:
+    """
+    Guarda un snapshot como nueva versión para (fecha, kind) y retorna su número de versión.
+    payload debe ser serializable a JSON.
+    """
+    if kind not in SNAPSHOT_KINDS:
+        raise ValueError(f"Tipo de snapshot desconocido: {kind}")
+    blob = zlib.compress(json.dumps(payload, default=str).encode('utf-8'))
+    conn = sqlite3.connect(db_path)
+    try:
+        with conn:
+            row = conn.execute(
+                'SELECT COALESCE(MAX(version), 0) FROM dashboard_snapshots WHERE date = ? AND kind = ?',
+                (fecha, kind)
+            ).fetchone()
+            version = row[0] + 1
+            conn.execute(
+                'INSERT INTO dashboard_snapshots (date, kind, version, created_at, build_s, payload) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (fecha, kind, version, datetime.now().strftime('%Y-%m-%d %H:%M:%S'), build_s, blob)
+            )
+    finally:
+        conn.close()
+    return version
+
+
+def latest_snapshot_version(fecha: str, kind: str, db_path: str = DB_PATH) -> Optional[int]:
+    """Versión más reciente de (fecha, kind), o None si no hay snapshots. Consulta solo el índice."""
+    try:
+        conn = sqlite3.connect(db_path)
+        try:
+            row = conn.execute(
+                'SELECT MAX(version) FROM dashboard_snapshots WHERE date = ? AND kind = ?', (fecha, kind)
+            ).fetchone()
+        finally:
+            conn.close()
+    except sqlite3.OperationalError:
+        # La tabla todavía no existe (el refresher nunca corrió)
+        return None
+    return row[0] if row else None
+
+
+def load_snapshot(fecha: str, kind: str, version: int = None, db_path: str = DB_PATH) -> Optional[Dict]:
+    """
+    Carga un snapshot (el último si version es None).
+    Retorna {'version', 'created_at', 'build_s', 'payload'} o None si no existe.
+    """
+    query = 'SELECT version, created_at, build_s, payload FROM dashboard_snapshots WHERE date = ? AND kind = ?'
+    params = [fecha, kind]
+    if version is not None:
+        query += ' AND version = ?'
+        params.append(version)
+    query += ' ORDER BY version DESC LIMIT 1'
+    try:
+        conn = sqlite3.connect(db_path)
+        try:
+            row = conn.execute(query, params).fetchone()
+        finally:
+            conn.close()
+    except sqlite3.OperationalError:
+        return None
+    if row is None:
+        return None
+    return {
+        'version': row[0],
+        'created_at': row[1],
+        'build_s': row[2],
+        'payload': json.loads(zlib.decompress(row[3]).decode('utf-8'))
+    }
+
+
+def list_snapshots(fecha: str = None, db_path: str = DB_PATH) -> List[Dict]:
+    """Lista los snapshots (sin payload), del más nuevo al más viejo."""
+    query = 'SELECT date, kind, version, created_at, build_s, LENGTH(payload) FROM dashboard_snapshots'
+    params = []
+    if fecha:
+        query += ' WHERE date = ?'
+        params.append(fecha)
+    query += ' ORDER BY date DESC, kind, version DESC'
+    conn = sqlite3.connect(db_path)
+    try:
+        rows = conn.execute(query, params).fetchall()
+    finally:
+        conn.close()
+    return [{'date': r[0], 'kind': r[1], 'version': r[2], 'created_at': r[3], 'build_s': r[4], 'bytes': r[5]}
+            for r in rows]
+
+
+def prune_snapshots(keep: int = DEFAULT_KEEP, db_path: str = DB_PATH) -> int:
+    """Borra las versiones viejas, conservando las últimas `keep` por fecha y tipo. Retorna filas borradas."""
+    conn = sqlite3.connect(db_path)
+    try:
+        with conn:
+            cursor = conn.execute('''
+                DELETE FROM dashboard_snapshots
+                WHERE id IN (
+                    SELECT id FROM (
+                        SELECT id, ROW_NUMBER() OVER (PARTITION BY date, kind ORDER BY version DESC) AS rn
+                        FROM dashboard_snapshots
+                    ) WHERE rn > ?
+                )
+            ''', (keep,))
+            return cursor.rowcount
+    finally:
+        conn.close()
@@ -0,0 +1,117 @@
+# venues.py
+# Módulo para la tabla persistente de estadios (venues) en mlb_data.db.
+# Guarda atributos que casi nunca cambian (techo, altitud, dimensiones) para no
+# descargar el feed completo de cada juego solo para saber si el estadio es domo.
+
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional
+from data_manager.db import DB_PATH
+
+VENUE_COLUMNS = [
+    'venue_id', 'name', 'roof_type', 'turf_type', 'altitude_ft', 'capacity',
+    'left_line', 'left_center', 'center', 'right_center', 'right_line', 'season'
+]
+
+# Bases en las que ya se creó la tabla en este proceso (el DDL corre una vez por base)
+_tables_ready = set()
+_tables_lock = threading.Lock()
+
+
+def init_venues_table():
+    """
+    Crea la tabla venues si no existe en la base de datos.
+    """
+    conn = sqlite3.connect(DB_PATH)
+    cursor = conn.cursor()
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS venues (
+            venue_id INTEGER PRIMARY KEY,
+            name TEXT,
+            roof_type TEXT,
+            turf_type TEXT,
+            altitude_ft INTEGER,
+            capacity INTEGER,
+            left_line INTEGER,
+            left_center INTEGER,
+            center INTEGER,
+            right_center INTEGER,
+            right_line INTEGER,
+            season INTEGER,
+            updated_at TEXT
+        )
+    ''')
+    conn.commit()
+    conn.close()
+
+
+def _ensure_venues_table():
+    """init_venues_table una sola vez por proceso y base (las búsquedas no repiten el DDL)."""
+    if DB_PATH in _tables_ready:
+        return
+    with _tables_lock:
+        if DB_PATH not in _tables_ready:
+            init_venues_table()
+            _tables_ready.add(DB_PATH)
+
+
+def upsert_venues(venues_list: List[Dict]):
+    """
+    Inserta o actualiza múltiples estadios usando una sola conexión.
+    venues_list: lista de diccionarios con las claves de VENUE_COLUMNS.
+    """
+    _ensure_venues_table()
+    now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    conn = sqlite3.connect(DB_PATH)
+    cursor = conn.cursor()
+    data = [tuple(v.get(col) for col in VENUE_COLUMNS) + (now,) for v in venues_list]
+    cursor.executemany('''
+        INSERT OR REPLACE INTO venues (
+            venue_id, name, roof_type, turf_type, altitude_ft, capacity,
+            left_line, left_center, center, right_center, right_line, season, updated_at
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ''', data)
+    conn.commit()
+    conn.close()
+
+
+def get_all_venues() -> Dict[int, Dict]:
+    """
+    Devuelve todos los estadios guardados como diccionario venue_id -> datos.
+    """
+    _ensure_venues_table()
+    conn = sqlite3.connect(DB_PATH)
+    conn.row_factory = sqlite3.Row
+    cursor = conn.cursor()
+    cursor.execute('SELECT * FROM venues')
+    rows = cursor.fetchall()
+    conn.close()
+    return {row['venue_id']: dict(row) for row in rows}
+
+
+def get_venue(venue_id: int) -> Optional[Dict]:
+    """
+    Devuelve los datos de un estadio o None si no está en la tabla.
+    """
+    _ensure_venues_table()
+    conn = sqlite3.connect(DB_PATH)
+    conn.row_factory = sqlite3.Row
+    cursor = conn.cursor()
+    cursor.execute('SELECT * FROM venues WHERE venue_id = ?', (venue_id,))
+    row = cursor.fetchone()
+    conn.close()
+    return dict(row) if row else None
+
+
+def venues_loaded_for_season(season: int) -> bool:
+    """
+    Indica si la tabla ya fue poblada para la temporada indicada.
+    """
+    _ensure_venues_table()
+    conn = sqlite3.connect(DB_PATH)
+    cursor = conn.cursor()
+    cursor.execute('SELECT COUNT(*) FROM venues WHERE season >= ?', (season,))
+    count = cursor.fetchone()[0]
+    conn.close()
+    return count > 0
@@ -1,10 +1,12 @@
 # dfs_optimizer/__init__.py
 # Módulo de optimización DFS para MLB Betting Bot
+# player_grid (usa pandas) se importa desde su submódulo: dfs_optimizer.player_grid
 
-from .optimize_lineup import optimize_lineup
+from .optimize_lineup import optimize_lineup, optimize_multiple_lineups
 from .player_stats_fetcher import get_mock_player_stats
 
 __all__ = [
     'optimize_lineup',
+    'optimize_multiple_lineups',
     'get_mock_player_stats'
-] 
\ No newline at end of file
+]
@@ -1,22 +1,39 @@
 # optimize_lineup.py
 # Este módulo contiene funciones para optimizar alineaciones de Daily Fantasy Sports (DFS) usando algoritmos de optimización.
 
-from pulp import LpProblem, LpVariable, LpMaximize, lpSum, LpBinary, LpStatus
 from dfs_optimizer.player_stats_fetcher import get_mock_player_stats
 from typing import List, Dict, Optional
 
 
-def optimize_lineup(players_data: Optional[List[Dict]] = None):
+def player_key(player: Dict):
+    """Identificador de un jugador en una alineación: player_id si lo tiene, si no el nombre."""
+    return player.get('player_id') if player.get('player_id') is not None else player.get('name')
+
+
+def lineup_keys(result: Dict) -> List:
+    """Claves (player_key) de los 6 jugadores de un resultado de optimize_lineup."""
+    players = ([result['mvp']] if result.get('mvp') else []) + list(result.get('utility', []))
+    return [player_key(p) for p in players]
+
+
+def optimize_lineup(players_data: Optional[List[Dict]] = None, exclude_lineups: Optional[List[List]] = None,
+                    min_unique: int = 1, verbose: bool = True):
     """
     Optimiza una alineación DFS seleccionando 1 MVP (FPPG x1.5) y 5 utilities,
     maximizando la suma de FPPG ajustada bajo un presupuesto de 60,000.
 
     Args:
         players_data (opcional): Lista de diccionarios con datos de jugadores. Si es None, usa datos mock.
+        exclude_lineups (opcional): Alineaciones ya generadas (listas de player_key). La nueva debe
+            tener al menos min_unique jugadores distintos de cada una (para generar varias alineaciones).
+        verbose: Si es False no imprime el resultado ni el log del solver (uso desde servicios).
 
     Returns:
         dict: Diccionario con mvp, utility, salary_used, projected_points y status.
     """
+    # pulp se importa al optimizar: importar el paquete (ej. desde el dashboard) no lo carga
+    from pulp import LpProblem, LpVariable, LpMaximize, lpSum, LpBinary, LpStatus, PULP_CBC_CMD
+
     # Si no se pasa una lista de jugadores, usar los datos mock por defecto
     if players_data is None:
         players = get_mock_player_stats()
@@ -42,6 +59,15 @@ def optimize_lineup(players_data: Optional[List[Dict]] = None):
     # Restricción 2: Seleccionar exactamente 5 utilities
     prob += lpSum(utility_vars) == utility_count, "Exactamente_cinco_utilities"
     
+    # Restricción opcional: diferenciarse de alineaciones anteriores en al menos min_unique jugadores
+    keys = [player_key(p) for p in players]
+    for k, lineup in enumerate(exclude_lineups or []):
+        previous = set(lineup)
+        in_previous = [i for i in range(n) if keys[i] in previous]
+        if in_previous:
+            prob += lpSum(mvp_vars[i] + utility_vars[i] for i in in_previous) <= \
+                mvp_count + utility_count - min_unique, f"Distinta_de_alineacion_{k}"
+    
     # Restricción 3: Un jugador no puede ser MVP y utility a la vez (no repeticiones)
     for i in range(n):
         prob += mvp_vars[i] + utility_vars[i] <= 1, f"No_repetir_jugador_{i}"
@@ -62,7 +88,7 @@ def optimize_lineup(players_data: Optional[List[Dict]] = None):
     prob += objective, "Maximizar_FPPG_total"
 
     # Resolver el problema de optimización
-    prob.solve()
+    prob.solve(PULP_CBC_CMD(msg=verbose))
 
     # Verificar si se encontró una solución factible
     if prob.status != 1:  # 1 = Optimal
@@ -101,6 +127,9 @@ def optimize_lineup(players_data: Optional[List[Dict]] = None):
         "status": "success"
     }
 
+    if not verbose:
+        return result
+
     # Imprimir resultados de forma clara y organizada
     print("\n" + "="*50)
     print("RESULTADO DE LA OPTIMIZACIÓN DFS")
@@ -117,6 +146,23 @@ def optimize_lineup(players_data: Optional[List[Dict]] = None):
     return result
 
 
+def optimize_multiple_lineups(players_data: List[Dict], n_lineups: int, min_unique: int = 1,
+                              verbose: bool = False) -> List[Dict]:
+    """
+    Genera hasta n_lineups alineaciones en orden de puntos proyectados: cada una se resuelve
+    excluyendo las anteriores (al menos min_unique jugadores distintos de cada una).
+    Se detiene antes si ya no hay alineaciones factibles.
+    """
+    lineups = []
+    for _ in range(n_lineups):
+        result = optimize_lineup(players_data, exclude_lineups=[lineup_keys(r) for r in lineups],
+                                 min_unique=min_unique, verbose=verbose)
+        if result.get('status') != 'success':
+            break
+        lineups.append(result)
+    return lineups
+
+
 def main():
     """
     Función principal para ejecutar la optimización cuando se corre el script directamente.
@@ -0,0 +1,87 @@
+# player_grid.py
+# Grilla de jugadores para el optimizador DFS del dashboard.
+# Une en bloque el roster de un juego (API de MLB, con player_id) con los salarios y FPPG
+# cargados en daily_roster, y valida la grilla editada con operaciones vectorizadas
+# antes de pasarla a optimize_lineup.
+
+import unicodedata
+from typing import Dict, List, Tuple
+
+import pandas as pd
+
+PITCHER_POSITIONS = ['P', 'SP', 'RP', 'CP']
+GRID_COLUMNS = ['player_id', 'activo', 'name', 'team', 'position', 'jersey', 'salary', 'fppg', 'en_base']
+
+
+def _name_key(names: pd.Series) -> pd.Series:
+    """Nombre normalizado para cruzar fuentes: sin acentos, minúsculas y espacios simples."""
+    def strip_accents(name: str) -> str:
+        return ''.join(c for c in unicodedata.normalize('NFKD', name) if not unicodedata.combining(c))
+    return (names.fillna('').astype(str).map(strip_accents)
+            .str.lower().str.replace(r'[^a-z0-9 ]', '', regex=True)
+            .str.split().str.join(' '))
+
+
+def build_player_grid(roster: List[Dict], players: List[Dict]) -> pd.DataFrame:
+    """
+    Grilla editable con una fila por bateador del roster (los pitchers no juegan en el showdown).
+    roster: dicts con player_id, name, team, position, jersey (ver mostrar_roster_por_posiciones).
+    players: filas de daily_roster de la fecha (get_players_by_date).
+    salary/fppg se completan desde daily_roster cruzando por nombre (prefiriendo el mismo equipo);
+    en_base indica si el jugador estaba cargado. Los que faltan quedan en 0 para editarlos.
+    """
+    grid = pd.DataFrame(roster, columns=['player_id', 'name', 'team', 'position', 'jersey'])
+    grid = grid[~grid['position'].isin(PITCHER_POSITIONS)].reset_index(drop=True)
+    if grid.empty:
+        return pd.DataFrame(columns=GRID_COLUMNS).set_index('player_id')
+
+    # player_id único aunque el roster venga sin ids (ids negativos de respaldo)
+    missing = grid['player_id'].isna()
+    grid.loc[missing, 'player_id'] = -(grid.index[missing] + 1)
+    grid['player_id'] = grid['player_id'].astype(int)
+    grid = grid.drop_duplicates('player_id')
+    grid['name_key'] = _name_key(grid['name'])
+
+    base = pd.DataFrame(players, columns=['name', 'team', 'salary', 'fppg'])
+    base['name_key'] = _name_key(base['name'])
+    merged = grid.merge(base[['name_key', 'team', 'salary', 'fppg']].rename(columns={'team': 'team_base'}),
+                        on='name_key', how='left')
+    # Nombres repetidos en la base: primero la fila del mismo equipo
+    merged['same_team'] = merged['team_base'] == merged['team']
+    merged = (merged.sort_values('same_team', ascending=False, kind='stable')
+              .drop_duplicates('player_id')
+              .set_index('player_id')
+              .loc[grid['player_id']])
+
+    merged['en_base'] = merged['salary'].notna()
+    merged['salary'] = pd.to_numeric(merged['salary'], errors='coerce').fillna(0).astype(int)
+    merged['fppg'] = pd.to_numeric(merged['fppg'], errors='coerce').fillna(0.0).astype(float)
+    merged['activo'] = True
+    merged['jersey'] = merged['jersey'].fillna('').astype(str)
+    return merged[GRID_COLUMNS[1:]]
+
+
+def validate_player_grid(grid: pd.DataFrame, min_players: int) -> Tuple[List[Dict], List[str]]:
+    """
+    Valida la grilla editada de una vez (sin recorrer fila por fila).
+    Retorna (jugadores activos listos para optimize_lineup, errores). Si hay errores, la lista
+    de jugadores viene vacía.
+    """
+    salary = pd.to_numeric(grid['salary'], errors='coerce')
+    fppg = pd.to_numeric(grid['fppg'], errors='coerce')
+    activos = grid['activo'].fillna(False).astype(bool)
+
+    errores = []
+    invalidos = activos & (salary.isna() | fppg.isna() | (salary <= 0) | (fppg <= 0))
+    if invalidos.any():
+        nombres = ', '.join(grid.loc[invalidos, 'name'].astype(str))
+        errores.append(f"Todos los jugadores activos deben tener FPPG y precio válidos: {nombres}")
+    if activos.sum() < min_players:
+        errores.append(f"Se requieren al menos {min_players} jugadores activos para optimizar. "
+                       f"Tienes {int(activos.sum())}.")
+    if errores:
+        return [], errores
+
+    jugadores = grid.loc[activos].assign(salary=salary[activos].astype(int), fppg=fppg[activos].astype(float))
+    jugadores = jugadores.reset_index()[['player_id', 'name', 'team', 'position', 'salary', 'fppg']]
+    return jugadores.to_dict('records'), []
@@ -0,0 +1,171 @@
+# live_updates.py
+# Seguimiento liviano de los juegos en curso de una fecha.
+# En vez de re-ejecutar todo el dashboard, se consulta el timestamp del feed de cada juego
+# en vivo y solo si cambió se baja su status y linescore (feed recortado con fields).
+# El schedule completo (con linescore hidratado) se pide al inicio y cada
+# SCHEDULE_POLL_INTERVAL para detectar juegos que empiezan.
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+import statsapi
+
+LIVE_POLL_INTERVAL = 30       # segundos mínimos entre consultas de juegos en vivo
+SCHEDULE_POLL_INTERVAL = 300  # segundos entre schedules completos
+LIVE_WORKERS = 8              # juegos en vivo consultados en paralelo
+
+SCHEDULE_FIELDS = (
+    'dates,games,gamePk,gameDate,status,abstractGameState,detailedState,'
+    'teams,away,home,score,linescore,currentInning,inningState'
+)
+# Solo status y linescore del feed en vivo: el juego que termina pasa a Final sin esperar al schedule
+LIVE_FEED_FIELDS = (
+    'gameData,status,abstractGameState,detailedState,'
+    'liveData,linescore,currentInning,inningState,teams,away,home,runs'
+)
+
+
+def _state_from_schedule_game(game: Dict) -> Dict:
+    linescore = game.get('linescore', {})
+    return {
+        'game_id': game['gamePk'],
+        'game_date': game.get('gameDate'),
+        'abstract_state': game.get('status', {}).get('abstractGameState', 'Preview'),
+        'status': game.get('status', {}).get('detailedState', 'Scheduled'),
+        'away_score': game.get('teams', {}).get('away', {}).get('score'),
+        'home_score': game.get('teams', {}).get('home', {}).get('score'),
+        'inning': linescore.get('currentInning'),
+        'inning_state': linescore.get('inningState') or ''
+    }
+
+
+def _score_key(state: Dict) -> tuple:
+    return (state['status'], state['away_score'], state['home_score'], state['inning'], state['inning_state'])
+
+
+class LiveGameTracker:
+    """
+    Estado en vivo (status, score, inning) de los juegos de una fecha, con versión.
+    poll() es seguro de llamar desde varias sesiones a la vez: a lo sumo hace una
+    ronda de requests cada LIVE_POLL_INTERVAL segundos y retorna los game_id que cambiaron.
+    """
+
+    def __init__(self, fecha: str, live_interval: float = LIVE_POLL_INTERVAL,
+                 schedule_interval: float = SCHEDULE_POLL_INTERVAL):
+        self.fecha = fecha
+        self.live_interval = live_interval
+        self.schedule_interval = schedule_interval
+        self.games: Dict[int, Dict] = {}
+        self.version = 0
+        self.game_versions: Dict[int, int] = {}
+        self._timestamps: Dict[int, str] = {}
+        self._last_poll = 0.0
+        self._last_schedule = 0.0
+        self._lock = threading.Lock()
+
+    def _needs_schedule(self, now: float) -> bool:
+        if not self.games or now - self._last_schedule >= self.schedule_interval:
+            return True
+        # Un juego que ya debería haber empezado y sigue en Preview: el schedule trae su nuevo estado
+        utc_now = datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+        return any(g['abstract_state'] == 'Preview' and g.get('game_date') and g['game_date'] <= utc_now
+                   and now - self._last_schedule >= self.live_interval for g in self.games.values())
+
+    def _poll_schedule(self) -> List[Dict]:
+        data = statsapi.get('schedule', {'sportId': 1, 'date': self.fecha, 'hydrate': 'linescore',
+                                         'fields': SCHEDULE_FIELDS})
+        return [_state_from_schedule_game(g) for day in data.get('dates', []) for g in day.get('games', [])]
+
+    def _poll_game(self, game: Dict, last_timestamp: Optional[str]) -> Optional[Tuple[Dict, str]]:
+        """Timestamp del feed de un juego y, si cambió, su status y linescore. None si no cambió."""
+        game_id = game['game_id']
+        try:
+            timestamps = statsapi.get('game_timestamps', {'gamePk': game_id})
+            latest = timestamps[-1] if timestamps else None
+            if latest is not None and latest == last_timestamp:
+                return None
+            feed = statsapi.get('game', {'gamePk': game_id, 'fields': LIVE_FEED_FIELDS})
+            status = feed.get('gameData', {}).get('status', {})
+            linescore = feed.get('liveData', {}).get('linescore', {})
+            teams = linescore.get('teams', {})
+            state = dict(game, abstract_state=status.get('abstractGameState', game['abstract_state']),
+                         status=status.get('detailedState', game['status']),
+                         away_score=teams.get('away', {}).get('runs'),
+                         home_score=teams.get('home', {}).get('runs'),
+                         inning=linescore.get('currentInning'),
+                         inning_state=linescore.get('inningState') or '')
+            return state, latest
+        except Exception as e:
+            print(f"Error actualizando juego en vivo {game_id}: {e}")
+            return None
+
+    def _poll_live(self, games: List[Dict], timestamps: Dict[int, str]) -> List[Tuple[Dict, str]]:
+        """Solo juegos en vivo, en paralelo: retorna (estado, timestamp) de los que cambiaron."""
+        if not games:
+            return []
+        with ThreadPoolExecutor(max_workers=min(LIVE_WORKERS, len(games))) as pool:
+            results = pool.map(lambda g: self._poll_game(g, timestamps.get(g['game_id'])), games)
+            return [r for r in results if r is not None]
+
+    def poll(self, force: bool = False) -> List[int]:
+        """
+        Actualiza el estado si pasó el intervalo mínimo. Retorna los game_id que cambiaron.
+        Los requests se hacen fuera del lock: las demás sesiones no esperan a la API,
+        solo a que se mezclen los estados nuevos.
+        """
+        with self._lock:
+            now = time.time()
+            if not force and now - self._last_poll < self.live_interval:
+                return []
+            self._last_poll = now
+            schedule = force or self._needs_schedule(now)
+            live_games = [dict(g) for g in self.games.values() if g['abstract_state'] == 'Live']
+            timestamps = dict(self._timestamps)
+
+        try:
+            if schedule:
+                updates = [(state, None) for state in self._poll_schedule()]
+            else:
+                updates = self._poll_live(live_games, timestamps)
+        except Exception as e:
+            print(f"Error consultando juegos en vivo de {self.fecha}: {e}")
+            return []
+
+        with self._lock:
+            if schedule:
+                self._last_schedule = time.time()
+            changed = []
+            for state, latest in updates:
+                previous = self.games.get(state['game_id'])
+                if previous is None or _score_key(previous) != _score_key(state) \
+                        or previous['abstract_state'] != state['abstract_state']:
+                    changed.append(state['game_id'])
+                self.games[state['game_id']] = state
+                if latest is not None:
+                    self._timestamps[state['game_id']] = latest
+            if changed:
+                self.version += 1
+                for game_id in changed:
+                    self.game_versions[game_id] = self.version
+            return changed
+
+    def get(self, game_id: int) -> Optional[Dict]:
+        return self.games.get(int(game_id))
+
+    def has_live_games(self) -> bool:
+        return any(g['abstract_state'] != 'Final' for g in self.games.values())
+
+
+_trackers: Dict[str, LiveGameTracker] = {}
+_trackers_lock = threading.Lock()
+
+
+def get_tracker(fecha: str) -> LiveGameTracker:
+    """Tracker compartido por fecha (todas las sesiones del dashboard usan el mismo)."""
+    with _trackers_lock:
+        if fecha not in _trackers:
+            _trackers[fecha] = LiveGameTracker(fecha)
+        return _trackers[fecha]
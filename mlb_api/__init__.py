@@ -0,0 +1,12 @@
+# mlb_api/__init__.py
+# Acceso asíncrono a MLB StatsAPI y stand-in local para pruebas sin red
+
+from .async_client import AsyncMLBClient, fetch_slate_sync
+from .standin_server import StandInMLBServer, point_statsapi_at
+
+__all__ = [
+    'AsyncMLBClient',
+    'fetch_slate_sync',
+    'StandInMLBServer',
+    'point_statsapi_at'
+]
@@ -0,0 +1,149 @@
+# async_client.py
+# Cliente asyncio para los endpoints de MLB StatsAPI que usa el bot
+# (schedule, feed del juego, boxscore, roster y búsqueda de equipos).
+# Reutiliza conexiones con una sola sesión HTTP y limita la concurrencia con un semáforo.
+
+import asyncio
+from typing import Dict, Iterable, List, Optional
+
+import aiohttp
+
+MLB_API_BASE_URL = "https://statsapi.mlb.com/api/"
+DEFAULT_MAX_CONCURRENCY = 10
+DEFAULT_TIMEOUT_S = 15
+
+
+class AsyncMLBClient:
+    """
+    Cliente asíncrono de MLB StatsAPI. Se usa como context manager:
+
+        async with AsyncMLBClient() as client:
+            schedule = await client.schedule('2025-06-26')
+            feeds = await client.game_feeds([g['gamePk'] for g in ...])
+    """
+
+    def __init__(self, base_url: str = MLB_API_BASE_URL, max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+                 timeout_s: float = DEFAULT_TIMEOUT_S):
+        self.base_url = base_url if base_url.endswith('/') else base_url + '/'
+        self.max_concurrency = max_concurrency
+        self.timeout_s = timeout_s
+        self.request_count = 0
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._teams: Optional[List[Dict]] = None
+
+    async def __aenter__(self):
+        await self.open()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def open(self):
+        if self._session is None:
+            connector = aiohttp.TCPConnector(limit=self.max_concurrency, keepalive_timeout=30)
+            self._session = aiohttp.ClientSession(
+                connector=connector, timeout=aiohttp.ClientTimeout(total=self.timeout_s)
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def get(self, path: str, params: Optional[Dict] = None):
+        """GET de un path relativo a la URL base (p. ej. 'v1/schedule'). Retorna el JSON."""
+        if self._session is None:
+            await self.open()
+        query = {k: str(v) for k, v in (params or {}).items() if v is not None}
+        async with self._semaphore:
+            self.request_count += 1
+            async with self._session.get(self.base_url + path, params=query) as resp:
+                resp.raise_for_status()
+                return await resp.json()
+
+    # ---------------------
+    # Endpoints
+    # ---------------------
+
+    async def schedule(self, fecha: str, hydrate: Optional[str] = None, sport_id: int = 1) -> Dict:
+        """Schedule de una fecha ('YYYY-MM-DD')."""
+        return await self.get('v1/schedule', {'sportId': sport_id, 'date': fecha, 'hydrate': hydrate})
+
+    async def game_feed(self, game_pk: int) -> Dict:
+        """Feed completo (live) de un juego."""
+        return await self.get(f'v1.1/game/{game_pk}/feed/live')
+
+    async def boxscore(self, game_pk: int) -> Dict:
+        """Boxscore de un juego."""
+        return await self.get(f'v1/game/{game_pk}/boxscore')
+
+    async def roster(self, team_id: int, roster_type: str = 'active') -> Dict:
+        """Roster de un equipo."""
+        return await self.get(f'v1/teams/{team_id}/roster', {'rosterType': roster_type})
+
+    async def teams(self, season: Optional[int] = None, sport_id: int = 1) -> List[Dict]:
+        """Lista de equipos (se pide una sola vez por cliente)."""
+        if self._teams is None:
+            data = await self.get('v1/teams', {'sportId': sport_id, 'season': season})
+            self._teams = data.get('teams', [])
+        return self._teams
+
+    async def lookup_team(self, lookup_value: str) -> List[Dict]:
+        """Busca equipos por nombre, ciudad o abreviatura (mismo criterio que statsapi.lookup_team)."""
+        value = str(lookup_value).lower()
+        return [
+            team for team in await self.teams()
+            if any(value in str(v).lower() for v in team.values() if not isinstance(v, dict))
+        ]
+
+    # ---------------------
+    # Operaciones en lote
+    # ---------------------
+
+    async def game_feeds(self, game_pks: Iterable[int]) -> Dict[int, Dict]:
+        return await self._gather_by_key(game_pks, self.game_feed)
+
+    async def boxscores(self, game_pks: Iterable[int]) -> Dict[int, Dict]:
+        return await self._gather_by_key(game_pks, self.boxscore)
+
+    async def rosters(self, team_ids: Iterable[int], roster_type: str = 'active') -> Dict[int, Dict]:
+        return await self._gather_by_key(team_ids, lambda tid: self.roster(tid, roster_type))
+
+    async def _gather_by_key(self, keys: Iterable[int], fetch) -> Dict[int, Dict]:
+        """Ejecuta `fetch(key)` para todas las claves de forma concurrente; los errores quedan como excepciones."""
+        keys = list(keys)
+        results = await asyncio.gather(*(fetch(k) for k in keys), return_exceptions=True)
+        return dict(zip(keys, results))
+
+    async def fetch_slate(self, fecha: str, include_feeds: bool = False) -> Dict:
+        """
+        Descarga todo lo necesario para un slate: schedule (con clima), boxscores y
+        rosters de ambos equipos de cada juego, y opcionalmente los feeds completos.
+        """
+        schedule = await self.schedule(fecha, hydrate='weather')
+        games = [g for day in schedule.get('dates', []) for g in day.get('games', [])]
+        game_pks = [g['gamePk'] for g in games]
+        team_ids = sorted({g['teams'][side]['team']['id'] for g in games for side in ('home', 'away')})
+
+        tasks = [self.boxscores(game_pks), self.rosters(team_ids)]
+        if include_feeds:
+            tasks.append(self.game_feeds(game_pks))
+        results = await asyncio.gather(*tasks)
+        return {
+            'date': fecha,
+            'schedule': schedule,
+            'boxscores': results[0],
+            'rosters': results[1],
+            'feeds': results[2] if include_feeds else {},
+        }
+
+
+def fetch_slate_sync(fecha: str, base_url: str = MLB_API_BASE_URL,
+                     max_concurrency: int = DEFAULT_MAX_CONCURRENCY, include_feeds: bool = False) -> Dict:
+    """Atajo síncrono para scripts: ejecuta fetch_slate en un event loop nuevo."""
+    async def _run():
+        async with AsyncMLBClient(base_url, max_concurrency) as client:
+            return await client.fetch_slate(fecha, include_feeds=include_feeds)
+    return asyncio.run(_run())
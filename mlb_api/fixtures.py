@@ -0,0 +1,317 @@
+# fixtures.py
+# Generador determinístico de respuestas sintéticas con la forma de MLB StatsAPI.
+# Lo usa el servidor stand-in para pruebas y benchmarks sin acceso a la red.
+
+import random
+from datetime import datetime
+from typing import Dict, List
+
+TEAMS = [
+    (108, 'Los Angeles Angels', 'Angels', 1),
+    (109, 'Arizona Diamondbacks', 'D-backs', 15),
+    (110, 'Baltimore Orioles', 'Orioles', 2),
+    (111, 'Boston Red Sox', 'Red Sox', 3),
+    (112, 'Chicago Cubs', 'Cubs', 17),
+    (113, 'Cincinnati Reds', 'Reds', 2602),
+    (114, 'Cleveland Guardians', 'Guardians', 5),
+    (115, 'Colorado Rockies', 'Rockies', 19),
+    (116, 'Detroit Tigers', 'Tigers', 2394),
+    (117, 'Houston Astros', 'Astros', 2392),
+    (118, 'Kansas City Royals', 'Royals', 7),
+    (119, 'Los Angeles Dodgers', 'Dodgers', 22),
+    (120, 'Washington Nationals', 'Nationals', 3309),
+    (121, 'New York Mets', 'Mets', 3289),
+    (133, 'Athletics', 'Athletics', 2529),
+    (134, 'Pittsburgh Pirates', 'Pirates', 31),
+    (135, 'San Diego Padres', 'Padres', 2680),
+    (136, 'Seattle Mariners', 'Mariners', 680),
+    (137, 'San Francisco Giants', 'Giants', 2395),
+    (138, 'St. Louis Cardinals', 'Cardinals', 2889),
+    (139, 'Tampa Bay Rays', 'Rays', 12),
+    (140, 'Texas Rangers', 'Rangers', 5325),
+    (141, 'Toronto Blue Jays', 'Blue Jays', 14),
+    (142, 'Minnesota Twins', 'Twins', 3312),
+    (143, 'Philadelphia Phillies', 'Phillies', 2681),
+    (144, 'Atlanta Braves', 'Braves', 4705),
+    (145, 'Chicago White Sox', 'White Sox', 4),
+    (146, 'Miami Marlins', 'Marlins', 4169),
+    (147, 'New York Yankees', 'Yankees', 3313),
+    (158, 'Milwaukee Brewers', 'Brewers', 32),
+]
+TEAMS_BY_ID = {t[0]: t for t in TEAMS}
+DOME_VENUES = {12, 14, 2392, 4169, 32, 680, 5325, 15}
+BATTING_POSITIONS = ['C', '1B', '2B', '3B', 'SS', 'LF', 'CF', 'RF', 'DH']
+PLAYERS_PER_ROSTER = 26
+
+
+def _date_seed(fecha: str) -> int:
+    return int(fecha.replace('-', ''))
+
+
+def game_pk_for(fecha: str, index: int) -> int:
+    """gamePk determinístico para el juego `index` de una fecha."""
+    return (_date_seed(fecha) % 1000000) * 100 + index
+
+
+def _game_date_for(game_pk: int) -> str:
+    # Inverso de game_pk_for: los 6 dígitos altos son yymmdd
+    code = f"{game_pk // 100:06d}"
+    return f"20{code[:2]}-{code[2:4]}-{code[4:6]}"
+
+
+def _matchups(fecha: str, n_games: int) -> List[tuple]:
+    rng = random.Random(_date_seed(fecha))
+    ids = [t[0] for t in TEAMS]
+    rng.shuffle(ids)
+    return [(ids[2 * i], ids[2 * i + 1]) for i in range(min(n_games, len(ids) // 2))]
+
+
+def _team_ref(team_id: int) -> Dict:
+    tid, name, short, venue_id = TEAMS_BY_ID[team_id]
+    return {'id': tid, 'name': name, 'teamName': short, 'shortName': short}
+
+
+def _venue_ref(team_id: int) -> Dict:
+    venue_id = TEAMS_BY_ID[team_id][3]
+    return {'id': venue_id, 'name': f"Stand-in Park {venue_id}"}
+
+
+def _weather(rng: random.Random, venue_id: int) -> Dict:
+    if venue_id in DOME_VENUES:
+        return {'condition': 'Dome', 'temp': '72', 'wind': '0 mph, None'}
+    return {
+        'condition': rng.choice(['Sunny', 'Partly Cloudy', 'Cloudy', 'Clear']),
+        'temp': str(rng.randint(55, 95)),
+        'wind': f"{rng.randint(0, 20)} mph, {rng.choice(['Out To CF', 'In From LF', 'L To R'])}"
+    }
+
+
+def _game_score(game_pk: int) -> tuple:
+    rng = random.Random(game_pk)
+    return rng.randint(0, 10), rng.randint(0, 10)
+
+
+def schedule_payload(fecha: str, n_games: int = 15, status: str = 'Final') -> Dict:
+    """Respuesta de /v1/schedule para una fecha con `n_games` juegos."""
+    rng = random.Random(_date_seed(fecha))
+    games = []
+    for i, (home_id, away_id) in enumerate(_matchups(fecha, n_games)):
+        game_pk = game_pk_for(fecha, i)
+        home_score, away_score = _game_score(game_pk)
+        venue = _venue_ref(home_id)
+        final = status == 'Final'
+        games.append({
+            'gamePk': game_pk,
+            'gameType': 'R',
+            'gameDate': f"{fecha}T{17 + i % 6}:10:00Z",
+            'doubleHeader': 'N',
+            'gameNumber': 1,
+            'status': {
+                'abstractGameState': 'Final' if final else 'Preview',
+                'detailedState': status,
+                'codedGameState': 'F' if final else 'S'
+            },
+            'teams': {
+                'away': {'team': _team_ref(away_id), **({'score': away_score, 'isWinner': away_score > home_score} if final else {})},
+                'home': {'team': _team_ref(home_id), **({'score': home_score, 'isWinner': home_score > away_score} if final else {})},
+            },
+            'venue': venue,
+            'weather': _weather(rng, venue['id']),
+            'linescore': {'currentInning': 9 if final else None, 'inningState': 'End' if final else ''},
+            'content': {},
+        })
+    return {'totalItems': len(games), 'dates': [{'date': fecha, 'games': games}] if games else []}
+
+
+def _player(team_id: int, index: int) -> Dict:
+    pid = team_id * 1000 + index
+    position = 'P' if index >= len(BATTING_POSITIONS) else BATTING_POSITIONS[index]
+    return {
+        'id': pid,
+        'fullName': f"Player {team_id}-{index:02d}",
+        'boxscoreName': f"Player{team_id}{index:02d}",
+        'position': position,
+        'jersey': str(index + 1),
+    }
+
+
+def roster_payload(team_id: int) -> Dict:
+    """Respuesta de /v1/teams/{teamId}/roster."""
+    roster = []
+    for i in range(PLAYERS_PER_ROSTER):
+        p = _player(team_id, i)
+        roster.append({
+            'person': {'id': p['id'], 'fullName': p['fullName']},
+            'jerseyNumber': p['jersey'],
+            'position': {'abbreviation': p['position'], 'type': 'Pitcher' if p['position'] == 'P' else 'Hitter'},
+            'status': {'code': 'A', 'description': 'Active'},
+        })
+    return {'roster': roster, 'teamId': team_id, 'rosterType': 'active'}
+
+
+def teams_payload() -> Dict:
+    """Respuesta de /v1/teams."""
+    teams = []
+    for tid, name, short, venue_id in TEAMS:
+        teams.append({
+            'id': tid, 'name': name, 'teamName': short, 'shortName': short,
+            'teamCode': short[:3].lower(), 'fileCode': short[:3].lower(),
+            'locationName': name.rsplit(' ', 1)[0],
+            'venue': {'id': venue_id, 'name': f"Stand-in Park {venue_id}"},
+        })
+    return {'teams': teams}
+
+
+def venues_payload(venue_ids: List[int]) -> Dict:
+    """Respuesta de /v1/venues hidratada con location y fieldInfo."""
+    venues = []
+    for vid in venue_ids:
+        rng = random.Random(vid)
+        venues.append({
+            'id': vid,
+            'name': f"Stand-in Park {vid}",
+            'location': {'elevation': 5190 if vid == 19 else rng.randint(0, 1100)},
+            'fieldInfo': {
+                'capacity': rng.randint(35000, 50000),
+                'turfType': 'Grass',
+                'roofType': 'Dome' if vid in DOME_VENUES else 'Open',
+                'leftLine': rng.randint(325, 345), 'leftCenter': rng.randint(365, 390),
+                'center': rng.randint(395, 415), 'rightCenter': rng.randint(365, 390),
+                'rightLine': rng.randint(320, 345),
+            },
+        })
+    return {'venues': venues}
+
+
+def _batting_line(rng: random.Random) -> Dict:
+    ab = rng.randint(2, 5)
+    h = rng.randint(0, ab)
+    return {
+        'atBats': ab, 'runs': rng.randint(0, h), 'hits': h, 'doubles': 0, 'triples': 0,
+        'homeRuns': rng.randint(0, min(h, 1)), 'rbi': rng.randint(0, h), 'stolenBases': 0,
+        'baseOnBalls': rng.randint(0, 1), 'strikeOuts': rng.randint(0, ab - h),
+        'leftOnBase': rng.randint(0, 3), 'note': '',
+    }
+
+
+def _pitching_line(rng: random.Random, outs: int) -> Dict:
+    return {
+        'inningsPitched': f"{outs // 3}.{outs % 3}", 'hits': rng.randint(0, 6),
+        'runs': rng.randint(0, 4), 'earnedRuns': rng.randint(0, 3), 'baseOnBalls': rng.randint(0, 3),
+        'strikeOuts': rng.randint(0, 8), 'homeRuns': rng.randint(0, 2),
+        'numberOfPitches': 15 * outs // 3 + rng.randint(0, 15), 'pitchesThrown': 0, 'strikes': 0,
+        'note': '',
+    }
+
+
+def _side_boxscore(team_id: int, runs: int, rng: random.Random) -> tuple:
+    players = {}
+    player_info = {}
+    batters, pitchers = [], []
+    for i in range(len(BATTING_POSITIONS)):
+        p = _player(team_id, i)
+        players[f"ID{p['id']}"] = {
+            'person': {'id': p['id'], 'fullName': p['fullName']},
+            'position': {'abbreviation': p['position']},
+            'battingOrder': str((i + 1) * 100),
+            'stats': {'batting': _batting_line(rng), 'pitching': {}},
+            'seasonStats': {'batting': {'avg': '.250', 'ops': '.720', 'obp': '.320', 'slg': '.400'},
+                            'pitching': {'era': '-.--'}},
+        }
+        player_info[f"ID{p['id']}"] = {'id': p['id'], 'fullName': p['fullName'], 'boxscoreName': p['boxscoreName']}
+        batters.append(p['id'])
+    for j, outs in enumerate((18, 6, 3)):
+        p = _player(team_id, len(BATTING_POSITIONS) + j)
+        players[f"ID{p['id']}"] = {
+            'person': {'id': p['id'], 'fullName': p['fullName']},
+            'position': {'abbreviation': 'P'},
+            'stats': {'batting': {}, 'pitching': _pitching_line(rng, outs)},
+            'seasonStats': {'batting': {}, 'pitching': {'era': '3.75'}},
+        }
+        player_info[f"ID{p['id']}"] = {'id': p['id'], 'fullName': p['fullName'], 'boxscoreName': p['boxscoreName']}
+        pitchers.append(p['id'])
+    side = {
+        'team': _team_ref(team_id),
+        'teamStats': {
+            'batting': {'atBats': 34, 'runs': runs, 'hits': 8, 'homeRuns': 1, 'rbi': runs,
+                        'baseOnBalls': 3, 'strikeOuts': 8, 'leftOnBase': 6, 'doubles': 1,
+                        'triples': 0, 'stolenBases': 0, 'avg': '.235', 'obp': '.300', 'slg': '.380', 'ops': '.680'},
+            'pitching': {'inningsPitched': '9.0', 'hits': 8, 'runs': runs, 'earnedRuns': runs,
+                         'baseOnBalls': 3, 'strikeOuts': 8, 'homeRuns': 1},
+        },
+        'players': players,
+        'batters': batters,
+        'pitchers': pitchers,
+        'note': [],
+        'info': [],
+    }
+    return side, player_info
+
+
+def _teams_for_game(game_pk: int) -> tuple:
+    fecha = _game_date_for(game_pk)
+    index = game_pk % 100
+    matchups = _matchups(fecha, 15)
+    return matchups[index % len(matchups)]
+
+
+def boxscore_payload(game_pk: int) -> Dict:
+    """Respuesta de /v1/game/{gamePk}/boxscore."""
+    home_id, away_id = _teams_for_game(game_pk)
+    home_runs, away_runs = _game_score(game_pk)
+    rng = random.Random(game_pk)
+    home, _ = _side_boxscore(home_id, home_runs, rng)
+    away, _ = _side_boxscore(away_id, away_runs, rng)
+    return {'teams': {'home': home, 'away': away}, 'info': [], 'officials': []}
+
+
+def game_feed_payload(game_pk: int) -> Dict:
+    """Respuesta de /v1.1/game/{gamePk}/feed/live."""
+    home_id, away_id = _teams_for_game(game_pk)
+    home_runs, away_runs = _game_score(game_pk)
+    rng = random.Random(game_pk)
+    home, home_info = _side_boxscore(home_id, home_runs, rng)
+    away, away_info = _side_boxscore(away_id, away_runs, rng)
+    venue = _venue_ref(home_id)
+    return {
+        'gamePk': game_pk,
+        'metaData': {'timeStamp': '20250101_000000'},
+        'gameData': {
+            'game': {'pk': game_pk, 'id': f"stand-in/{game_pk}"},
+            'status': {'abstractGameState': 'Final', 'detailedState': 'Final'},
+            'teams': {'home': _team_ref(home_id), 'away': _team_ref(away_id)},
+            'players': {**home_info, **away_info},
+            'venue': venue,
+            'weather': _weather(rng, venue['id']),
+        },
+        'liveData': {
+            'boxscore': {'teams': {'home': home, 'away': away}, 'info': []},
+            'linescore': linescore_payload(game_pk),
+        },
+    }
+
+
+def linescore_payload(game_pk: int) -> Dict:
+    """Respuesta de /v1/game/{gamePk}/linescore."""
+    home_runs, away_runs = _game_score(game_pk)
+    return {
+        'currentInning': 9,
+        'inningState': 'End',
+        'teams': {'home': {'runs': home_runs}, 'away': {'runs': away_runs}},
+    }
+
+
+def seasons_payload() -> Dict:
+    """Respuesta de /v1/seasons/all (solo la temporada en curso)."""
+    year = datetime.now().year
+    return {'seasons': [{
+        'seasonId': str(year),
+        'regularSeasonStartDate': f"{year}-03-27",
+        'regularSeasonEndDate': f"{year}-09-28",
+        'seasonEndDate': f"{year}-11-01",
+    }]}
+
+
+def timestamps_payload(game_pk: int) -> List[str]:
+    """Respuesta de /v1.1/game/{gamePk}/feed/live/timestamps."""
+    return ['20250101_000000']
@@ -0,0 +1,205 @@
+# standin_server.py
+# Servidor HTTP local que imita los endpoints de MLB StatsAPI que usa el bot.
+# Sirve fixtures grabados (si existen en fixtures_dir) o respuestas sintéticas
+# determinísticas, con latencia opcional para simular la API real.
+#
+# Uso:
+#     python -m mlb_api.standin_server --port 8765 --latency-ms 80
+
+import argparse
+import json
+import os
+import re
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+from urllib.parse import parse_qs, urlparse
+
+from mlb_api import fixtures
+
+ROUTES = [
+    ('schedule', re.compile(r'^/api/v1/schedule/?$')),
+    ('timestamps', re.compile(r'^/api/v1\.1/game/(?P<game_pk>\d+)/feed/live/timestamps/?$')),
+    ('game_feed', re.compile(r'^/api/v1\.1/game/(?P<game_pk>\d+)/feed/live/?$')),
+    ('boxscore', re.compile(r'^/api/v1/game/(?P<game_pk>\d+)/boxscore/?$')),
+    ('linescore', re.compile(r'^/api/v1/game/(?P<game_pk>\d+)/linescore/?$')),
+    ('roster', re.compile(r'^/api/v1/teams/(?P<team_id>\d+)/roster/?$')),
+    ('teams', re.compile(r'^/api/v1/teams/?$')),
+    ('venues', re.compile(r'^/api/v1/venues/?$')),
+    ('seasons', re.compile(r'^/api/v1/seasons(/all)?/?$')),
+]
+
+
+class StandInMLBServer:
+    """
+    Stand-in de MLB StatsAPI en 127.0.0.1. Se usa como context manager:
+
+        with StandInMLBServer(latency_ms=50) as server:
+            client = AsyncMLBClient(base_url=server.base_url)
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, fixtures_dir: Optional[str] = None,
+                 games_per_day: int = 15, latency_ms: float = 0.0):
+        self.fixtures_dir = fixtures_dir
+        self.games_per_day = games_per_day
+        self.latency_ms = latency_ms
+        self.request_counts: Counter = Counter()
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/api/"
+
+    def start(self) -> 'StandInMLBServer':
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    # ---------------------
+    # Resolución de respuestas
+    # ---------------------
+
+    def _fixture(self, key: str):
+        if not self.fixtures_dir:
+            return None
+        path = os.path.join(self.fixtures_dir, f"{key}.json")
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        return None
+
+    def _status_for(self, fecha: str) -> str:
+        today = datetime.now().strftime('%Y-%m-%d')
+        return 'Final' if fecha < today else 'Scheduled'
+
+    def _schedule(self, query: Dict[str, str]):
+        if 'date' in query:
+            fecha = query['date']
+            return self._fixture(f"schedule_{fecha}") or fixtures.schedule_payload(
+                fecha, self.games_per_day, self._status_for(fecha))
+        game_pks = query.get('gamePk') or query.get('gamePks') or ''
+        games = []
+        for pk in [int(p) for p in game_pks.split(',') if p]:
+            fecha = fixtures._game_date_for(pk)
+            payload = fixtures.schedule_payload(fecha, self.games_per_day, self._status_for(fecha))
+            games.extend(g for day in payload['dates'] for g in day['games'] if g['gamePk'] == pk)
+        return {'totalItems': len(games), 'dates': [{'date': '', 'games': games}] if games else []}
+
+    def resolve(self, path: str, query: Dict[str, str]):
+        """Retorna (route, payload) para una ruta, o (None, None) si no existe."""
+        for route, pattern in ROUTES:
+            match = pattern.match(path)
+            if not match:
+                continue
+            args = match.groupdict()
+            if route == 'schedule':
+                return route, self._schedule(query)
+            if route == 'timestamps':
+                return route, fixtures.timestamps_payload(int(args['game_pk']))
+            if route == 'game_feed':
+                pk = int(args['game_pk'])
+                return route, self._fixture(f"game_feed_{pk}") or fixtures.game_feed_payload(pk)
+            if route == 'boxscore':
+                pk = int(args['game_pk'])
+                return route, self._fixture(f"boxscore_{pk}") or fixtures.boxscore_payload(pk)
+            if route == 'linescore':
+                return route, fixtures.linescore_payload(int(args['game_pk']))
+            if route == 'roster':
+                team_id = int(args['team_id'])
+                return route, self._fixture(f"roster_{team_id}") or fixtures.roster_payload(team_id)
+            if route == 'teams':
+                return route, self._fixture('teams') or fixtures.teams_payload()
+            if route == 'venues':
+                ids = [int(v) for v in query.get('venueIds', '').split(',') if v]
+                return route, fixtures.venues_payload(ids)
+            if route == 'seasons':
+                return route, fixtures.seasons_payload()
+        return None, None
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                parsed = urlparse(self.path)
+                query = {k: v[-1] for k, v in parse_qs(parsed.query).items()}
+                route, payload = server.resolve(parsed.path, query)
+                with server._lock:
+                    server.request_counts[route or 'not_found'] += 1
+                if server.latency_ms:
+                    time.sleep(server.latency_ms / 1000.0)
+                if route is None:
+                    body = json.dumps({'message': f"Ruta no soportada: {parsed.path}"}).encode()
+                    self.send_response(404)
+                else:
+                    body = json.dumps(payload).encode()
+                    self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+def point_statsapi_at(base_url: str):
+    """
+    Redirige las llamadas síncronas de `statsapi` a otra URL base (por ejemplo el stand-in).
+    Retorna una función que restaura las URLs originales.
+    """
+    import statsapi
+
+    original = {name: ep['url'] for name, ep in statsapi.ENDPOINTS.items()}
+    for name, ep in statsapi.ENDPOINTS.items():
+        ep['url'] = ep['url'].replace(statsapi.BASE_URL, base_url)
+
+    def restore():
+        for name, url in original.items():
+            statsapi.ENDPOINTS[name]['url'] = url
+
+    return restore
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stand-in local de MLB StatsAPI")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--fixtures-dir', default=None)
+    parser.add_argument('--games-per-day', type=int, default=15)
+    parser.add_argument('--latency-ms', type=float, default=0.0)
+    args = parser.parse_args(argv)
+
+    server = StandInMLBServer(port=args.port, fixtures_dir=args.fixtures_dir,
+                              games_per_day=args.games_per_day, latency_ms=args.latency_ms)
+    print(f"Stand-in MLB StatsAPI escuchando en {server.base_url}")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
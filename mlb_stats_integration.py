@@ -1,11 +1,15 @@
 import statsapi
 import pandas as pd
-from sklearn.ensemble import RandomForestRegressor
 import numpy as np
 from typing import List, Dict
 import os
 from datetime import datetime, timedelta
 import random
+import threading
+import time
+from boxscore_parser import ColumnarBoxscoreParser, parse_boxscore
+from data_manager.venues import get_venue, upsert_venues, venues_loaded_for_season
+from team_feature_store import load_shared
 
 # =====================
 # Extracción de datos MLB
@@ -78,13 +82,33 @@ TEAM_NAME_MAP = {
     'Washington Nationals': 'Nationals',
 }
 
+# Cache del CSV de Baseball Reference: se relee solo si cambia la fecha de modificación del archivo
+_bref_cache: Dict[str, tuple] = {}
+_bref_lock = threading.Lock()
+
+def load_bref_table(path: str = None) -> pd.DataFrame:
+    """Tabla de stats de equipos de Baseball Reference, leída una vez por versión del archivo."""
+    path = path or BREF_CSV
+    mtime = os.path.getmtime(path)
+    with _bref_lock:
+        cached = _bref_cache.get(path)
+        if cached is None or cached[0] != mtime:
+            cached = (mtime, pd.read_csv(path))
+            _bref_cache[path] = cached
+        return cached[1]
+
+def invalidate_bref_table():
+    """Fuerza a releer el CSV de Baseball Reference en la próxima consulta."""
+    with _bref_lock:
+        _bref_cache.clear()
+
 def get_team_stats_bref(team_name: str) -> dict:
     """
     Obtiene estadísticas reales de un equipo desde el CSV de Baseball Reference 2025.
     Retorna un diccionario con stats relevantes para Over/Under.
     """
     try:
-        df = pd.read_csv(BREF_CSV)
+        df = load_bref_table()
         # Usar el nombre mapeado si existe
         bref_name = TEAM_NAME_MAP.get(team_name, team_name)
         # Normalizar nombre de equipo para buscar
@@ -96,15 +120,18 @@ def get_team_stats_bref(team_name: str) -> dict:
             raise ValueError(f"No se encontró el equipo {team_name} (mapeado: {bref_name}) en el CSV de Baseball Reference.")
         row = team_row.iloc[0]
         # Calcular stats clave
-        avg_runs = float(row['R']) / float(row['G']) if float(row['G']) > 0 else 4.0
+        # El export actual separa bateo y pitcheo (R_bat, G_bat); los viejos usaban R y G
+        runs = float(row['R'] if 'R' in row else row['R_bat'])
+        games = float(row['G'] if 'G' in row else row['G_bat'])
+        avg_runs = runs / games if games > 0 else 4.0
         era = float(row['ERA'])
         whip = float(row['WHIP'])
         return {
             'avg_runs': round(avg_runs, 2),
             'era': round(era, 2),
             'whip': round(whip, 2),
-            'total_runs': int(row['R']),
-            'games_played': int(row['G'])
+            'total_runs': int(runs),
+            'games_played': int(games)
         }
     except Exception as e:
         print(f"Error obteniendo stats de Baseball Reference para {team_name}: {e}")
@@ -119,8 +146,12 @@ def get_match_real_stats(game: dict) -> dict:
     home_stats = get_team_stats_bref(game['home_name'])
     away_stats = get_team_stats_bref(game['away_name'])
     match_data = {
+        'game_id': game.get('game_id'),
         'home_team': game['home_name'],
         'away_team': game['away_name'],
+        # ids y fecha: al servir, apply_serving_features los usa para las features del store
+        'home_id': game.get('home_id'),
+        'away_id': game.get('away_id'),
         'game_date': game.get('game_date', ''),
         'venue': game.get('venue_name', ''),
         # Stats reales de ambos equipos
@@ -131,13 +162,58 @@ def get_match_real_stats(game: dict) -> dict:
         'home_whip': home_stats['whip'],
         'away_whip': away_stats['whip'],
         # Información adicional
-        'home_total_runs': home_stats['total_runs'],
-        'away_total_runs': away_stats['total_runs'],
-        'home_games_played': home_stats['games_played'],
-        'away_games_played': away_stats['games_played']
+        'home_total_runs': home_stats.get('total_runs'),
+        'away_total_runs': away_stats.get('total_runs'),
+        'home_games_played': home_stats.get('games_played'),
+        'away_games_played': away_stats.get('games_played')
     }
     return match_data
 
+def serving_match_features(game: Dict, fecha: str = None, feature_store=None, team_stats: Dict = None) -> Dict:
+    """
+    Stats de equipo de un juego para servir predicciones, del mismo origen que el entrenamiento:
+    con el team feature store (load_shared) las point-in-time a `fecha` por home_id/away_id,
+    como retrain_daily; sin store, las de Baseball Reference por home_name/away_name.
+    team_stats (equipo -> stats de Baseball Reference) evita volver a buscarlas.
+    """
+    store = feature_store if feature_store is not None else load_shared()
+    if store is not None and fecha and game.get('home_id') is not None and game.get('away_id') is not None:
+        # Import local: over_under_model importa este módulo
+        from over_under_model import OverUnderModel
+        return store.match_features(fecha, int(game['home_id']), int(game['away_id']),
+                                    defaults=OverUnderModel.FEATURE_DEFAULTS)
+    if team_stats is not None:
+        home = team_stats.get(game['home_name'], {})
+        away = team_stats.get(game['away_name'], {})
+    else:
+        home = get_team_stats_bref(game['home_name'])
+        away = get_team_stats_bref(game['away_name'])
+    return {
+        'home_avg_runs': home.get('avg_runs'),
+        'away_avg_runs': away.get('avg_runs'),
+        'home_era': home.get('era'),
+        'away_era': away.get('era'),
+        'home_whip': home.get('whip'),
+        'away_whip': away.get('whip')
+    }
+
+def apply_serving_features(games: List[Dict]) -> List[Dict]:
+    """
+    Para los pedidos por juegos (servicio, API, predict_over_under): si el store está cargado,
+    las stats de equipo de cada juego con home_id, away_id y fecha ('date' o 'game_date')
+    salen de serving_match_features. Sin store, o sin esos datos, el juego queda como vino.
+    """
+    store = load_shared()
+    if store is None:
+        return games
+    result = []
+    for game in games:
+        fecha = str(game.get('date') or game.get('game_date') or '')[:10]
+        if fecha and game.get('home_id') is not None and game.get('away_id') is not None:
+            game = dict(game, **serving_match_features(game, fecha, store))
+        result.append(game)
+    return result
+
 # =====================
 # NUEVAS FUNCIONES PARA EL SPRINT
 # =====================
@@ -145,83 +221,179 @@ def get_match_real_stats(game: dict) -> dict:
 def get_player_game_stats(game_id: str) -> Dict:
     """
     Extrae estadísticas por jugador de un juego específico.
-    Retorna diccionario con stats por player_id.
+    Retorna diccionario con stats de bateo por player_id.
     """
     try:
         boxscore = statsapi.boxscore_data(game_id)
-        player_stats = {}
-        
-        # Procesar jugadores home
-        if 'home' in boxscore and 'players' in boxscore['home']:
-            for player_id, player_data in boxscore['home']['players'].items():
-                if 'stats' in player_data and 'batting' in player_data['stats']:
-                    batting_stats = player_data['stats']['batting']
-                    player_stats[player_id] = {
-                        'name': player_data.get('person', {}).get('fullName', ''),
-                        'team': boxscore['home'].get('teamName', ''),
-                        'ab': batting_stats.get('atBats', 0),
-                        'h': batting_stats.get('hits', 0),
-                        'hr': batting_stats.get('homeRuns', 0),
-                        'r': batting_stats.get('runs', 0),
-                        'rbi': batting_stats.get('rbi', 0),
-                        'bb': batting_stats.get('baseOnBalls', 0),
-                        'so': batting_stats.get('strikeOuts', 0),
-                        'sb': batting_stats.get('stolenBases', 0),
-                        'obp': batting_stats.get('obp', 0.0),
-                        'slg': batting_stats.get('slg', 0.0)
-                    }
-        
-        # Procesar jugadores away
-        if 'away' in boxscore and 'players' in boxscore['away']:
-            for player_id, player_data in boxscore['away']['players'].items():
-                if 'stats' in player_data and 'batting' in player_data['stats']:
-                    batting_stats = player_data['stats']['batting']
-                    player_stats[player_id] = {
-                        'name': player_data.get('person', {}).get('fullName', ''),
-                        'team': boxscore['away'].get('teamName', ''),
-                        'ab': batting_stats.get('atBats', 0),
-                        'h': batting_stats.get('hits', 0),
-                        'hr': batting_stats.get('homeRuns', 0),
-                        'r': batting_stats.get('runs', 0),
-                        'rbi': batting_stats.get('rbi', 0),
-                        'bb': batting_stats.get('baseOnBalls', 0),
-                        'so': batting_stats.get('strikeOuts', 0),
-                        'sb': batting_stats.get('stolenBases', 0),
-                        'obp': batting_stats.get('obp', 0.0),
-                        'slg': batting_stats.get('slg', 0.0)
-                    }
-        
-        return player_stats
+        bateo = parse_boxscore(boxscore, game_id)['batting']
+        registros = bateo.drop(columns=['player_id', 'game_id', 'date']).to_dict('records')
+        return {f"ID{pid}": stats for pid, stats in zip(bateo['player_id'], registros)}
     except Exception as e:
         print(f"Error obteniendo stats del juego {game_id}: {e}")
         return {}
 
+# =====================
+# Estadios y clima
+# =====================
+
+# Cache de clima por juego para el slate: game_id -> (timestamp, datos)
+WEATHER_CACHE_TTL = 600  # 10 minutos
+_weather_cache: Dict[int, tuple] = {}
+_venues_checked_season = None
+_venues_lock = threading.Lock()
+
+def _parse_venue(venue: Dict, season: int) -> Dict:
+    """Convierte un venue de la API (hidratado con location y fieldInfo) a una fila de la tabla."""
+    field_info = venue.get('fieldInfo', {})
+    location = venue.get('location', {})
+    return {
+        'venue_id': venue.get('id'),
+        'name': venue.get('name', 'Unknown'),
+        'roof_type': field_info.get('roofType', 'Open'),
+        'turf_type': field_info.get('turfType'),
+        'altitude_ft': location.get('elevation'),
+        'capacity': field_info.get('capacity'),
+        'left_line': field_info.get('leftLine'),
+        'left_center': field_info.get('leftCenter'),
+        'center': field_info.get('center'),
+        'right_center': field_info.get('rightCenter'),
+        'right_line': field_info.get('rightLine'),
+        'season': season
+    }
+
+def fetch_venues(venue_ids: List[int], season: int) -> List[Dict]:
+    """Descarga en una sola llamada los atributos de los estadios indicados."""
+    data = statsapi.get('venue', {
+        'venueIds': ','.join(str(v) for v in venue_ids),
+        'season': season,
+        'hydrate': 'location,fieldInfo'
+    })
+    return [_parse_venue(v, season) for v in data.get('venues', [])]
+
+def refresh_venue_table(season: int = None) -> int:
+    """
+    Pobla la tabla de estadios con los parques locales de los 30 equipos.
+    Pensado para correr una vez por temporada. Retorna la cantidad de estadios guardados.
+    """
+    season = season or datetime.now().year
+    teams = statsapi.get('teams', {'sportId': 1, 'season': season}).get('teams', [])
+    venue_ids = sorted({t['venue']['id'] for t in teams if t.get('venue', {}).get('id')})
+    if not venue_ids:
+        return 0
+    venues = fetch_venues(venue_ids, season)
+    upsert_venues(venues)
+    return len(venues)
+
+def ensure_venue_table(season: int = None):
+    """
+    Pobla la tabla de estadios si todavía no tiene datos de la temporada (una vez por proceso).
+    Los hilos del backfill y del slate que llegan a la vez esperan un solo refresh.
+    """
+    global _venues_checked_season
+    season = season or datetime.now().year
+    if _venues_checked_season == season:
+        return
+    with _venues_lock:
+        if _venues_checked_season == season:
+            return
+        try:
+            if not venues_loaded_for_season(season):
+                refresh_venue_table(season)
+            _venues_checked_season = season
+        except Exception as e:
+            print(f"Error poblando tabla de estadios: {e}")
+
+def get_venue_info(venue_id: int) -> Dict:
+    """
+    Retorna los atributos de un estadio desde la tabla local.
+    Si el estadio no está (p. ej. sede neutral), lo descarga una vez y lo guarda.
+    """
+    ensure_venue_table()
+    venue = get_venue(venue_id)
+    if venue is None:
+        venues = fetch_venues([venue_id], datetime.now().year)
+        if venues:
+            upsert_venues(venues)
+            venue = venues[0]
+    return venue or {}
+
+def _parse_temp_celsius(temp) -> float:
+    """La API reporta la temperatura en °F como string ('72'); se convierte a °C."""
+    try:
+        return round((float(temp) - 32) * 5 / 9, 1)
+    except (TypeError, ValueError):
+        return 20.0
+
+def _parse_wind_kph(wind) -> float:
+    """La API reporta el viento como '8 mph, Out To CF'; se convierte a km/h."""
+    try:
+        return round(float(str(wind).split()[0]) * 1.609, 1)
+    except (TypeError, ValueError, IndexError):
+        return 0.0
+
+def _weather_from_schedule_game(game: Dict) -> Dict:
+    weather = game.get('weather', {})
+    return {
+        'venue_id': game.get('venue', {}).get('id'),
+        'stadium_name': game.get('venue', {}).get('name', 'Unknown'),
+        'temp_celsius': _parse_temp_celsius(weather.get('temp')),
+        'wind_kph': _parse_wind_kph(weather.get('wind')),
+        'conditions': weather.get('condition', 'Unknown')
+    }
+
+def _fetch_schedule_weather(params: Dict) -> Dict[int, Dict]:
+    """Descarga el clima de uno o varios juegos desde el schedule hidratado y lo guarda en cache."""
+    query = {'sportId': 1, 'hydrate': 'weather'}
+    query.update(params)
+    data = statsapi.get('schedule', query)
+    now = time.time()
+    weather_by_game = {}
+    for day in data.get('dates', []):
+        for game in day.get('games', []):
+            weather_by_game[game['gamePk']] = _weather_from_schedule_game(game)
+            _weather_cache[game['gamePk']] = (now, weather_by_game[game['gamePk']])
+    return weather_by_game
+
+def get_slate_weather(fecha: str) -> Dict[int, Dict]:
+    """
+    Obtiene el clima de todos los juegos de una fecha en una sola llamada al schedule.
+    El resultado queda en cache para que get_weather_and_stadium no haga más requests.
+    """
+    try:
+        return _fetch_schedule_weather({'date': fecha})
+    except Exception as e:
+        print(f"Error obteniendo clima del slate {fecha}: {e}")
+        return {}
+
 def get_weather_and_stadium(game_id: str) -> Dict:
     """
     Obtiene información del clima y estadio para un juego específico.
     Retorna diccionario con temp, wind, conditions, stadium_name, is_dome.
+    Los atributos del estadio salen de la tabla local de venues y el clima del
+    cache del slate (o de un schedule liviano del juego si no está en cache).
     """
     try:
-        # Obtener información del juego
-        game_data = statsapi.get('game', {'gamePk': game_id})
-        venue_info = game_data.get('gameData', {}).get('venue', {})
-        
-        # Información del estadio
-        stadium_name = venue_info.get('name', 'Unknown')
-        is_dome = venue_info.get('indoor', False)
-        
-        # Información del clima (si está disponible)
-        weather_info = game_data.get('gameData', {}).get('weather', {})
-        temp_celsius = weather_info.get('temp', 20)  # Default 20°C
-        wind_kph = weather_info.get('wind', {}).get('speed', {}).get('value', 0)
-        conditions = weather_info.get('condition', 'Unknown')
-        
+        game_pk = int(game_id)
+        cached = _weather_cache.get(game_pk)
+        if cached and time.time() - cached[0] < WEATHER_CACHE_TTL:
+            weather = cached[1]
+        else:
+            weather = _fetch_schedule_weather({'gamePk': game_pk})[game_pk]
+
+        venue = get_venue_info(weather['venue_id']) if weather.get('venue_id') else {}
+        roof_type = venue.get('roof_type', 'Open')
+        # Los techos retráctiles solo cuentan como domo cuando el reporte indica techo cerrado
+        is_dome = roof_type == 'Dome' or weather['conditions'] in ('Dome', 'Roof Closed')
+
         return {
-            'stadium_name': stadium_name,
+            'stadium_name': venue.get('name') or weather['stadium_name'],
             'is_dome': is_dome,
-            'temp_celsius': temp_celsius,
-            'wind_kph': wind_kph,
-            'conditions': conditions
+            'temp_celsius': weather['temp_celsius'],
+            'wind_kph': weather['wind_kph'],
+            'conditions': weather['conditions'],
+            'venue_id': weather.get('venue_id'),
+            'roof_type': roof_type,
+            'altitude_ft': venue.get('altitude_ft')
         }
     except Exception as e:
         print(f"Error obteniendo clima/estadio para juego {game_id}: {e}")
@@ -233,35 +405,64 @@ def get_weather_and_stadium(game_id: str) -> Dict:
             'conditions': 'Unknown'
         }
 
+def get_weather_table(game_ids) -> pd.DataFrame:
+    """
+    Tabla de clima indexada por game_id (temp_celsius, wind_kph, is_dome) para un grupo de juegos.
+    Llamar antes a get_slate_weather(fecha) deja todo en cache y evita requests por juego.
+    """
+    rows = {}
+    for game_id in pd.unique(pd.Series(list(game_ids), dtype=object).dropna()):
+        try:
+            game_pk = int(game_id)
+        except (TypeError, ValueError):
+            continue
+        weather = get_weather_and_stadium(game_pk)
+        rows[game_pk] = {
+            'temp_celsius': weather.get('temp_celsius', 20),
+            'wind_kph': weather.get('wind_kph', 0),
+            'is_dome': 1 if weather.get('is_dome', False) else 0
+        }
+    table = pd.DataFrame.from_dict(rows, orient='index', columns=['temp_celsius', 'wind_kph', 'is_dome'])
+    table.index.name = 'game_id'
+    return table
+
 def update_daily_player_stats(fecha: str) -> str:
     """
     Genera/actualiza archivo CSV con stats diarios de jugadores.
-    Retorna ruta del archivo generado.
+    Las líneas de bateo van a data/player_stats_daily_*.csv y las de pitcheo
+    a data/pitcher_stats_daily_*.csv.
+    Retorna ruta del archivo de bateo generado.
     """
     try:
         # Obtener juegos del día
         juegos = statsapi.schedule(date=fecha)
-        all_player_stats = []
-        
+        parser = ColumnarBoxscoreParser()
+
         for juego in juegos:
             game_id = juego['game_id']
-            player_stats = get_player_game_stats(game_id)
-            
-            for player_id, stats in player_stats.items():
-                stats['date'] = fecha
-                stats['game_id'] = game_id
-                all_player_stats.append(stats)
-        
-        # Crear DataFrame y guardar
-        if all_player_stats:
-            df = pd.DataFrame(all_player_stats)
-            os.makedirs('data', exist_ok=True)
-            filename = f"data/player_stats_daily_{fecha.replace('-', '')}.csv"
-            df.to_csv(filename, index=False)
-            return filename
-        else:
+            try:
+                parser.add_game(statsapi.boxscore_data(game_id), game_id, fecha)
+            except Exception as e:
+                print(f"Error obteniendo stats del juego {game_id}: {e}")
+
+        tablas = parser.to_frames()
+        bateo = tablas['batting']
+        pitcheo = tablas['pitching']
+
+        # Guardar tablas
+        if bateo.empty:
             return ""
-            
+        os.makedirs('data', exist_ok=True)
+        fecha_compacta = fecha.replace('-', '')
+        filename = f"data/player_stats_daily_{fecha_compacta}.csv"
+        # Mismo orden de columnas que el CSV original (..., date, game_id); player_id va al final
+        columnas = [c for c in bateo.columns if c not in ('player_id', 'game_id', 'date')]
+        columnas += ['date', 'game_id', 'player_id']
+        bateo[columnas].to_csv(filename, index=False)
+        if not pitcheo.empty:
+            pitcheo.to_csv(f"data/pitcher_stats_daily_{fecha_compacta}.csv", index=False)
+        return filename
+
     except Exception as e:
         print(f"Error actualizando stats diarios para {fecha}: {e}")
         return ""
@@ -270,59 +471,17 @@ def update_daily_player_stats(fecha: str) -> str:
 # Modelo de predicción Over/Under
 # =====================
 
-class OverUnderPredictor:
-    """
-    Modelo simple para predecir el total de carreras en un partido MLB.
-    Usa RandomForestRegressor como ejemplo.
-    """
-    def __init__(self):
-        self.model = RandomForestRegressor(n_estimators=50, random_state=42)
-        self.is_trained = False
-
-    def fit(self, X, y):
-        self.model.fit(X, y)
-        self.is_trained = True
-
-    def predict(self, match_data):
-        """
-        match_data: dict con features del partido
-        """
-        X = pd.DataFrame([match_data])
-        # Selecciona solo las columnas numéricas relevantes
-        features = ['home_avg_runs', 'away_avg_runs', 'home_era', 'away_era', 'home_whip', 'away_whip']
-        return float(self.model.predict(X[features])[0])
-
-# Instancia global para demo
-predictor = OverUnderPredictor()
-
-def train_over_under_model():
-    """
-    Entrena el modelo con datos simulados (en producción usar históricos reales).
-    """
-    np.random.seed(42)
-    n = 200
-    X = pd.DataFrame({
-        'home_avg_runs': np.random.uniform(3, 6, n),
-        'away_avg_runs': np.random.uniform(3, 6, n),
-        'home_era': np.random.uniform(3, 5, n),
-        'away_era': np.random.uniform(3, 5, n),
-        'home_whip': np.random.uniform(1.1, 1.4, n),
-        'away_whip': np.random.uniform(1.1, 1.4, n),
-    })
-    y = (
-        X['home_avg_runs'] + X['away_avg_runs']
-        + np.random.normal(0, 1, n)
-    )
-    predictor.fit(X, y)
-
-# Entrena el modelo al importar el módulo
-train_over_under_model()
-
 def predict_over_under(match_data):
     """
     Recibe un dict con datos de partido y retorna la predicción de carreras totales.
+    Usa el modelo Over/Under unificado (vía servicio de predicciones si está corriendo).
     """
-    return predictor.predict(match_data)
+    # Import local: prediction_service -> over_under_model importa este módulo
+    from prediction_service import predict_games
+    prediction = predict_games([match_data])[0]
+    if prediction['linea_predicha'] is None:
+        raise ValueError(f"No se pudo predecir el juego {match_data.get('game_id', '')}")
+    return float(prediction['linea_predicha'])
 
 # =====================
 # Ejemplo de flujo principal
@@ -0,0 +1,196 @@
+# model_registry.py
+# Registro versionado de modelos entrenados.
+# Cada versión vive en models/registry/<version>/ con el artefacto joblib sin comprimir
+# (se carga con mmap_mode sin descomprimir, más rápido; los nodos de los árboles igual se
+# copian a memoria de cada proceso al reconstruirlos) y un metadata.json con features, ventana de entrenamiento, métricas y hash SHA-256.
+# El archivo LATEST apunta a la versión vigente y permite hacer hot-swap sin reiniciar.
+#
+# Uso:
+#     python model_registry.py list
+#     python model_registry.py load [--version 20250626_031500] [--no-mmap]
+
+import argparse
+import hashlib
+import json
+import os
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+REGISTRY_DIR = os.path.join('models', 'registry')
+ARTIFACT_NAME = 'model.joblib'
+METADATA_NAME = 'metadata.json'
+LATEST_NAME = 'LATEST'
+
+
+def process_rss_mb() -> Optional[float]:
+    """Memoria residente (RSS) actual del proceso en MB, o None si no se puede medir."""
+    try:
+        with open('/proc/self/statm') as f:
+            resident_pages = int(f.read().split()[1])
+        return round(resident_pages * os.sysconf('SC_PAGE_SIZE') / 1024 ** 2, 1)
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+        import sys
+        # ru_maxrss es el pico (KB en Linux, bytes en macOS); sirve como aproximación
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return round(maxrss / (1024 ** 2 if sys.platform == 'darwin' else 1024), 1)
+    except Exception:
+        return None
+
+
+def _sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _version_dir(version: str, registry_dir: str) -> str:
+    return os.path.join(registry_dir, version)
+
+
+def _new_version_id(registry_dir: str) -> str:
+    version = datetime.now().strftime('%Y%m%d_%H%M%S')
+    candidate, n = version, 1
+    while os.path.exists(_version_dir(candidate, registry_dir)):
+        candidate = f"{version}_{n}"
+        n += 1
+    return candidate
+
+
+def save_version(model, metadata: Dict, registry_dir: str = REGISTRY_DIR,
+                 set_latest: bool = True) -> Dict:
+    """
+    Guarda un modelo como nueva versión del registro y (por defecto) la marca como LATEST.
+    metadata puede incluir 'features', 'training_window', 'metrics' y cualquier dato extra.
+    Retorna el metadata final (con version, created_at, sha256 y size_mb).
+    """
+    version = _new_version_id(registry_dir)
+    version_dir = _version_dir(version, registry_dir)
+    os.makedirs(version_dir, exist_ok=True)
+
+    import joblib  # se importa al guardar/cargar: run_metrics y el backfill solo usan process_rss_mb
+
+    artifact = os.path.join(version_dir, ARTIFACT_NAME)
+    # Sin compresión: es requisito para poder cargarlo con mmap_mode
+    joblib.dump(model, artifact, compress=0)
+
+    record = dict(metadata)
+    record.update({
+        'version': version,
+        'created_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'artifact': ARTIFACT_NAME,
+        'sha256': _sha256(artifact),
+        'size_mb': round(os.path.getsize(artifact) / 1024 ** 2, 2)
+    })
+    with open(os.path.join(version_dir, METADATA_NAME), 'w') as f:
+        json.dump(record, f, indent=2, default=str)
+
+    if set_latest:
+        set_latest_version(version, registry_dir)
+    return record
+
+
+def set_latest_version(version: str, registry_dir: str = REGISTRY_DIR):
+    """Actualiza el puntero LATEST de forma atómica (escritura a temporal + rename)."""
+    if not os.path.exists(os.path.join(_version_dir(version, registry_dir), ARTIFACT_NAME)):
+        raise ValueError(f"La versión {version} no existe en {registry_dir}")
+    tmp_path = os.path.join(registry_dir, f".{LATEST_NAME}.tmp")
+    with open(tmp_path, 'w') as f:
+        f.write(version)
+    os.replace(tmp_path, os.path.join(registry_dir, LATEST_NAME))
+
+
+def latest_version(registry_dir: str = REGISTRY_DIR) -> Optional[str]:
+    """Versión apuntada por LATEST, o None si el registro está vacío."""
+    try:
+        with open(os.path.join(registry_dir, LATEST_NAME)) as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+
+def get_metadata(version: str, registry_dir: str = REGISTRY_DIR) -> Dict:
+    with open(os.path.join(_version_dir(version, registry_dir), METADATA_NAME)) as f:
+        return json.load(f)
+
+
+def list_versions(registry_dir: str = REGISTRY_DIR) -> List[Dict]:
+    """Metadata de todas las versiones del registro, de la más nueva a la más antigua."""
+    if not os.path.isdir(registry_dir):
+        return []
+    versions = []
+    for name in sorted(os.listdir(registry_dir), reverse=True):
+        if os.path.exists(os.path.join(registry_dir, name, METADATA_NAME)):
+            versions.append(get_metadata(name, registry_dir))
+    return versions
+
+
+def load_version(version: Optional[str] = None, registry_dir: str = REGISTRY_DIR,
+                 mmap: bool = True, verify: bool = False) -> Tuple[object, Dict, Dict]:
+    """
+    Carga una versión del registro (LATEST por defecto).
+    Con mmap=True joblib lee los arreglos memory-mapped en vez de copiarlos del archivo;
+    sklearn igual copia los nodos de cada árbol al reconstruirlo, así que no se comparten
+    páginas entre procesos: la ganancia es el tiempo de carga.
+    Con verify=True se comprueba el SHA-256 del artefacto antes de cargarlo.
+    Retorna (modelo, metadata, load_stats) con load_stats = {load_s, rss_before_mb, rss_after_mb, mmap}.
+    """
+    version = version or latest_version(registry_dir)
+    if version is None:
+        raise FileNotFoundError(f"No hay versiones en el registro {registry_dir}")
+    metadata = get_metadata(version, registry_dir)
+    artifact = os.path.join(_version_dir(version, registry_dir), metadata.get('artifact', ARTIFACT_NAME))
+    if verify and _sha256(artifact) != metadata.get('sha256'):
+        raise ValueError(f"El hash del artefacto {artifact} no coincide con su metadata")
+
+    import joblib
+
+    rss_before = process_rss_mb()
+    start = time.perf_counter()
+    model = joblib.load(artifact, mmap_mode='r' if mmap else None)
+    load_stats = {
+        'version': version,
+        'load_s': round(time.perf_counter() - start, 4),
+        'rss_before_mb': rss_before,
+        'rss_after_mb': process_rss_mb(),
+        'mmap': mmap
+    }
+    return model, metadata, load_stats
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Registro de versiones de modelos")
+    parser.add_argument('--registry', default=REGISTRY_DIR)
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('list', help="Lista las versiones registradas")
+    load_parser = sub.add_parser('load', help="Carga una versión y reporta tiempo y RSS")
+    load_parser.add_argument('--version', default=None)
+    load_parser.add_argument('--no-mmap', action='store_true')
+    load_parser.add_argument('--verify', action='store_true')
+    promote_parser = sub.add_parser('promote', help="Apunta LATEST a una versión")
+    promote_parser.add_argument('version')
+    args = parser.parse_args(argv)
+
+    if args.command == 'list':
+        latest = latest_version(args.registry)
+        for meta in list_versions(args.registry):
+            marker = '*' if meta['version'] == latest else ' '
+            print(f"{marker} {meta['version']}  {meta.get('size_mb')} MB  "
+                  f"window={meta.get('training_window')}  metrics={meta.get('metrics')}")
+    elif args.command == 'load':
+        _, metadata, stats = load_version(args.version, args.registry, mmap=not args.no_mmap,
+                                          verify=args.verify)
+        print(json.dumps(stats, indent=2))
+    elif args.command == 'promote':
+        set_latest_version(args.version, args.registry)
+        print(f"LATEST -> {args.version}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,115 @@
+# over_under_distribution.py
+# Distribución discreta del total de carreras por juego.
+# Se arma una sola vez por slate (mezcla de Poisson sobre las predicciones de cada árbol)
+# y luego P(over), P(under) y P(push) de cualquier línea salen de búsquedas en la CDF,
+# sin volver a ejecutar el modelo.
+
+import numpy as np
+import pandas as pd
+from typing import Dict, List
+
+# Total máximo representado; el último bucket acumula "MAX_RUNS o más"
+MAX_RUNS = 30
+
+
+def poisson_mixture_pmf(tree_matrix: np.ndarray, max_runs: int = MAX_RUNS) -> np.ndarray:
+    """
+    PMF (juegos x 0..max_runs) de una mezcla uniforme de Poisson, una por árbol,
+    con media igual a la predicción de ese árbol. tree_matrix tiene forma (árboles x juegos).
+    """
+    tree_matrix = np.atleast_2d(np.asarray(tree_matrix, dtype=float))
+    n_games = tree_matrix.shape[1]
+    k = np.arange(max_runs + 1, dtype=float)
+    log_factorial = np.concatenate(([0.0], np.cumsum(np.log(k[1:]))))
+
+    pmf = np.zeros((n_games, max_runs + 1))
+    for lam in tree_matrix:
+        lam = np.clip(lam, 1e-6, None)[:, None]
+        pmf += np.exp(k * np.log(lam) - lam - log_factorial)
+    pmf /= len(tree_matrix)
+    # La cola (más de max_runs carreras) se suma al último bucket para que cada fila sume 1
+    pmf[:, -1] += np.clip(1.0 - pmf.sum(axis=1), 0.0, None)
+    return pmf
+
+
+class TotalRunsDistribution:
+    """
+    Distribución del total de carreras para todos los juegos de un slate.
+    Las filas con pmf NaN corresponden a juegos que no se pudieron predecir.
+    """
+
+    def __init__(self, game_ids: List, pmf: np.ndarray):
+        self.game_ids = list(game_ids)
+        self.pmf = np.asarray(pmf, dtype=float)
+        self.cdf = np.cumsum(self.pmf, axis=1)
+        self.max_runs = self.pmf.shape[1] - 1
+
+    @classmethod
+    def from_tree_matrix(cls, game_ids: List, tree_matrix: np.ndarray,
+                         max_runs: int = MAX_RUNS) -> 'TotalRunsDistribution':
+        return cls(game_ids, poisson_mixture_pmf(tree_matrix, max_runs))
+
+    def __len__(self) -> int:
+        return len(self.game_ids)
+
+    def expected_runs(self) -> np.ndarray:
+        return self.pmf @ np.arange(self.max_runs + 1)
+
+    def _cdf_at(self, runs: np.ndarray) -> np.ndarray:
+        """P(total <= runs) por celda; runs tiene forma (juegos x líneas)."""
+        idx = np.clip(runs, 0, self.max_runs).astype(int)
+        values = np.take_along_axis(self.cdf, idx, axis=1)
+        return np.where(runs < 0, 0.0, values)
+
+    def probability_table(self, lines) -> Dict[str, np.ndarray]:
+        """
+        Probabilidades over/under/push para varias líneas.
+        lines puede ser un escalar, un arreglo (n_lineas,) aplicado a todos los juegos, o una
+        matriz (juegos x n_lineas). Retorna matrices (juegos x n_lineas) 'over', 'under' y 'push'.
+        """
+        lines = np.asarray(lines, dtype=float)
+        if lines.ndim < 2:
+            lines = np.broadcast_to(np.atleast_1d(lines), (len(self), np.atleast_1d(lines).size))
+
+        # under = P(total < línea); push solo existe en líneas enteras
+        under = self._cdf_at(np.ceil(lines) - 1)
+        is_integer = np.isclose(lines, np.round(lines))
+        push = np.where(is_integer, self._cdf_at(np.round(lines)) - under, 0.0)
+        push[np.isnan(under)] = np.nan
+        over = 1.0 - under - push
+        return {'over': over, 'under': under, 'push': push}
+
+    def probabilities(self, lines) -> Dict[str, np.ndarray]:
+        """
+        Probabilidades de una línea por juego (escalar o arreglo de largo n_juegos).
+        Líneas NaN (juego sin línea oficial) producen probabilidades NaN.
+        """
+        lines = np.broadcast_to(np.asarray(lines, dtype=float), (len(self),))
+        table = self.probability_table(np.nan_to_num(lines)[:, None])
+        missing = np.isnan(lines)
+        return {key: np.where(missing, np.nan, values[:, 0]) for key, values in table.items()}
+
+    def to_frame(self, lines) -> pd.DataFrame:
+        """DataFrame largo game_id / line / p_over / p_under / p_push para una lista de líneas."""
+        lines = np.atleast_1d(np.asarray(lines, dtype=float))
+        table = self.probability_table(lines)
+        return pd.DataFrame({
+            'game_id': np.repeat(np.asarray(self.game_ids, dtype=object), len(lines)),
+            'line': np.tile(lines, len(self)),
+            'p_over': table['over'].ravel(),
+            'p_under': table['under'].ravel(),
+            'p_push': table['push'].ravel()
+        })
+
+    def save(self, path: str):
+        np.savez_compressed(path, game_ids=np.asarray(self.game_ids, dtype=str), pmf=self.pmf)
+
+    @classmethod
+    def load(cls, path: str) -> 'TotalRunsDistribution':
+        with np.load(path) as data:
+            return cls(data['game_ids'].tolist(), data['pmf'])
+
+
+def empty_distribution(n_games: int, max_runs: int = MAX_RUNS) -> np.ndarray:
+    """PMF NaN para juegos sin predicción."""
+    return np.full((n_games, max_runs + 1), np.nan)
@@ -1,36 +1,111 @@
 import pandas as pd
 import numpy as np
-from sklearn.ensemble import RandomForestRegressor
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import mean_absolute_error, mean_squared_error
 import pickle
 import os
+import threading
+import time
 from datetime import datetime, timedelta
-from typing import Dict, List
+from typing import Dict, List, Tuple
 import statsapi
-from mlb_stats_integration import get_match_real_stats, get_weather_and_stadium
+from mlb_stats_integration import get_match_real_stats, get_weather_and_stadium, get_slate_weather, get_weather_table
+from over_under_distribution import MAX_RUNS, TotalRunsDistribution, empty_distribution, poisson_mixture_pmf
+from model_registry import REGISTRY_DIR, latest_version, load_version, process_rss_mb, save_version
+from data_manager.db import DB_PATH
+from data_manager.over_under_store import load_training_frame
+from run_metrics import maybe_stage
+
+def _random_forest(**params):
+    # sklearn se importa al construir un modelo: módulos que solo usan create_over_under_dataset
+    # (backfill) no lo cargan
+    from sklearn.ensemble import RandomForestRegressor
+    return RandomForestRegressor(**params)
+
+def _mae_rmse(y_true, y_pred) -> Tuple[float, float]:
+    error = np.asarray(y_pred, dtype=float) - np.asarray(y_true, dtype=float)
+    return float(np.mean(np.abs(error))), float(np.sqrt(np.mean(error ** 2)))
+
+def time_ordered_split(df: pd.DataFrame, feature_columns: List[str], test_size: float = 0.2):
+    """
+    Split train/test por fecha: las fechas más recientes (aprox. test_size de los juegos)
+    van a test. Una misma fecha nunca queda repartida entre train y test.
+    Con una sola fecha (ej. el slate de un día) no hay orden temporal que respetar y se
+    usa un split aleatorio.
+    """
+    if df['date'].nunique() < 2:
+        from sklearn.model_selection import train_test_split
+        return train_test_split(df[feature_columns], df['total_runs'], test_size=test_size, random_state=42)
+    ordered = df.sort_values('date', kind='stable')
+    dates = ordered['date'].to_numpy()
+    cut = dates[min(int(len(ordered) * (1 - test_size)), len(ordered) - 1)]
+    is_test = dates >= cut
+    if is_test.all():
+        is_test = dates > dates[0]
+    train, test = ordered[~is_test], ordered[is_test]
+    return train[feature_columns], test[feature_columns], train['total_runs'], test['total_runs']
 
 class OverUnderModel:
-    def __init__(self, model_path: str = "models/over_under_model.pkl"):
+    FEATURE_COLUMNS = [
+        'home_avg_runs', 'away_avg_runs', 'home_era', 'away_era',
+        'home_whip', 'away_whip', 'temp_celsius', 'wind_kph', 'is_dome'
+    ]
+    # Valores por defecto cuando el juego no trae la stat o no hay clima disponible
+    FEATURE_DEFAULTS = {
+        'home_avg_runs': 4.0, 'away_avg_runs': 4.0, 'home_era': 4.0, 'away_era': 4.0,
+        'home_whip': 1.3, 'away_whip': 1.3, 'temp_celsius': 20, 'wind_kph': 0, 'is_dome': 0
+    }
+    WEATHER_COLUMNS = ['temp_celsius', 'wind_kph', 'is_dome']
+    # Percentiles de las predicciones por árbol usados como intervalo de la línea
+    INTERVAL_PERCENTILES = (10, 90)
+    # Cada cuántos segundos se revisa el puntero LATEST del registro para hacer hot-swap
+    REGISTRY_CHECK_INTERVAL = 30
+    # Hiperparámetros por defecto del RandomForest (tune_over_under.py puede reemplazarlos)
+    DEFAULT_PARAMS = {'n_estimators': 100, 'max_depth': 10, 'random_state': 42, 'n_jobs': -1}
+    # Re-entrenamiento incremental: árboles nuevos por corrida y tope del ensamble
+    TREES_PER_UPDATE = 10
+    MAX_TREES = 300
+
+    def __init__(self, model_path: str = "models/over_under_model.pkl", registry_dir: str = REGISTRY_DIR,
+                 model_params: Dict = None):
         self.model_path = model_path
-        self.model = RandomForestRegressor(
-            n_estimators=100,
-            max_depth=10,
-            random_state=42,
-            n_jobs=-1
-        )
+        self.registry_dir = registry_dir
+        self.model_params = dict(self.DEFAULT_PARAMS, **(model_params or {}))
+        self.version = None
+        self.metadata = {}
+        self.load_stats = {}
+        self._last_registry_check = 0.0
+        self.model = _random_forest(**self.model_params)
         self.is_trained = False
-        self.feature_columns = [
-            'home_avg_runs', 'away_avg_runs', 'home_era', 'away_era',
-            'home_whip', 'away_whip', 'temp_celsius', 'wind_kph', 'is_dome'
-        ]
+        self.feature_columns = list(self.FEATURE_COLUMNS)
         self.load_model()
 
-    def load_model(self) -> bool:
+    def load_model(self, version: str = None) -> bool:
+        """
+        Carga la versión LATEST del registro (memory-mapped). Si el registro está vacío,
+        usa el pickle legacy de model_path. El tiempo de carga y el RSS quedan en self.load_stats.
+        """
         try:
+            if version or latest_version(self.registry_dir):
+                model, metadata, stats = load_version(version, self.registry_dir)
+                self.model, self.metadata, self.load_stats = model, metadata, stats
+                self.version = metadata['version']
+                if metadata.get('model_params'):
+                    self.model_params = dict(self.DEFAULT_PARAMS, **metadata['model_params'])
+                self.is_trained = True
+                print(f"Modelo {self.version} cargado desde el registro en {stats['load_s']}s "
+                      f"(RSS {stats['rss_after_mb']} MB)")
+                return True
             if os.path.exists(self.model_path):
+                rss_before = process_rss_mb()
+                start = time.perf_counter()
                 with open(self.model_path, 'rb') as f:
                     self.model = pickle.load(f)
+                self.load_stats = {
+                    'version': None,
+                    'load_s': round(time.perf_counter() - start, 4),
+                    'rss_before_mb': rss_before,
+                    'rss_after_mb': process_rss_mb(),
+                    'mmap': False
+                }
                 self.is_trained = True
                 print(f"Modelo cargado desde {self.model_path}")
                 return True
@@ -38,17 +113,43 @@ class OverUnderModel:
             print(f"Error cargando modelo: {e}")
         return False
 
-    def save_model(self) -> bool:
+    def save_model(self, metadata: Dict = None) -> bool:
+        """
+        Guarda el modelo como nueva versión del registro y la deja como LATEST.
+        metadata agrega datos como training_window o metrics a los que se registran siempre.
+        """
         try:
-            os.makedirs(os.path.dirname(self.model_path), exist_ok=True)
-            with open(self.model_path, 'wb') as f:
-                pickle.dump(self.model, f)
-            print(f"Modelo guardado en {self.model_path}")
+            record = {
+                'model_class': type(self.model).__name__,
+                'features': self.feature_columns,
+                'model_params': self.model_params,
+                'params': {k: v for k, v in self.model.get_params().items()
+                           if isinstance(v, (int, float, str, bool, type(None)))}
+            }
+            record.update(metadata or {})
+            self.metadata = save_version(self.model, record, self.registry_dir)
+            self.version = self.metadata['version']
+            print(f"Modelo guardado como versión {self.version} en {self.registry_dir}")
             return True
         except Exception as e:
             print(f"Error guardando modelo: {e}")
             return False
 
+    def refresh_if_newer(self, force: bool = False) -> bool:
+        """
+        Hot-swap: si LATEST apunta a otra versión, la carga y reemplaza el modelo en memoria.
+        La revisión se hace como máximo cada REGISTRY_CHECK_INTERVAL segundos salvo force=True.
+        Retorna True si se cambió de versión.
+        """
+        now = time.time()
+        if not force and now - self._last_registry_check < self.REGISTRY_CHECK_INTERVAL:
+            return False
+        self._last_registry_check = now
+        latest = latest_version(self.registry_dir)
+        if latest is None or latest == self.version:
+            return False
+        return self.load_model(latest)
+
     def prepare_features(self, match_data: Dict) -> pd.DataFrame:
         weather_data = get_weather_and_stadium(match_data.get('game_id', ''))
         features = {
@@ -64,22 +165,45 @@ class OverUnderModel:
         }
         return pd.DataFrame([features])
 
-    def fit_over_under_model(self, df: pd.DataFrame) -> Dict:
+    def fit_over_under_model(self, df: pd.DataFrame, save: bool = True, metadata: Dict = None) -> Dict:
+        """
+        Ajuste completo con split train/test. Con save=True registra la versión como LATEST;
+        metadata se agrega a la metadata de la versión (ej. synthetic=True).
+        """
         try:
             if 'total_runs' not in df.columns:
                 print("Error: df debe contener columna 'total_runs'")
                 return {'success': False, 'error': 'Missing total_runs column'}
             X = df[self.feature_columns]
             y = df['total_runs']
-            X_train, X_test, y_train, y_test = train_test_split(
-                X, y, test_size=0.2, random_state=42
-            )
+            if 'date' in df.columns and df['date'].notna().all():
+                # Split temporal: el 20% más reciente de las fechas queda como test (sin fuga de futuro)
+                X_train, X_test, y_train, y_test = time_ordered_split(df, self.feature_columns, test_size=0.2)
+            else:
+                from sklearn.model_selection import train_test_split
+                X_train, X_test, y_train, y_test = train_test_split(
+                    X, y, test_size=0.2, random_state=42
+                )
+            # Estimador nuevo: un modelo cargado puede venir con warm_start del re-entrenamiento incremental
+            self.model = _random_forest(**self.model_params)
             self.model.fit(X_train, y_train)
             self.is_trained = True
             y_pred = self.model.predict(X_test)
-            mae = mean_absolute_error(y_test, y_pred)
-            rmse = np.sqrt(mean_squared_error(y_test, y_pred))
-            self.save_model()
+            mae, rmse = _mae_rmse(y_test, y_pred)
+            training_window = None
+            if 'date' in df.columns and df['date'].notna().any():
+                training_window = [str(df['date'].min()), str(df['date'].max())]
+            record = {
+                'training_window': training_window,
+                'n_rows': int(len(df)),
+                'metrics': {'mae': float(mae), 'rmse': float(rmse)}
+            }
+            record.update(metadata or {})
+            if save:
+                self.save_model(record)
+            else:
+                # Solo en memoria: no reemplaza la versión LATEST del registro
+                self.version, self.metadata = None, record
             return {
                 'success': True,
                 'mae': mae,
@@ -90,53 +214,243 @@ class OverUnderModel:
             print(f"Error entrenando modelo: {e}")
             return {'success': False, 'error': str(e)}
 
-    def predict_over_under(self, juegos_df: pd.DataFrame) -> List[Dict]:
+    def update_incremental(self, train_df: pd.DataFrame, new_trees: int = TREES_PER_UPDATE,
+                           max_trees: int = MAX_TREES, full_refit: bool = False, seed: int = None) -> Dict:
+        """
+        Actualiza el modelo con la ventana de entrenamiento actual sin re-entrenar todo:
+        agrega new_trees árboles (warm start) entrenados solo con train_df y descarta los
+        más viejos por encima de max_trees, así el ensamble sigue a la ventana deslizante.
+        Solo hace warm start sobre una versión producida por un re-entrenamiento anterior
+        (metadata con 'update'); sobre el modelo sintético de arranque, un pickle legacy o
+        con full_refit=True hace un ajuste completo.
+        seed es el random_state de los árboles nuevos: con el ensamble en max_trees, un
+        random_state fijo repetiría las mismas semillas todas las noches.
+        No guarda el modelo; retorna un resumen con el modo usado y el tiempo de ajuste.
+        """
+        from sklearn.ensemble import RandomForestRegressor
+        X = train_df[self.feature_columns].to_numpy(dtype=np.float32)
+        y = train_df['total_runs'].to_numpy(dtype=np.float32)
+        can_warm_start = (
+            self.is_trained and not full_refit
+            and 'update' in self.metadata and not self.metadata.get('synthetic')
+            and isinstance(self.model, RandomForestRegressor)
+            and getattr(self.model, 'n_features_in_', None) == len(self.feature_columns)
+        )
+        start = time.perf_counter()
+        if can_warm_start:
+            mode = 'warm_start'
+            self.model.set_params(warm_start=True, n_estimators=len(self.model.estimators_) + new_trees)
+            if seed is not None:
+                self.model.set_params(random_state=seed)
+            self.model.fit(X, y)
+            if len(self.model.estimators_) > max_trees:
+                self.model.estimators_ = self.model.estimators_[-max_trees:]
+                self.model.n_estimators = max_trees
+        else:
+            mode = 'full'
+            self.model = _random_forest(**self.model_params)
+            self.model.fit(X, y)
+            self.model.set_params(warm_start=True)
+        self.is_trained = True
+        return {
+            'mode': mode,
+            'n_estimators': len(self.model.estimators_),
+            'train_rows': int(len(X)),
+            'fit_s': round(time.perf_counter() - start, 3)
+        }
+
+    def prepare_features_batch(self, juegos_df: pd.DataFrame,
+                               weather_df: pd.DataFrame = None) -> Tuple[pd.DataFrame, pd.Series]:
+        """
+        Arma la matriz de features de todo el slate en un solo paso.
+        weather_df es una tabla de clima indexada por game_id (ver get_weather_table);
+        si no se pasa, cada fila usa sus columnas de clima de juegos_df y solo las filas
+        que no las tienen completas se buscan en el cache del clima del slate.
+        Retorna (features, errores): errores tiene el motivo por fila, o '' si la fila es válida.
+        """
+        features = pd.DataFrame(index=juegos_df.index)
+        for col in self.feature_columns:
+            if col in self.WEATHER_COLUMNS:
+                continue
+            if col in juegos_df.columns:
+                features[col] = pd.to_numeric(juegos_df[col], errors='coerce')
+            else:
+                features[col] = float(self.FEATURE_DEFAULTS[col])
+
+        if 'game_id' in juegos_df.columns:
+            game_keys = pd.to_numeric(juegos_df['game_id'], errors='coerce').astype('Int64')
+        else:
+            game_keys = pd.Series(pd.NA, index=juegos_df.index, dtype='Int64')
+        # El clima puede venir ya en juegos_df (p. ej. desde slate_bundle). Se decide por fila:
+        # una fila sin clima (otro cliente en el mismo lote) no cambia las features de las demás
+        inline = pd.DataFrame({col: pd.to_numeric(juegos_df[col], errors='coerce')
+                               if col in juegos_df.columns else pd.Series(np.nan, index=juegos_df.index)
+                               for col in self.WEATHER_COLUMNS})
+        has_inline = inline.notna().all(axis=1) if weather_df is None else pd.Series(False, index=juegos_df.index)
+        if weather_df is None:
+            missing_keys = game_keys[~has_inline].dropna()
+            weather_df = get_weather_table(missing_keys) if len(missing_keys) else pd.DataFrame()
+        for col in self.WEATHER_COLUMNS:
+            if col in weather_df.columns:
+                looked_up = pd.to_numeric(game_keys.map(weather_df[col]), errors='coerce')
+            else:
+                looked_up = pd.Series(np.nan, index=juegos_df.index)
+            values = inline[col].where(has_inline, looked_up)
+            features[col] = values.astype(float).fillna(self.FEATURE_DEFAULTS[col])
+
+        features = features[self.feature_columns].astype(float)
+        invalid = ~np.isfinite(features.to_numpy())
+        errors = pd.Series('', index=juegos_df.index, dtype=object)
+        for i in np.flatnonzero(invalid.any(axis=1)):
+            bad = [col for col, flag in zip(self.feature_columns, invalid[i]) if flag]
+            errors.iloc[i] = f"features no numéricas: {', '.join(bad)}"
+        return features, errors
+
+    def _predict_slate(self, juegos_df: pd.DataFrame, weather_df: pd.DataFrame = None,
+                       max_runs: int = None) -> Dict:
+        """
+        Predicción vectorizada del slate, común a predict_over_under y predict_distribution.
+        Con max_runs también arma la distribución de carreras (pmf) de cada juego válido.
+        """
         if not self.is_trained:
+            # Modelo sintético solo en memoria: no se registra como LATEST
             print("Modelo no entrenado. Ejecutando entrenamiento básico...")
             self._train_basic_model()
-        predictions = []
-        for _, juego in juegos_df.iterrows():
+
+        features, errors = self.prepare_features_batch(juegos_df, weather_df)
+        valid = (errors == '').to_numpy()
+        stats = {key: np.full(len(features), np.nan) for key in ('linea', 'std', 'p_low', 'p_high')}
+        stats['confidence'] = np.zeros(len(features))
+        pmf = empty_distribution(len(features), max_runs) if max_runs is not None else None
+        if valid.any():
             try:
-                match_data = {
-                    'home_avg_runs': juego.get('home_avg_runs', 4.0),
-                    'away_avg_runs': juego.get('away_avg_runs', 4.0),
-                    'home_era': juego.get('home_era', 4.0),
-                    'away_era': juego.get('away_era', 4.0),
-                    'home_whip': juego.get('home_whip', 1.3),
-                    'away_whip': juego.get('away_whip', 1.3),
-                    'game_id': juego.get('game_id', '')
-                }
-                features = self.prepare_features(match_data)
-                prediction = float(self.model.predict(features)[0])
-                predictions.append({
-                    'game_id': juego.get('game_id', ''),
-                    'home_team': juego.get('home_team', ''),
-                    'away_team': juego.get('away_team', ''),
-                    'linea_predicha': round(prediction, 1),
-                    'linea_oficial': juego.get('over_under', None),
-                    'confidence': self._calculate_confidence(features)
-                })
+                valid_stats = self._ensemble_stats(features[valid])
+                for key in stats:
+                    stats[key][valid] = valid_stats[key]
+                if pmf is not None:
+                    pmf[valid] = poisson_mixture_pmf(valid_stats['matrix'], max_runs)
             except Exception as e:
-                print(f"Error prediciendo juego {juego.get('game_id', '')}: {e}")
-                predictions.append({
-                    'game_id': juego.get('game_id', ''),
-                    'home_team': juego.get('home_team', ''),
-                    'away_team': juego.get('away_team', ''),
-                    'linea_predicha': None,
-                    'linea_oficial': juego.get('over_under', None),
-                    'confidence': 0.0
-                })
+                print(f"Error prediciendo slate Over/Under: {e}")
+                errors[valid] = str(e)
+                valid[:] = False
+        for game_id, error in zip(self._column(juegos_df, 'game_id', ''), errors):
+            if error:
+                print(f"Error prediciendo juego {game_id}: {error}")
+        return {'stats': stats, 'valid': valid, 'pmf': pmf}
+
+    @staticmethod
+    def _column(juegos_df: pd.DataFrame, name: str, default) -> List:
+        return juegos_df[name].tolist() if name in juegos_df.columns else [default] * len(juegos_df)
+
+    def predict_over_under(self, juegos_df: pd.DataFrame, weather_df: pd.DataFrame = None,
+                           include_probabilities: bool = False) -> List[Dict]:
+        """
+        Predice la línea de carreras de todos los juegos del slate con una sola llamada al modelo.
+        Los juegos con features inválidas se reportan con linea_predicha None sin afectar al resto.
+        Con include_probabilities=True agrega p_over, p_under y p_push a la línea oficial.
+        """
+        if juegos_df.empty:
+            return []
+        result = self._predict_slate(juegos_df, weather_df, MAX_RUNS if include_probabilities else None)
+        return self._predictions(juegos_df, result, include_probabilities)
+
+    def predict_with_distribution(self, juegos_df: pd.DataFrame, weather_df: pd.DataFrame = None,
+                                  include_probabilities: bool = False,
+                                  max_runs: int = MAX_RUNS) -> Tuple[List[Dict], TotalRunsDistribution]:
+        """
+        predict_over_under y predict_distribution con una sola pasada del modelo: quien guarda
+        el slate (slate_bundle) después responde cualquier línea alternativa desde la CDF.
+        """
+        game_ids = self._column(juegos_df, 'game_id', '')
+        if juegos_df.empty:
+            return [], TotalRunsDistribution(game_ids, empty_distribution(0, max_runs))
+        result = self._predict_slate(juegos_df, weather_df, max_runs)
+        return (self._predictions(juegos_df, result, include_probabilities),
+                TotalRunsDistribution(game_ids, result['pmf']))
+
+    def _predictions(self, juegos_df: pd.DataFrame, result: Dict, include_probabilities: bool) -> List[Dict]:
+        stats, valid = result['stats'], result['valid']
+
+        lineas_oficiales = self._column(juegos_df, 'over_under', None)
+        if include_probabilities:
+            distribution = TotalRunsDistribution(self._column(juegos_df, 'game_id', ''), result['pmf'])
+            probs = distribution.probabilities(pd.to_numeric(pd.Series(lineas_oficiales, dtype=object),
+                                                             errors='coerce').to_numpy(dtype=float))
+
+        predictions = []
+        rows = zip(self._column(juegos_df, 'game_id', ''), self._column(juegos_df, 'home_team', ''),
+                   self._column(juegos_df, 'away_team', ''), lineas_oficiales, stats['linea'],
+                   stats['std'], stats['p_low'], stats['p_high'], stats['confidence'], valid)
+        for i, (game_id, home_team, away_team, linea_oficial, pred, std, p_low, p_high, conf, ok) in enumerate(rows):
+            prediction = {
+                'game_id': game_id,
+                'home_team': home_team,
+                'away_team': away_team,
+                'linea_predicha': round(float(pred), 1) if ok else None,
+                'linea_oficial': linea_oficial,
+                'confidence': float(conf) if ok else 0.0,
+                'std_predicha': round(float(std), 2) if ok and np.isfinite(std) else None,
+                'intervalo_bajo': round(float(p_low), 1) if ok and np.isfinite(p_low) else None,
+                'intervalo_alto': round(float(p_high), 1) if ok and np.isfinite(p_high) else None
+            }
+            if include_probabilities:
+                for key in ('over', 'under', 'push'):
+                    value = probs[key][i]
+                    prediction[f'p_{key}'] = round(float(value), 4) if ok and np.isfinite(value) else None
+            predictions.append(prediction)
         return predictions
 
-    def _calculate_confidence(self, features: pd.DataFrame) -> float:
-        try:
-            predictions = [tree.predict(features)[0] for tree in self.model.estimators_]
-            confidence = 1.0 - (np.std(predictions) / np.mean(predictions))
-            return max(0.0, min(1.0, float(confidence)))
-        except:
-            return 0.5
+    def predict_distribution(self, juegos_df: pd.DataFrame, weather_df: pd.DataFrame = None,
+                             max_runs: int = MAX_RUNS) -> TotalRunsDistribution:
+        """
+        Distribución del total de carreras (0..max_runs) de cada juego del slate.
+        Con el resultado, P(over/under/push) de cualquier línea sale de la CDF sin volver al modelo:
+
+            dist = model.predict_distribution(juegos_df)
+            tabla = dist.probability_table([7.5, 8.0, 8.5, 9.0])
+        """
+        game_ids = self._column(juegos_df, 'game_id', '')
+        if juegos_df.empty:
+            return TotalRunsDistribution(game_ids, empty_distribution(0, max_runs))
+        result = self._predict_slate(juegos_df, weather_df, max_runs)
+        return TotalRunsDistribution(game_ids, result['pmf'])
+
+    def _tree_predictions(self, features: pd.DataFrame) -> np.ndarray:
+        """
+        Matriz (árboles x juegos) con la predicción de cada árbol del ensamble para todo el slate.
+        La entrada se convierte una sola vez a float32 contiguo, el formato interno de los árboles.
+        """
+        X = np.ascontiguousarray(features[self.feature_columns].to_numpy(dtype=np.float32))
+        return np.stack([tree.predict(X, check_input=False) for tree in self.model.estimators_])
+
+    def _ensemble_stats(self, features: pd.DataFrame) -> Dict[str, np.ndarray]:
+        """
+        Línea predicha, desviación estándar, intervalo por percentiles y confianza por juego,
+        calculados en forma vectorizada sobre la matriz de predicciones por árbol.
+        Si el modelo no es un ensamble de árboles solo se obtiene la línea.
+        'matrix' es la matriz (árboles x juegos) usada para la distribución de carreras.
+        """
+        if not hasattr(self.model, 'estimators_'):
+            linea = np.asarray(self.model.predict(features), dtype=float)
+            nan = np.full(len(linea), np.nan)
+            return {'linea': linea, 'std': nan, 'p_low': nan, 'p_high': nan,
+                    'confidence': np.full(len(linea), 0.5), 'matrix': linea[None, :]}
 
-    def _train_basic_model(self):
+        matrix = self._tree_predictions(features)
+        linea = matrix.mean(axis=0)
+        std = matrix.std(axis=0)
+        p_low, p_high = np.percentile(matrix, self.INTERVAL_PERCENTILES, axis=0)
+        # Confianza = 1 - coeficiente de variación entre árboles, acotada a [0, 1]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            confidence = np.where(linea > 0, 1.0 - std / linea, 0.0)
+        return {'linea': linea, 'std': std, 'p_low': p_low, 'p_high': p_high,
+                'confidence': np.clip(confidence, 0.0, 1.0), 'matrix': matrix}
+
+    def _train_basic_model(self, save: bool = False):
+        """
+        Modelo de arranque con 500 juegos sintéticos. Por defecto queda solo en memoria;
+        con save=True se registra, marcado synthetic=True (retrain_daily no hace warm start sobre él).
+        """
         np.random.seed(42)
         n = 500
         data = {
@@ -155,26 +469,48 @@ class OverUnderModel:
             np.random.normal(0, 1.5, n)
         )
         df = pd.DataFrame(data)
-        self.fit_over_under_model(df)
+        self.fit_over_under_model(df, save=save, metadata={'synthetic': True})
+
+def _final_total_runs(juego: Dict):
+    """
+    Total de carreras de un juego finalizado. Usa el score que ya trae el schedule
+    y solo consulta el boxscore si el schedule no lo incluye.
+    """
+    if juego.get('status') != 'Final':
+        return None
+    home_score = juego.get('home_score')
+    away_score = juego.get('away_score')
+    if home_score is not None and away_score is not None:
+        return home_score + away_score
+    try:
+        boxscore = statsapi.boxscore_data(juego['game_id'])
+        return sum(boxscore[side]['teamStats']['batting']['runs'] for side in ('home', 'away'))
+    except Exception:
+        return None
 
-def create_over_under_dataset(fecha: str) -> pd.DataFrame:
+def create_over_under_dataset(fecha: str, raise_errors: bool = False, feature_store=None) -> pd.DataFrame:
+    """
+    Construye el dataset Over/Under de una fecha (un registro por juego).
+    Con raise_errors=True los errores se propagan en vez de retornar un DataFrame vacío,
+    para que quien llama pueda distinguir "sin juegos" de "falló la descarga".
+    Con feature_store (TeamFeatureStore) las stats de equipo son point-in-time (solo juegos
+    anteriores a la fecha); sin él se usa el snapshot actual de Baseball Reference, que para
+    fechas históricas incluye juegos futuros.
+    """
     try:
         juegos = statsapi.schedule(date=fecha)
+        get_slate_weather(fecha)
         dataset = []
         for juego in juegos:
             game_id = juego['game_id']
-            match_stats = get_match_real_stats(juego)
-            weather = get_weather_and_stadium(game_id)
-            if juego['status'] == 'Final':
-                try:
-                    boxscore = statsapi.boxscore_data(game_id)
-                    home_runs = boxscore['home']['runs']
-                    away_runs = boxscore['away']['runs']
-                    total_runs = home_runs + away_runs
-                except:
-                    total_runs = None
+            if feature_store is not None:
+                # Sin historia previa (inicio de temporada) se usan los valores por defecto del modelo
+                match_stats = feature_store.match_features(fecha, juego['home_id'], juego['away_id'],
+                                                           defaults=OverUnderModel.FEATURE_DEFAULTS)
             else:
-                total_runs = None
+                match_stats = get_match_real_stats(juego)
+            weather = get_weather_and_stadium(game_id)
+            total_runs = _final_total_runs(juego)
             record = {
                 'game_id': game_id,
                 'home_team': juego['home_name'],
@@ -194,22 +530,136 @@ def create_over_under_dataset(fecha: str) -> pd.DataFrame:
             dataset.append(record)
         return pd.DataFrame(dataset)
     except Exception as e:
+        if raise_errors:
+            raise
         print(f"Error creando dataset Over/Under para {fecha}: {e}")
         return pd.DataFrame()
 
-def retrain_daily() -> Dict:
+def retrain_daily(fecha: str = None, window_days: int = 120, holdout_days: int = 3,
+                  new_trees: int = OverUnderModel.TREES_PER_UPDATE,
+                  max_trees: int = OverUnderModel.MAX_TREES, full_refit: bool = False,
+                  db_path: str = DB_PATH, run_metrics=None, feature_store_path: str = None) -> Dict:
+    """
+    Re-entrenamiento diario sobre datos reales acumulados.
+    1. Agrega al almacén Over/Under los juegos finalizados que falten hasta `fecha`
+       (ayer por defecto); las fechas ya guardadas no se vuelven a descargar.
+       Si existe el TeamFeatureStore (feature_store_path, por defecto data/team_feature_store.npz)
+       se actualiza hasta `fecha` y las stats de equipo son point-in-time; las fechas de la
+       ventana guardadas con el snapshot de Baseball Reference se re-procesan. Sin store se
+       usa Baseball Reference (con fuga de juegos futuros) y se avisa.
+    2. Carga solo la ventana deslizante de window_days días desde SQLite.
+    3. Reserva los últimos holdout_days días como holdout y actualiza el modelo en forma
+       incremental con el resto, así el costo por noche no crece con la historia.
+    4. Mide MAE/RMSE reales en el holdout (junto al baseline de predecir la media) y
+       registra la nueva versión en el registro de modelos.
+    Con run_metrics (RunMetrics) cada paso queda registrado como una etapa con su
+    duración, filas, requests y memoria.
+    """
+    # Import local: backfill_over_under importa este módulo
+    from backfill_over_under import run_backfill
+    from data_manager.over_under_store import SOURCE_BREF, SOURCE_FEATURE_STORE
+    from team_feature_store import DEFAULT_PATH as FEATURE_STORE_PATH, update_store_file
     try:
-        model = OverUnderModel()
-        # Aquí deberías cargar tu dataset histórico real
-        # Por simplicidad, entrenamos con datos simulados
-        model._train_basic_model()
-        return {'success': True, 'mae': 0, 'rmse': 0}
+        fecha = fecha or (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
+        window_start = (datetime.strptime(fecha, '%Y-%m-%d') - timedelta(days=window_days - 1)).strftime('%Y-%m-%d')
+        holdout_start = (datetime.strptime(fecha, '%Y-%m-%d') - timedelta(days=holdout_days - 1)).strftime('%Y-%m-%d')
+
+        with maybe_stage(run_metrics, 'feature_store') as stage:
+            store_path = feature_store_path or FEATURE_STORE_PATH
+            feature_store = update_store_file(fecha, window_start, store_path)
+            feature_source = SOURCE_FEATURE_STORE if feature_store is not None else SOURCE_BREF
+            if feature_store is None:
+                print(f"Sin TeamFeatureStore en {store_path}: se entrena con el snapshot actual de "
+                      "Baseball Reference (constrúyelo con team_feature_store.py)")
+            stage.extra = {'feature_source': feature_source}
+        with maybe_stage(run_metrics, 'dataset') as stage:
+            backfill = run_backfill(window_start, fecha, db_path=db_path, feature_store=feature_store)
+            stage.rows = backfill['games']
+            stage.extra = {'dates_done': backfill['dates_done'], 'dates_failed': len(backfill['dates_failed'])}
+        with maybe_stage(run_metrics, 'load_window') as stage:
+            frame = load_training_frame(OverUnderModel.FEATURE_COLUMNS, window_start, fecha, db_path=db_path)
+            train_df = frame[frame['date'] < holdout_start]
+            holdout_df = frame[frame['date'] >= holdout_start]
+            stage.rows = len(frame)
+        if train_df.empty or holdout_df.empty:
+            return {'success': False,
+                    'error': f"Datos insuficientes: {len(train_df)} juegos de entrenamiento, "
+                             f"{len(holdout_df)} de holdout"}
+
+        with maybe_stage(run_metrics, 'fit') as stage:
+            model = OverUnderModel()
+            # Árboles de otro origen de features no se mezclan: ajuste completo al cambiar
+            full_refit = full_refit or model.metadata.get('feature_source', SOURCE_BREF) != feature_source
+            # Semilla distinta por noche para los árboles nuevos
+            update = model.update_incremental(train_df, new_trees, max_trees, full_refit,
+                                              seed=int(fecha.replace('-', '')))
+            stage.rows = update['train_rows']
+            stage.extra = {'mode': update['mode'], 'n_estimators': update['n_estimators']}
+
+        with maybe_stage(run_metrics, 'evaluate') as stage:
+            y_true = holdout_df['total_runs'].to_numpy(dtype=float)
+            y_pred = model._ensemble_stats(holdout_df)['linea']
+            baseline = np.full(len(y_true), float(train_df['total_runs'].mean()))
+            mae, rmse = _mae_rmse(y_true, y_pred)
+            metrics = {
+                'mae': mae,
+                'rmse': rmse,
+                'baseline_mae': _mae_rmse(y_true, baseline)[0],
+                'holdout_games': int(len(holdout_df))
+            }
+            stage.rows = len(holdout_df)
+        with maybe_stage(run_metrics, 'save_model'):
+            model.save_model({
+                'training_window': [str(train_df['date'].min()), str(train_df['date'].max())],
+                'holdout_window': [holdout_start, fecha],
+                'n_rows': int(len(train_df)),
+                'metrics': metrics,
+                'update': update,
+                'feature_source': feature_source
+            })
+        print(f"Re-entrenamiento {update['mode']}: {update['n_estimators']} árboles, "
+              f"{update['train_rows']} juegos, {update['fit_s']}s. "
+              f"Holdout MAE {metrics['mae']:.2f} (baseline {metrics['baseline_mae']:.2f})")
+        return {
+            'success': True,
+            'version': model.version,
+            'mae': metrics['mae'],
+            'rmse': metrics['rmse'],
+            'baseline_mae': metrics['baseline_mae'],
+            'holdout_games': metrics['holdout_games'],
+            'update': update,
+            'feature_source': feature_source,
+            'backfill': {k: backfill[k] for k in ('dates_done', 'dates_failed', 'games')}
+        }
     except Exception as e:
         print(f"Error en re-entrenamiento diario: {e}")
         return {'success': False, 'error': str(e)}
 
-# Instancia global del modelo
-over_under_model = OverUnderModel()
+# Instancia global del modelo (se construye en el primer uso)
+_over_under_model = None
+_over_under_model_lock = threading.Lock()
+
+def get_over_under_model() -> OverUnderModel:
+    """
+    Retorna la instancia global del modelo, cargándola la primera vez que se pide.
+    Importar este módulo ya no deserializa ni entrena el modelo. En llamadas siguientes
+    revisa (con throttling) si el registro tiene una versión más nueva.
+    """
+    global _over_under_model
+    if _over_under_model is None:
+        with _over_under_model_lock:
+            if _over_under_model is None:
+                _over_under_model = OverUnderModel()
+    else:
+        # Procesos de larga vida (dashboard) toman una versión nueva del registro sin reiniciar
+        _over_under_model.refresh_if_newer()
+    return _over_under_model
+
+def __getattr__(name):
+    # Compatibilidad: `over_under_model.over_under_model` sigue funcionando, pero de forma perezosa
+    if name == 'over_under_model':
+        return get_over_under_model()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 if __name__ == "__main__":
     print("Entrenando modelo Over/Under...")
@@ -217,7 +667,7 @@ if __name__ == "__main__":
     
     # Usar datos simulados para el test inicial
     print("Usando datos simulados para entrenamiento inicial...")
-    model._train_basic_model()
+    model._train_basic_model(save=True)
     
     # También probar con datos reales si están disponibles
     try:
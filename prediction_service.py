@@ -0,0 +1,415 @@
+#!/usr/bin/env python3
+"""
+Servicio local de predicciones Over/Under.
+Un proceso de larga vida mantiene un solo OverUnderModel en memoria y atiende por HTTP
+en localhost a dashboards y scripts. Los pedidos concurrentes se agrupan con un
+MicroBatcher, así varias sesiones comparten una sola llamada al modelo, y /stats expone
+latencia y throughput.
+
+Uso:
+    python prediction_service.py --port 8766
+    PREDICTION_SERVICE_URL=http://127.0.0.1:8766 streamlit run dashboard/app.py
+
+Endpoints:
+    POST /predict       {"games": [...], "include_probabilities": false}
+    POST /distribution  {"games": [...], "lines": [7.5, 8.5, 9.5]}
+    GET  /stats
+    GET  /health
+"""
+
+import argparse
+import json
+import logging
+import math
+import os
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import deque
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from over_under_distribution import TotalRunsDistribution, empty_distribution
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8766
+SERVICE_URL_ENV = 'PREDICTION_SERVICE_URL'
+CLIENT_TIMEOUT_S = 10
+CLIENT_RETRY_AFTER_S = 30  # después de una falla de conexión el cliente usa el modelo local este tiempo
+
+
+class MicroBatcher:
+    """
+    Agrupa pedidos concurrentes en lotes. Cada pedido es una lista de items; un hilo de
+    fondo junta pedidos hasta max_batch items o max_wait_ms, llama a batch_fn una sola vez
+    con todos los items y reparte los resultados a cada pedido en el mismo orden.
+    """
+
+    def __init__(self, batch_fn: Callable[[List], List], max_batch: int = 256,
+                 max_wait_ms: float = 5.0, latency_window: int = 1000):
+        self.batch_fn = batch_fn
+        self.max_batch = max_batch
+        self.max_wait_ms = max_wait_ms
+        self._queue: deque = deque()
+        self._cond = threading.Condition()
+        self._latencies = deque(maxlen=latency_window)
+        self._started_at = time.time()
+        self._counters = {'requests': 0, 'items': 0, 'batches': 0, 'errors': 0}
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, items: List) -> Future:
+        future = Future()
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("MicroBatcher cerrado")
+            self._queue.append((list(items), future, time.perf_counter()))
+            self._cond.notify()
+        return future
+
+    def __call__(self, items: List, timeout: Optional[float] = None) -> List:
+        return self.submit(items).result(timeout)
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join(timeout=1)
+
+    def _take_batch(self) -> List:
+        with self._cond:
+            while not self._queue and not self._closed:
+                self._cond.wait()
+            if not self._queue:
+                return []
+            # Espera corta para que se sumen otros pedidos concurrentes al lote
+            deadline = time.perf_counter() + self.max_wait_ms / 1000.0
+            while sum(len(r[0]) for r in self._queue) < self.max_batch:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0 or self._closed:
+                    break
+                self._cond.wait(remaining)
+            batch, size = [], 0
+            while self._queue and (not batch or size + len(self._queue[0][0]) <= self.max_batch):
+                request = self._queue.popleft()
+                batch.append(request)
+                size += len(request[0])
+            return batch
+
+    def _run(self):
+        while True:
+            batch = self._take_batch()
+            if not batch:
+                return
+            items = [item for request in batch for item in request[0]]
+            try:
+                results = self.batch_fn(items) if items else []
+                error = None
+            except Exception as e:
+                results, error = None, e
+            now = time.perf_counter()
+            offset = 0
+            with self._cond:
+                self._counters['batches'] += 1
+                self._counters['requests'] += len(batch)
+                self._counters['items'] += len(items)
+                if error is not None:
+                    self._counters['errors'] += len(batch)
+                for request_items, future, submitted in batch:
+                    self._latencies.append(now - submitted)
+            for request_items, future, _ in batch:
+                if error is not None:
+                    future.set_exception(error)
+                else:
+                    future.set_result(results[offset:offset + len(request_items)])
+                offset += len(request_items)
+
+    def stats(self) -> Dict:
+        with self._cond:
+            latencies = np.array(self._latencies) * 1000
+            counters = dict(self._counters)
+            queued = len(self._queue)
+        elapsed = max(time.time() - self._started_at, 1e-9)
+        return {
+            **counters,
+            'queued': queued,
+            'avg_batch_items': round(counters['items'] / counters['batches'], 2) if counters['batches'] else 0.0,
+            'latency_ms_p50': round(float(np.percentile(latencies, 50)), 2) if len(latencies) else None,
+            'latency_ms_p95': round(float(np.percentile(latencies, 95)), 2) if len(latencies) else None,
+            'latency_ms_p99': round(float(np.percentile(latencies, 99)), 2) if len(latencies) else None,
+            'requests_per_s': round(counters['requests'] / elapsed, 3),
+            'items_per_s': round(counters['items'] / elapsed, 3),
+            'uptime_s': round(elapsed, 1)
+        }
+
+
+def _clean(value):
+    """Convierte valores numpy/NaN a tipos JSON."""
+    if isinstance(value, dict):
+        return {k: _clean(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_clean(v) for v in value]
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return value
+
+
+def _serving_games(games: List[Dict]) -> List[Dict]:
+    """Stats de equipo del mismo origen que el entrenamiento (ver apply_serving_features)."""
+    # Import local: mlb_stats_integration trae statsapi y el feature store
+    from mlb_stats_integration import apply_serving_features
+    return apply_serving_features(games)
+
+
+class PredictionService:
+    """Un solo OverUnderModel en memoria detrás de un MicroBatcher."""
+
+    def __init__(self, max_batch: int = 256, max_wait_ms: float = 5.0):
+        from over_under_model import get_over_under_model
+        self._get_model = get_over_under_model
+        self.model = get_over_under_model()
+        self.batcher = MicroBatcher(self._predict_batch, max_batch, max_wait_ms)
+        self.distribution_batcher = MicroBatcher(self._distribution_batch, max_batch, max_wait_ms)
+
+    def _current_model(self):
+        # get_over_under_model() también hace hot-swap si el registro tiene una versión nueva;
+        # cada lote usa su referencia local aunque otro hilo cambie self.model
+        model = self._get_model()
+        self.model = model
+        return model
+
+    @staticmethod
+    def _by_columns(games: List[Dict], predict) -> List:
+        """
+        Aplica predict a un DataFrame por cada conjunto de columnas del lote y devuelve los
+        resultados en el orden de games. Así un pedido con otras columnas (sin clima, sin alguna
+        feature) no deja NaN en las filas de los demás pedidos que comparten la ventana.
+        """
+        groups: Dict[tuple, List[int]] = {}
+        for i, game in enumerate(games):
+            groups.setdefault(tuple(sorted(game)), []).append(i)
+        results = [None] * len(games)
+        for indices in groups.values():
+            for i, result in zip(indices, predict(pd.DataFrame([games[i] for i in indices]))):
+                results[i] = result
+        return results
+
+    def _predict_batch(self, games: List[Dict]) -> List[Dict]:
+        model = self._current_model()
+
+        def predict(df: pd.DataFrame) -> List[Dict]:
+            # La pmf sale de la misma pasada que p_over; predict() la quita si no se pidió
+            predictions, distribution = model.predict_with_distribution(df, include_probabilities=True)
+            return [dict(p, pmf=row.tolist()) for p, row in zip(predictions, distribution.pmf)]
+
+        return self._by_columns(games, predict)
+
+    def _distribution_batch(self, games: List[Dict]) -> List[np.ndarray]:
+        """pmf de carreras por juego; las líneas se aplican después, por pedido."""
+        model = self._current_model()
+        return self._by_columns(games, lambda df: list(model.predict_distribution(df).pmf))
+
+    def predict(self, games: List[Dict], include_probabilities: bool = False,
+                include_distribution: bool = False) -> List[Dict]:
+        predictions = self.batcher(_serving_games(games), timeout=60)
+        drop = set() if include_probabilities else {'p_over', 'p_under', 'p_push'}
+        if not include_distribution:
+            drop.add('pmf')
+        return _clean([{k: v for k, v in p.items() if k not in drop} for p in predictions])
+
+    def distribution(self, games: List[Dict], lines: List[float]) -> Dict:
+        rows = self.distribution_batcher(_serving_games(games), timeout=60) if games else []
+        pmf = np.array(rows) if rows else empty_distribution(0)
+        distribution = TotalRunsDistribution([g.get('game_id', '') for g in games], pmf)
+        table = distribution.probability_table(lines)
+        return _clean({'game_ids': distribution.game_ids, 'lines': list(lines),
+                       **{key: values.tolist() for key, values in table.items()}})
+
+    def stats(self) -> Dict:
+        return _clean({
+            'model_version': self.model.version,
+            'model_load': self.model.load_stats,
+            'batcher': self.batcher.stats(),
+            'distribution_batcher': self.distribution_batcher.stats()
+        })
+
+    def close(self):
+        self.batcher.close()
+        self.distribution_batcher.close()
+
+
+def make_server(service: PredictionService, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT) -> ThreadingHTTPServer:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def _send(self, status: int, payload: Dict):
+            body = json.dumps(payload, default=str).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path == '/health':
+                self._send(200, {'status': 'ok', 'model_version': service.model.version})
+            elif self.path == '/stats':
+                self._send(200, service.stats())
+            else:
+                self._send(404, {'error': f"Ruta no soportada: {self.path}"})
+
+        def do_POST(self):
+            try:
+                length = int(self.headers.get('Content-Length', 0))
+                body = json.loads(self.rfile.read(length) or b'{}')
+                if self.path == '/predict':
+                    predictions = service.predict(body.get('games', []), bool(body.get('include_probabilities')),
+                                                  bool(body.get('include_distribution')))
+                    self._send(200, {'predictions': predictions})
+                elif self.path == '/distribution':
+                    self._send(200, service.distribution(body.get('games', []), body.get('lines', [])))
+                else:
+                    self._send(404, {'error': f"Ruta no soportada: {self.path}"})
+            except Exception as e:
+                self._send(500, {'error': str(e)})
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    return server
+
+
+class PredictionClient:
+    """
+    Cliente del servicio. Si el servicio no responde, predice en el mismo proceso con el
+    modelo global (fallback), así dashboard y scripts funcionan con o sin servicio.
+    """
+
+    def __init__(self, base_url: Optional[str] = None, timeout_s: float = CLIENT_TIMEOUT_S):
+        base_url = base_url or os.environ.get(SERVICE_URL_ENV) or f"http://{DEFAULT_HOST}:{DEFAULT_PORT}"
+        self.base_url = base_url.rstrip('/')
+        self.timeout_s = timeout_s
+        # Después de una falla de conexión se deja de intentar por un rato
+        self._retry_after = 0.0
+        self._lock = threading.Lock()
+
+    def _request(self, path: str, payload: Optional[Dict] = None) -> Optional[Dict]:
+        if time.time() < self._retry_after:
+            return None
+        data = json.dumps(payload, default=str).encode() if payload is not None else None
+        request = urllib.request.Request(self.base_url + path, data=data,
+                                         headers={'Content-Type': 'application/json'})
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout_s) as response:
+                return json.loads(response.read())
+        except (urllib.error.URLError, ConnectionError, TimeoutError) as e:
+            with self._lock:
+                # Un solo aviso por ventana, aunque fallen varios pedidos concurrentes
+                first = time.time() >= self._retry_after
+                self._retry_after = time.time() + CLIENT_RETRY_AFTER_S
+            if first:
+                logging.warning(f"Servicio de predicciones no disponible ({e}); usando el modelo local "
+                                f"por {CLIENT_RETRY_AFTER_S}s")
+            return None
+
+    @staticmethod
+    def _records(juegos) -> List[Dict]:
+        if isinstance(juegos, pd.DataFrame):
+            return _clean(juegos.to_dict('records'))
+        return _clean(list(juegos))
+
+    def predict_over_under(self, juegos, include_probabilities: bool = False,
+                           include_distribution: bool = False) -> List[Dict]:
+        """
+        Predicciones del slate. Con include_distribution cada predicción trae además 'pmf'
+        (P(total = 0..MAX_RUNS), None si el juego no se pudo predecir).
+        """
+        games = self._records(juegos)
+        if not games:
+            return []
+        response = self._request('/predict', {'games': games, 'include_probabilities': include_probabilities,
+                                              'include_distribution': include_distribution})
+        if response is not None and 'predictions' in response:
+            return response['predictions']
+        from over_under_model import get_over_under_model
+        model = get_over_under_model()
+        juegos_df = pd.DataFrame(_serving_games(games))
+        if not include_distribution:
+            return model.predict_over_under(juegos_df, include_probabilities=include_probabilities)
+        predictions, distribution = model.predict_with_distribution(juegos_df,
+                                                                    include_probabilities=include_probabilities)
+        return _clean([dict(p, pmf=row.tolist()) for p, row in zip(predictions, distribution.pmf)])
+
+    def probability_table(self, juegos, lines: List[float]) -> Dict[str, np.ndarray]:
+        games = self._records(juegos)
+        response = self._request('/distribution', {'games': games, 'lines': list(lines)})
+        if response is not None and 'over' in response:
+            return {key: np.array(response[key], dtype=float) for key in ('over', 'under', 'push')}
+        from over_under_model import get_over_under_model
+        juegos_df = pd.DataFrame(_serving_games(games))
+        return get_over_under_model().predict_distribution(juegos_df).probability_table(lines)
+
+    def stats(self, local_fallback: bool = True) -> Dict:
+        """
+        Stats del servicio, o info del modelo local si el servicio no está disponible.
+        Con local_fallback=False no carga el modelo: retorna {'source': 'unavailable'}.
+        """
+        response = self._request('/stats')
+        if response is not None:
+            return dict(response, source='service')
+        if not local_fallback:
+            return {'source': 'unavailable'}
+        from over_under_model import get_over_under_model
+        model = get_over_under_model()
+        return {'source': 'local', 'model_version': model.version, 'model_load': model.load_stats}
+
+
+_client = None
+
+
+def get_client() -> PredictionClient:
+    global _client
+    if _client is None:
+        _client = PredictionClient()
+    return _client
+
+
+def predict_games(juegos, include_probabilities: bool = False) -> List[Dict]:
+    """Atajo: predicciones Over/Under vía servicio (o modelo local si no está corriendo)."""
+    return get_client().predict_over_under(juegos, include_probabilities)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Servicio local de predicciones Over/Under")
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--max-batch', type=int, default=256)
+    parser.add_argument('--max-wait-ms', type=float, default=5.0)
+    args = parser.parse_args(argv)
+
+    service = PredictionService(args.max_batch, args.max_wait_ms)
+    server = make_server(service, args.host, args.port)
+    print(f"Servicio de predicciones escuchando en http://{args.host}:{args.port} "
+          f"(modelo {service.model.version or 'pickle legacy'})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
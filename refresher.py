@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Refresher del dashboard: proceso independiente que cada cierto intervalo descarga el slate
+(schedule, clima, stats de equipos y predicciones), los rosters, los boxscores de juegos
+empezados y la optimización DFS de cada juego con la base local, y guarda todo como snapshots versionados
+en SQLite (data_manager/snapshots.py). El dashboard solo lee el último snapshot, así su
+latencia no depende de la API de MLB ni de la cantidad de usuarios conectados.
+
+Uso:
+    python refresher.py                      # hoy, cada 120 s
+    python refresher.py --interval 60 --days-ahead 1
+    python refresher.py --once --date 2025-06-26
+"""
+
+import argparse
+import logging
+import signal
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+import statsapi
+
+from data_manager.db import DB_PATH
+from data_manager.query import get_players_by_date
+from data_manager.snapshots import DEFAULT_KEEP, init_snapshot_store, prune_snapshots, save_snapshot
+from slate_bundle import DEFAULT_WORKERS, build_slate_bundle, bundle_to_payload
+
+DEFAULT_INTERVAL = 120  # segundos entre ciclos
+MIN_PLAYERS_REQUIRED = 7
+# Códigos de equipo de daily_roster (FanDuel) que no coinciden con los de MLB StatsAPI
+TEAM_CODE_ALIASES = {'ARI': 'AZ', 'CHW': 'CWS', 'KCR': 'KC', 'OAK': 'ATH', 'SDP': 'SD',
+                     'SFG': 'SF', 'TBR': 'TB', 'WSN': 'WSH'}
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+_stop = threading.Event()
+
+
+def fetch_rosters(team_names: List[str], max_workers: int = DEFAULT_WORKERS) -> Dict[str, List[Dict]]:
+    """Rosters activos de los equipos del slate: nombre de equipo -> lista de jugadores de la API."""
+    team_ids = {t['name']: t['id'] for t in statsapi.get('teams', {'sportId': 1}).get('teams', [])}
+
+    def roster(team_id):
+        return statsapi.get('team_roster', {'teamId': team_id, 'rosterType': 'active'}).get('roster', [])
+
+    names = [name for name in team_names if name in team_ids]
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {name: pool.submit(roster, team_ids[name]) for name in names}
+        rosters = {}
+        for name, future in futures.items():
+            try:
+                rosters[name] = future.result()
+            except Exception as e:
+                logging.warning(f"No se pudo descargar el roster de {name}: {e}")
+    return rosters
+
+
+def _boxscore_summary(boxscore: Dict) -> Dict:
+    summary = {}
+    for side in ('away', 'home'):
+        batting = boxscore.get('teams', {}).get(side, {}).get('teamStats', {}).get('batting', {})
+        summary[side] = {k: batting.get(k) for k in ('runs', 'hits', 'homeRuns', 'leftOnBase')}
+    return summary
+
+
+def fetch_boxscores(juegos: List[Dict], max_workers: int = DEFAULT_WORKERS) -> Dict[int, Dict]:
+    """Resumen de bateo por equipo de los juegos ya empezados (los programados no tienen boxscore)."""
+    started = [j['game_id'] for j in juegos if j['status'] not in ('Scheduled', 'Pre-Game', 'Warmup', 'Postponed')]
+
+    def boxscore(game_id):
+        return _boxscore_summary(statsapi.get('game_boxscore', {'gamePk': game_id}))
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {game_id: pool.submit(boxscore, game_id) for game_id in started}
+        boxscores = {}
+        for game_id, future in futures.items():
+            try:
+                boxscores[game_id] = future.result()
+            except Exception as e:
+                logging.warning(f"No se pudo descargar el boxscore de {game_id}: {e}")
+    return boxscores
+
+
+def fetch_team_codes() -> Dict[str, set]:
+    """Nombre de equipo -> códigos con los que puede aparecer en daily_roster (en mayúsculas)."""
+    codes = {}
+    for team in statsapi.get('teams', {'sportId': 1}).get('teams', []):
+        values = (team.get(k) for k in ('name', 'teamName', 'shortName', 'clubName',
+                                        'abbreviation', 'teamCode', 'fileCode'))
+        codes[team['name']] = {str(v).upper() for v in values if v}
+    return codes
+
+
+def _team_code(jugador: Dict) -> str:
+    code = str(jugador.get('team') or '').strip().upper()
+    return TEAM_CODE_ALIASES.get(code, code)
+
+
+def run_dfs(fecha: str, juegos: List[Dict]) -> Dict:
+    """
+    Optimización showdown por juego: solo los jugadores de daily_roster de los dos equipos
+    del juego, para que la alineación no mezcle equipos de otros juegos del slate.
+    Retorna {'players': total de la fecha, 'games': {game_id: {'players', 'result'}}}.
+    """
+    from run_daily_optimizer import run_optimizer
+
+    try:
+        jugadores = get_players_by_date(fecha)
+    except sqlite3.OperationalError:
+        # Base sin tabla daily_roster todavía (no se cargaron jugadores)
+        jugadores = []
+    games = {}
+    if len(jugadores) >= MIN_PLAYERS_REQUIRED:
+        team_codes = fetch_team_codes()
+        for juego in juegos:
+            codes = set()
+            for side in ('home_name', 'away_name'):
+                codes |= team_codes.get(juego[side], {juego[side].upper()})
+            del_juego = [j for j in jugadores if _team_code(j) in codes]
+            result = run_optimizer(players_data=del_juego) if len(del_juego) >= MIN_PLAYERS_REQUIRED else None
+            # Claves str: el snapshot es JSON
+            games[str(juego['game_id'])] = {'players': len(del_juego), 'result': result}
+    return {'players': len(jugadores), 'games': games}
+
+
+def refresh_date(fecha: str, db_path: str = DB_PATH, max_workers: int = DEFAULT_WORKERS) -> Dict:
+    """
+    Un ciclo completo para una fecha: arma cada parte y la guarda como snapshot.
+    Si una parte falla, las demás se guardan igual y el dashboard sigue con la versión anterior de esa parte.
+    Retorna {kind: versión} de los snapshots guardados.
+    """
+    versions = {}
+    start = time.perf_counter()
+    bundle = build_slate_bundle(fecha, max_workers)
+    versions['slate'] = save_snapshot(fecha, 'slate', bundle_to_payload(bundle),
+                                      round(time.perf_counter() - start, 3), db_path)
+    juegos = bundle['juegos']
+    teams = sorted({j[side] for j in juegos for side in ('home_name', 'away_name')})
+
+    parts = {
+        'rosters': lambda: {'rosters': fetch_rosters(teams, max_workers)},
+        'boxscores': lambda: {'boxscores': [dict(b, game_id=game_id) for game_id, b
+                                            in fetch_boxscores(juegos, max_workers).items()]},
+        'dfs': lambda: run_dfs(fecha, juegos)
+    }
+    for kind, build in parts.items():
+        step = time.perf_counter()
+        try:
+            payload = build()
+        except Exception as e:
+            logging.error(f"Error armando snapshot {kind} de {fecha}: {e}")
+            continue
+        versions[kind] = save_snapshot(fecha, kind, payload, round(time.perf_counter() - step, 3), db_path)
+    return versions
+
+
+def run(dates: List[str] = None, days_ahead: int = 0, interval: float = DEFAULT_INTERVAL,
+        once: bool = False, keep: int = DEFAULT_KEEP, db_path: str = DB_PATH,
+        max_workers: int = DEFAULT_WORKERS) -> int:
+    """Bucle principal. Con dates fijas refresca esas fechas; si no, hoy y days_ahead días siguientes."""
+    init_snapshot_store(db_path)
+    while not _stop.is_set():
+        cycle_start = time.perf_counter()
+        fechas = dates or [(datetime.now() + timedelta(days=d)).strftime('%Y-%m-%d') for d in range(days_ahead + 1)]
+        for fecha in fechas:
+            try:
+                versions = refresh_date(fecha, db_path, max_workers)
+                logging.info(f"Snapshots {fecha}: {versions}")
+            except Exception as e:
+                logging.error(f"Error refrescando {fecha}: {e}")
+        removed = prune_snapshots(keep, db_path)
+        if removed:
+            logging.info(f"{removed} snapshots viejos eliminados")
+        elapsed = time.perf_counter() - cycle_start
+        logging.info(f"Ciclo completo en {elapsed:.2f}s")
+        if once:
+            break
+        _stop.wait(max(interval - elapsed, 1.0))
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Refresher de snapshots del dashboard")
+    parser.add_argument('--date', action='append', dest='dates', help="Fecha YYYY-MM-DD (se puede repetir)")
+    parser.add_argument('--days-ahead', type=int, default=0, help="Refrescar también los próximos N días")
+    parser.add_argument('--interval', type=float, default=DEFAULT_INTERVAL, help="Segundos entre ciclos")
+    parser.add_argument('--once', action='store_true', help="Un solo ciclo y salir")
+    parser.add_argument('--keep', type=int, default=DEFAULT_KEEP, help="Versiones a conservar por fecha y tipo")
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS)
+    parser.add_argument('--db', default=DB_PATH, help="Ruta de la base SQLite")
+    args = parser.parse_args(argv)
+
+    def handle_signal(signum, frame):
+        logging.info("Deteniendo refresher...")
+        _stop.set()
+
+    signal.signal(signal.SIGINT, handle_signal)
+    signal.signal(signal.SIGTERM, handle_signal)
+    return run(args.dates, args.days_ahead, args.interval, args.once, args.keep, args.db, args.workers)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
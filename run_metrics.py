@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Métricas estructuradas por etapa para corridas batch (re-entrenamiento nocturno, backfills).
+Cada etapa registra duración, filas procesadas, requests a MLB StatsAPI, memoria
+(pico de tracemalloc de la etapa si se activa trace_memory; el pico RSS es del proceso y acumulado)
+y, opcionalmente, un dump de cProfile. La corrida se guarda como data/run_metrics_*.json.
+
+Uso del reporte:
+    python run_metrics.py report                 # tabla de etapas por corrida
+    python run_metrics.py report --threshold 1.5 # exit 1 si la última corrida es >1.5x la mediana
+"""
+
+import argparse
+import cProfile
+import glob
+import json
+import os
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import api_metrics
+from model_registry import process_rss_mb
+
+METRICS_DIR = 'data'
+# Diferencia mínima absoluta para considerar una regresión (evita alarmas por ruido en etapas cortas)
+REGRESSION_MIN_DELTA = {'elapsed_s': 1.0, 'requests': 5, 'tracemalloc_peak_mb': 50.0, 'peak_rss_mb': 50.0}
+PROFILE_DIR = os.path.join('data', 'profiles')
+
+
+def peak_rss_mb() -> Optional[float]:
+    """
+    Pico de memoria residente del proceso en MB (ru_maxrss), o None si no se puede medir.
+    Es acumulado desde que arrancó el proceso: no baja entre etapas.
+    """
+    try:
+        import resource
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return round(maxrss / (1024 ** 2 if sys.platform == 'darwin' else 1024), 1)
+    except Exception:
+        return None
+
+
+class Stage:
+    """Datos de una etapa en curso; quien la ejecuta puede fijar rows y extra."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.rows: Optional[int] = None
+        self.extra: Dict = {}
+
+
+class RunMetrics:
+    """
+    Acumula métricas por etapa de una corrida:
+
+        metrics = RunMetrics('retrain_over_under', profile=True)
+        with metrics.stage('player_stats') as stage:
+            stage.rows = ...
+        metrics.save()
+    """
+
+    def __init__(self, run_name: str, profile: bool = False, trace_memory: bool = False,
+                 profile_dir: str = PROFILE_DIR):
+        self.run_name = run_name
+        self.profile = profile
+        self.trace_memory = trace_memory
+        self.profile_dir = profile_dir
+        self.started_at = datetime.now()
+        self.run_id = f"{run_name}_{self.started_at.strftime('%Y%m%d_%H%M%S')}"
+        self.stages: List[Dict] = []
+        self.status = 'running'
+        self._start = time.perf_counter()
+        api_metrics.install()
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    @contextmanager
+    def stage(self, name: str):
+        stage = Stage(name)
+        requests_before = api_metrics.snapshot()
+        traced_before = 0
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+            traced_before = tracemalloc.get_traced_memory()[0]
+        profiler = cProfile.Profile() if self.profile else None
+        record = {'stage': name, 'status': 'ok'}
+        start = time.perf_counter()
+        try:
+            if profiler:
+                profiler.enable()
+            yield stage
+        except Exception as e:
+            record['status'] = 'error'
+            record['error'] = str(e)
+            raise
+        finally:
+            if profiler:
+                profiler.disable()
+            record['elapsed_s'] = round(time.perf_counter() - start, 3)
+            record['rows'] = stage.rows
+            api = api_metrics.diff(requests_before, api_metrics.snapshot())
+            record['requests'] = api['requests']
+            record['request_errors'] = api['errors']
+            record['request_s'] = api['elapsed_s']
+            record['requests_by_endpoint'] = {k: v['requests'] for k, v in api['by_endpoint'].items()}
+            record['rss_mb'] = process_rss_mb()
+            # Pico del proceso hasta el final de esta etapa (hereda el de las anteriores)
+            record['process_peak_rss_mb'] = peak_rss_mb()
+            if self.trace_memory:
+                # Pico de la etapa por encima de lo que ya estaba asignado al entrar
+                peak = tracemalloc.get_traced_memory()[1] - traced_before
+                record['tracemalloc_peak_mb'] = round(max(peak, 0) / 1024 ** 2, 2)
+            if profiler:
+                os.makedirs(self.profile_dir, exist_ok=True)
+                profile_path = os.path.join(self.profile_dir, f"{self.run_id}_{name}.prof")
+                profiler.dump_stats(profile_path)
+                record['profile'] = profile_path
+            record.update(stage.extra)
+            self.stages.append(record)
+
+    def to_dict(self) -> Dict:
+        return {
+            'run_id': self.run_id,
+            'run_name': self.run_name,
+            'started_at': self.started_at.strftime('%Y-%m-%d %H:%M:%S'),
+            'status': self.status,
+            'total_s': round(time.perf_counter() - self._start, 3),
+            'requests': sum(s['requests'] for s in self.stages),
+            'peak_rss_mb': peak_rss_mb(),
+            'stages': self.stages
+        }
+
+    def save(self, status: str = 'ok', metrics_dir: str = METRICS_DIR) -> str:
+        self.status = status
+        os.makedirs(metrics_dir, exist_ok=True)
+        path = os.path.join(metrics_dir, f"run_metrics_{self.started_at.strftime('%Y%m%d_%H%M%S')}.json")
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2, default=str)
+        return path
+
+
+def maybe_stage(metrics: Optional[RunMetrics], name: str):
+    """metrics.stage(name) si hay métricas activas; si no, un contexto vacío con un Stage descartable."""
+    return metrics.stage(name) if metrics is not None else nullcontext(Stage(name))
+
+
+# ---------------------
+# Reporte
+# ---------------------
+
+def load_runs(metrics_dir: str = METRICS_DIR, run_name: Optional[str] = None) -> List[Dict]:
+    runs = []
+    for path in sorted(glob.glob(os.path.join(metrics_dir, 'run_metrics_*.json'))):
+        try:
+            with open(path) as f:
+                run = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Ignorando {path}: {e}")
+            continue
+        if run_name is None or run.get('run_name') == run_name:
+            runs.append(run)
+    return sorted(runs, key=lambda r: r['started_at'])
+
+
+def _regression(stage: str, metric: str, value, previous: List, threshold: float) -> Optional[Dict]:
+    import numpy as np
+
+    if value is None or not previous:
+        return None
+    median = float(np.median(previous))
+    if value - median < REGRESSION_MIN_DELTA.get(metric, 0):
+        return None
+    if median > 0 and value > threshold * median:
+        return {'stage': stage, 'metric': metric, 'value': value,
+                'median': round(median, 3), 'ratio': round(value / median, 2)}
+    return None
+
+
+def find_regressions(runs: List[Dict], threshold: float = 1.5, baseline_runs: int = 7,
+                     metrics: tuple = ('elapsed_s', 'requests', 'tracemalloc_peak_mb'),
+                     run_metrics: tuple = ('peak_rss_mb',)) -> List[Dict]:
+    """
+    Compara la última corrida con la mediana de las baseline_runs anteriores: metrics etapa
+    por etapa y run_metrics a nivel corrida (el pico RSS es del proceso, no de una etapa).
+    Reporta las métricas que superan threshold veces la mediana y además la superan
+    por al menos REGRESSION_MIN_DELTA.
+    """
+    if len(runs) < 2:
+        return []
+
+    latest, history = runs[-1], runs[-baseline_runs - 1:-1]
+    regressions = []
+    for stage in latest['stages']:
+        for metric in metrics:
+            previous = [s.get(metric) for run in history for s in run['stages']
+                        if s['stage'] == stage['stage'] and s.get(metric) is not None]
+            regression = _regression(stage['stage'], metric, stage.get(metric), previous, threshold)
+            if regression:
+                regressions.append(regression)
+    for metric in run_metrics:
+        previous = [run.get(metric) for run in history if run.get(metric) is not None]
+        regression = _regression('run', metric, latest.get(metric), previous, threshold)
+        if regression:
+            regressions.append(regression)
+    return regressions
+
+
+def report(metrics_dir: str = METRICS_DIR, run_name: Optional[str] = None, last: int = 10,
+           threshold: float = 1.5) -> int:
+    import pandas as pd
+
+    runs = load_runs(metrics_dir, run_name)
+    if not runs:
+        print(f"No hay archivos run_metrics_*.json en {metrics_dir}")
+        return 0
+    rows = [{'run': run['started_at'], 'stage': stage['stage'], 'elapsed_s': stage.get('elapsed_s'),
+             'rows': stage.get('rows'), 'requests': stage.get('requests'),
+             'tracemalloc_peak_mb': stage.get('tracemalloc_peak_mb'), 'status': stage.get('status')}
+            for run in runs[-last:] for stage in run['stages']]
+    table = pd.DataFrame(rows)
+    print("Duración por etapa (s):")
+    print(table.pivot_table(index='run', columns='stage', values='elapsed_s', aggfunc='sum').to_string())
+    print("\nRequests por etapa:")
+    print(table.pivot_table(index='run', columns='stage', values='requests', aggfunc='sum').to_string())
+
+    regressions = find_regressions(runs, threshold)
+    if regressions:
+        print(f"\nRegresiones en la última corrida (> {threshold}x la mediana):")
+        for r in regressions:
+            print(f"  - {r['stage']}.{r['metric']}: {r['value']} vs mediana {r['median']} ({r['ratio']}x)")
+        return 1
+    print("\nSin regresiones en la última corrida")
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Métricas de corridas batch")
+    sub = parser.add_subparsers(dest='command', required=True)
+    report_parser = sub.add_parser('report', help="Compara corridas y detecta regresiones")
+    report_parser.add_argument('--dir', default=METRICS_DIR)
+    report_parser.add_argument('--run-name', default=None)
+    report_parser.add_argument('--last', type=int, default=10)
+    report_parser.add_argument('--threshold', type=float, default=1.5)
+    args = parser.parse_args(argv)
+
+    if args.command == 'report':
+        return report(args.dir, args.run_name, args.last, args.threshold)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,194 @@
+# slate_bundle.py
+# Bundle del slate de una fecha para el dashboard: schedule, clima/estadio por juego,
+# stats de equipos y predicciones Over/Under, descargados en paralelo una sola vez
+# y guardados en cache por fecha. Las pestañas renderizan desde el bundle sin hacer
+# requests por juego.
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+import statsapi
+
+from data_manager.over_under_store import SOURCE_BREF, SOURCE_FEATURE_STORE
+from over_under_distribution import MAX_RUNS, TotalRunsDistribution, empty_distribution
+from mlb_stats_integration import (
+    ensure_venue_table,
+    get_slate_weather,
+    get_team_stats_bref,
+    get_weather_and_stadium,
+    serving_match_features
+)
+from team_feature_store import load_shared
+
+BUNDLE_TTL = 180  # 3 minutos; los marcadores en vivo se actualizan aparte (live_updates)
+DEFAULT_WORKERS = 8
+
+# fecha -> (timestamp, bundle)
+_bundles: Dict[str, tuple] = {}
+_bundle_locks: Dict[str, threading.Lock] = {}
+_locks_guard = threading.Lock()
+
+
+def _juego_record(juego: Dict) -> Dict:
+    return {
+        'game_id': juego['game_id'],
+        'desc': f"{juego['away_name']} @ {juego['home_name']} - {juego['game_datetime']} - {juego['status']}",
+        'home_name': juego['home_name'],
+        'away_name': juego['away_name'],
+        'home_id': juego.get('home_id'),
+        'away_id': juego.get('away_id'),
+        'venue_name': juego.get('venue_name', ''),
+        'status': juego['status'],
+        'game_datetime': juego['game_datetime'],
+        'home_score': juego.get('home_score'),
+        'away_score': juego.get('away_score')
+    }
+
+
+def _features_frame(juegos: List[Dict], weather: Dict, team_stats: Dict, fecha: str = None,
+                    feature_store=None) -> pd.DataFrame:
+    """
+    Una fila por juego con las features del modelo (stats de equipos + clima).
+    Con feature_store las stats de equipo salen de él (point-in-time a `fecha`), igual que
+    en el entrenamiento; si no, del snapshot de Baseball Reference de team_stats.
+    """
+    rows = []
+    for juego in juegos:
+        match = serving_match_features(juego, fecha, feature_store, team_stats)
+        clima = weather.get(juego['game_id'], {})
+        rows.append({
+            'game_id': juego['game_id'],
+            'home_team': juego['home_name'],
+            'away_team': juego['away_name'],
+            **match,
+            'temp_celsius': clima.get('temp_celsius', 20),
+            'wind_kph': clima.get('wind_kph', 0),
+            'is_dome': 1 if clima.get('is_dome') else 0
+        })
+    return pd.DataFrame(rows)
+
+
+def build_slate_bundle(fecha: str, max_workers: int = DEFAULT_WORKERS) -> Dict:
+    """
+    Descarga todo el slate de una fecha en paralelo y retorna el bundle:
+    juegos (lista), weather (game_id -> clima/estadio), team_stats (equipo -> stats),
+    features (DataFrame para el modelo), predictions (alineadas con juegos),
+    distribution (TotalRunsDistribution del total de carreras, misma alineación) y timings.
+    Un error en un juego o equipo no cancela el resto: ese dato queda con valores por defecto.
+    """
+    start = time.perf_counter()
+    timings = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        # Schedule, clima del slate y tabla de estadios al mismo tiempo
+        schedule_future = pool.submit(statsapi.schedule, date=fecha)
+        weather_future = pool.submit(get_slate_weather, fecha)
+        venues_future = pool.submit(ensure_venue_table)
+        juegos = [_juego_record(j) for j in schedule_future.result()]
+        weather_future.result()
+        venues_future.result()
+        timings['schedule_s'] = round(time.perf_counter() - start, 3)
+
+        # Clima/estadio por juego (desde el cache del slate) y stats de cada equipo
+        step = time.perf_counter()
+        weather_futures = {j['game_id']: pool.submit(get_weather_and_stadium, j['game_id']) for j in juegos}
+        teams = sorted({j[side] for j in juegos for side in ('home_name', 'away_name')})
+        stats_futures = {team: pool.submit(get_team_stats_bref, team) for team in teams}
+        weather = {game_id: future.result() for game_id, future in weather_futures.items()}
+        team_stats = {team: future.result() for team, future in stats_futures.items()}
+        timings['details_s'] = round(time.perf_counter() - step, 3)
+
+    step = time.perf_counter()
+    # Mismo origen de stats que el entrenamiento (retrain_daily usa el store si existe)
+    feature_store = load_shared()
+    features = _features_frame(juegos, weather, team_stats, fecha, feature_store)
+    predictions = []
+    pmf = empty_distribution(0, MAX_RUNS)
+    if not features.empty:
+        from prediction_service import get_client
+        # Una sola llamada para todo el slate; el clima ya viaja en las features.
+        # Sin p_over/p_under: el schedule de statsapi no trae la línea oficial (over_under).
+        # La pmf de cada juego queda en el bundle para las líneas alternativas del dashboard
+        predictions = get_client().predict_over_under(features, include_distribution=True)
+        rows = [p.pop('pmf', None) for p in predictions]
+        pmf = np.array([row if row is not None else [None] * (MAX_RUNS + 1) for row in rows], dtype=float)
+    distribution = TotalRunsDistribution([p['game_id'] for p in predictions], pmf)
+    timings['predict_s'] = round(time.perf_counter() - step, 3)
+    timings['total_s'] = round(time.perf_counter() - start, 3)
+
+    return {
+        'fecha': fecha,
+        'juegos': juegos,
+        'weather': weather,
+        'team_stats': team_stats,
+        'features': features,
+        'predictions': predictions,
+        'distribution': distribution,
+        'feature_source': SOURCE_FEATURE_STORE if feature_store is not None else SOURCE_BREF,
+        'timings': timings,
+        'created_at': time.time()
+    }
+
+
+def _lock_for(fecha: str) -> threading.Lock:
+    with _locks_guard:
+        return _bundle_locks.setdefault(fecha, threading.Lock())
+
+
+def get_slate_bundle(fecha: str, max_age: float = BUNDLE_TTL, force: bool = False) -> Dict:
+    """
+    Bundle del slate desde el cache por fecha; lo reconstruye si tiene más de max_age segundos.
+    Sesiones concurrentes del dashboard para la misma fecha esperan una sola descarga.
+    """
+    with _lock_for(fecha):
+        cached = _bundles.get(fecha)
+        if not force and cached and time.time() - cached[0] < max_age:
+            return cached[1]
+        try:
+            bundle = build_slate_bundle(fecha)
+        except Exception as e:
+            print(f"Error armando el slate de {fecha}: {e}")
+            if cached:
+                return cached[1]
+            raise
+        _bundles[fecha] = (time.time(), bundle)
+        return bundle
+
+
+def invalidate_slate_bundle(fecha: str = None):
+    """Descarta el bundle de una fecha (o todos si fecha es None)."""
+    with _locks_guard:
+        if fecha is None:
+            _bundles.clear()
+        else:
+            _bundles.pop(fecha, None)
+
+
+def bundle_to_payload(bundle: Dict) -> Dict:
+    """Versión JSON del bundle para guardarlo como snapshot (ver refresher.py)."""
+    payload = {k: v for k, v in bundle.items() if k not in ('features', 'weather', 'distribution')}
+    payload['features'] = bundle['features'].to_dict('records')
+    payload['weather'] = [dict(w, game_id=game_id) for game_id, w in bundle['weather'].items()]
+    distribution = bundle['distribution']
+    payload['distribution'] = {
+        'game_ids': distribution.game_ids,
+        'pmf': np.where(np.isnan(distribution.pmf), None, distribution.pmf).tolist()
+    }
+    return payload
+
+
+def bundle_from_payload(payload: Dict) -> Dict:
+    """Reconstruye un bundle desde un snapshot (inverso de bundle_to_payload)."""
+    bundle = dict(payload)
+    bundle['features'] = pd.DataFrame(payload['features'])
+    bundle['weather'] = {w['game_id']: w for w in payload['weather']}
+    # Snapshots anteriores a la distribución: el dashboard muestra el aviso en vez de la tabla
+    if payload.get('distribution'):
+        pmf = np.array(payload['distribution']['pmf'], dtype=float).reshape(-1, MAX_RUNS + 1)
+        bundle['distribution'] = TotalRunsDistribution(payload['distribution']['game_ids'], pmf)
+    else:
+        bundle['distribution'] = None
+    return bundle
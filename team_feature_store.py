@@ -0,0 +1,350 @@
+# team_feature_store.py
+# Feature store de equipos con agregados móviles point-in-time.
+# Cada boxscore finalizado se ingiere una sola vez y actualiza buffers circulares con
+# sumas acumuladas (últimos 7/15/30 juegos, total y splits home/away) en O(1).
+# Al cerrar cada fecha se guarda un snapshot [equipos x features], así las features
+# "a la fecha" de los 30 equipos salen de una sola búsqueda en el arreglo de snapshots,
+# sin filtrar datos futuros a juegos históricos.
+#
+# Uso:
+#     python team_feature_store.py --start 2025-03-27 --end 2025-06-30
+
+import argparse
+import bisect
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+import statsapi
+
+from boxscore_parser import innings_to_outs
+
+WINDOWS = (7, 15, 30)
+SPLITS = ('all', 'home', 'away')
+# Stats crudas por juego que se acumulan en los buffers
+RAW_STATS = ('runs_scored', 'runs_allowed', 'earned_runs', 'outs', 'hits_allowed', 'walks_allowed')
+# Features derivadas por (split, ventana)
+METRICS = ('runs_scored', 'runs_allowed', 'era', 'whip', 'games')
+FEATURE_NAMES = [f"{metric}_{window}_{split}" for split in SPLITS for window in WINDOWS for metric in METRICS]
+DEFAULT_PATH = os.path.join('data', 'team_feature_store.npz')
+BUFFER_SIZE = max(WINDOWS)
+
+_RS, _RA, _ER, _OUTS, _H, _BB = range(len(RAW_STATS))
+
+
+def team_line_from_boxscore(boxscore: Dict, side: str) -> Dict:
+    """Stats de equipo de un lado ('home'/'away') del boxscore crudo de la API."""
+    other = 'away' if side == 'home' else 'home'
+    team = boxscore['teams'][side]
+    batting = team['teamStats']['batting']
+    pitching = team['teamStats']['pitching']
+    outs = pitching.get('outs')
+    return {
+        'team_id': team['team']['id'],
+        'runs_scored': batting.get('runs', 0),
+        'runs_allowed': boxscore['teams'][other]['teamStats']['batting'].get('runs', 0),
+        'earned_runs': pitching.get('earnedRuns', 0),
+        'outs': int(outs) if outs is not None else innings_to_outs(pitching.get('inningsPitched')),
+        'hits_allowed': pitching.get('hits', 0),
+        'walks_allowed': pitching.get('baseOnBalls', 0)
+    }
+
+
+class TeamFeatureStore:
+    """
+    Agregados móviles por equipo mantenidos en forma incremental.
+    Los juegos deben ingerirse en orden de fecha; un juego de una fecha anterior a la
+    última ingerida lanza ValueError (rompería la garantía point-in-time).
+    """
+
+    def __init__(self, max_teams: int = 32):
+        self.team_index: Dict[int, int] = {}
+        self._buffers = np.zeros((max_teams, len(SPLITS), BUFFER_SIZE, len(RAW_STATS)))
+        self._sums = np.zeros((max_teams, len(SPLITS), len(WINDOWS), len(RAW_STATS)))
+        self._counts = np.zeros((max_teams, len(SPLITS)), dtype=np.int64)
+        self._positions = np.zeros((max_teams, len(SPLITS)), dtype=np.int64)
+        self._seen_games = set()
+        self._current_date: Optional[str] = None
+        self._dirty = False
+        # snapshot_dates[i] = fecha cerrada; _snapshots[i] = features con juegos <= esa fecha
+        self.snapshot_dates: List[str] = []
+        self._snapshots: List[np.ndarray] = []
+        self._snapshot_array: Optional[np.ndarray] = None
+        self._lock = threading.RLock()
+
+    # ---------------------
+    # Ingesta
+    # ---------------------
+
+    def _team_slot(self, team_id: int) -> int:
+        if team_id not in self.team_index:
+            if len(self.team_index) == self._buffers.shape[0]:
+                self._grow(self._buffers.shape[0] * 2)
+            self.team_index[team_id] = len(self.team_index)
+        return self.team_index[team_id]
+
+    def _grow(self, max_teams: int):
+        extra = max_teams - self._buffers.shape[0]
+        pad = lambda arr: np.concatenate([arr, np.zeros((extra,) + arr.shape[1:], dtype=arr.dtype)])
+        self._buffers, self._sums = pad(self._buffers), pad(self._sums)
+        self._counts, self._positions = pad(self._counts), pad(self._positions)
+        # En snapshots viejos los equipos nuevos no tienen historia: NaN, no ceros
+        self._snapshots = [np.concatenate([snapshot, np.full((extra, snapshot.shape[1]), np.nan)])
+                           for snapshot in self._snapshots]
+        self._snapshot_array = None
+
+    def _push(self, slot: int, split: int, values: np.ndarray):
+        """Agrega un juego a los buffers de (equipo, split) actualizando las sumas de cada ventana."""
+        pos = self._positions[slot, split]
+        count = self._counts[slot, split]
+        for w, window in enumerate(WINDOWS):
+            self._sums[slot, split, w] += values
+            if count >= window:
+                self._sums[slot, split, w] -= self._buffers[slot, split, (pos - window) % BUFFER_SIZE]
+        self._buffers[slot, split, pos] = values
+        self._positions[slot, split] = (pos + 1) % BUFFER_SIZE
+        self._counts[slot, split] = count + 1
+
+    def ingest_game(self, fecha: str, game_pk: int, home_line: Dict, away_line: Dict) -> bool:
+        """
+        Ingiere un juego finalizado (líneas de equipo de team_line_from_boxscore).
+        Retorna False si el juego ya estaba ingerido.
+        """
+        with self._lock:
+            if game_pk in self._seen_games:
+                return False
+            if self._current_date is not None and fecha < self._current_date:
+                raise ValueError(f"Juego {game_pk} del {fecha} llega después de juegos del "
+                                 f"{self._current_date}; la ingesta debe ser en orden de fecha")
+            if self._current_date is not None and fecha > self._current_date:
+                self._close_day()
+            self._current_date = fecha
+
+            for line, split in ((home_line, SPLITS.index('home')), (away_line, SPLITS.index('away'))):
+                slot = self._team_slot(line['team_id'])
+                values = np.array([line[stat] for stat in RAW_STATS], dtype=float)
+                self._push(slot, SPLITS.index('all'), values)
+                self._push(slot, split, values)
+            self._seen_games.add(game_pk)
+            self._dirty = True
+            return True
+
+    def ingest_boxscore(self, fecha: str, game_pk: int, boxscore: Dict) -> bool:
+        return self.ingest_game(fecha, game_pk, team_line_from_boxscore(boxscore, 'home'),
+                                team_line_from_boxscore(boxscore, 'away'))
+
+    def ingest_date(self, fecha: str, workers: int = 4) -> int:
+        """
+        Descarga e ingiere los juegos finalizados de temporada regular de una fecha.
+        Los boxscores se piden en paralelo, pero se ingieren en orden de gamePk.
+        """
+        juegos = [j for j in statsapi.schedule(date=fecha)
+                  if j.get('status') == 'Final' and j.get('game_type', 'R') == 'R'
+                  and j['game_id'] not in self._seen_games]
+        game_pks = sorted(j['game_id'] for j in juegos)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            boxscores = list(executor.map(lambda pk: statsapi.get('game_boxscore', {'gamePk': pk}), game_pks))
+        return sum(self.ingest_boxscore(fecha, pk, box) for pk, box in zip(game_pks, boxscores))
+
+    def update_to(self, end_date: str, start_date: str = None, workers: int = 4) -> int:
+        """Ingiere desde la última fecha ingerida (o start_date si el store está vacío) hasta end_date."""
+        start = self._current_date or start_date or end_date
+        return self.ingest_range(start, end_date, workers) if start <= end_date else 0
+
+    def ingest_range(self, start_date: str, end_date: str, workers: int = 4) -> int:
+        """Ingiere fecha por fecha (en orden) el rango indicado."""
+        current = datetime.strptime(start_date, '%Y-%m-%d')
+        end = datetime.strptime(end_date, '%Y-%m-%d')
+        total = 0
+        while current <= end:
+            fecha = current.strftime('%Y-%m-%d')
+            if self._current_date is None or fecha >= self._current_date:
+                total += self.ingest_date(fecha, workers)
+            current += timedelta(days=1)
+        return total
+
+    # ---------------------
+    # Snapshots y consultas
+    # ---------------------
+
+    def _compute_features(self) -> np.ndarray:
+        """Features actuales de todos los equipos: arreglo [equipos, len(FEATURE_NAMES)]."""
+        windows = np.array(WINDOWS)
+        games = np.minimum(self._counts[:, :, None], windows)  # [equipos, splits, ventanas]
+        sums = self._sums
+        with np.errstate(divide='ignore', invalid='ignore'):
+            per_game = np.where(games > 0, 1.0 / games, np.nan)
+            outs = np.where(sums[..., _OUTS] > 0, sums[..., _OUTS], np.nan)
+            metrics = np.stack([
+                sums[..., _RS] * per_game,
+                sums[..., _RA] * per_game,
+                27.0 * sums[..., _ER] / outs,
+                3.0 * (sums[..., _H] + sums[..., _BB]) / outs,
+                games.astype(float)
+            ], axis=-1)  # [equipos, splits, ventanas, métricas]
+        return metrics.reshape(metrics.shape[0], -1)
+
+    def _close_day(self):
+        if not self._dirty:
+            return
+        snapshot = self._compute_features()
+        if self.snapshot_dates and self.snapshot_dates[-1] == self._current_date:
+            self._snapshots[-1] = snapshot
+        else:
+            self.snapshot_dates.append(self._current_date)
+            self._snapshots.append(snapshot)
+        self._snapshot_array = None
+        self._dirty = False
+
+    @property
+    def snapshot_array(self) -> np.ndarray:
+        """Todos los snapshots como un solo arreglo [fechas, equipos, features]."""
+        with self._lock:
+            if self._snapshot_array is None:
+                n_teams = self._buffers.shape[0]
+                self._snapshot_array = (np.stack(self._snapshots) if self._snapshots
+                                        else np.empty((0, n_teams, len(FEATURE_NAMES))))
+            return self._snapshot_array
+
+    def features_as_of(self, fecha: str) -> np.ndarray:
+        """
+        Features de todos los equipos con los juegos anteriores a `fecha` (sin incluirla).
+        Retorna [equipos, features]; las filas se ubican con team_index. NaN si no hay historia.
+        """
+        with self._lock:
+            if self._dirty and self._current_date < fecha:
+                self._close_day()
+            snapshots = self.snapshot_array
+            idx = bisect.bisect_left(self.snapshot_dates, fecha) - 1
+            if idx < 0:
+                return np.full((snapshots.shape[1], len(FEATURE_NAMES)), np.nan)
+            return snapshots[idx]
+
+    def team_frame(self, fecha: str) -> pd.DataFrame:
+        """Features point-in-time de `fecha` como DataFrame indexado por team_id."""
+        features = self.features_as_of(fecha)
+        team_ids = sorted(self.team_index, key=self.team_index.get)
+        frame = pd.DataFrame(features[:len(team_ids)], index=team_ids, columns=FEATURE_NAMES)
+        frame.index.name = 'team_id'
+        return frame
+
+    def match_features(self, fecha: str, home_id: int, away_id: int, window: int = 15,
+                       defaults: Dict = None) -> Dict:
+        """
+        Features del modelo Over/Under para un juego, con la historia anterior a `fecha`.
+        Usa el split home para el local y away para el visitante; None si falta historia
+        (o el valor de defaults, ej. OverUnderModel.FEATURE_DEFAULTS).
+        """
+        features = self.features_as_of(fecha)
+
+        def value(team_id, metric, split):
+            slot = self.team_index.get(team_id)
+            if slot is None:
+                return None
+            result = features[slot, FEATURE_NAMES.index(f"{metric}_{window}_{split}")]
+            return None if np.isnan(result) else round(float(result), 3)
+
+        result = {
+            'home_avg_runs': value(home_id, 'runs_scored', 'home'),
+            'away_avg_runs': value(away_id, 'runs_scored', 'away'),
+            'home_era': value(home_id, 'era', 'home'),
+            'away_era': value(away_id, 'era', 'away'),
+            'home_whip': value(home_id, 'whip', 'home'),
+            'away_whip': value(away_id, 'whip', 'away')
+        }
+        if defaults:
+            result = {k: defaults[k] if v is None else v for k, v in result.items()}
+        return result
+
+    # ---------------------
+    # Persistencia
+    # ---------------------
+
+    def save(self, path: str = DEFAULT_PATH):
+        with self._lock:
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            team_ids = sorted(self.team_index, key=self.team_index.get)
+            np.savez_compressed(
+                path,
+                team_ids=np.array(team_ids, dtype=np.int64),
+                buffers=self._buffers, sums=self._sums,
+                counts=self._counts, positions=self._positions,
+                seen_games=np.array(sorted(self._seen_games), dtype=np.int64),
+                current_date=np.array(self._current_date or ''),
+                dirty=np.array(self._dirty),
+                snapshot_dates=np.array(self.snapshot_dates, dtype=str),
+                snapshots=self.snapshot_array
+            )
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_PATH) -> 'TeamFeatureStore':
+        store = cls()
+        with np.load(path) as data:
+            store.team_index = {int(t): i for i, t in enumerate(data['team_ids'])}
+            store._buffers, store._sums = data['buffers'], data['sums']
+            store._counts, store._positions = data['counts'], data['positions']
+            store._seen_games = set(int(pk) for pk in data['seen_games'])
+            store._current_date = str(data['current_date']) or None
+            store._dirty = bool(data['dirty'])
+            store.snapshot_dates = [str(d) for d in data['snapshot_dates']]
+            store._snapshots = list(data['snapshots'])
+        return store
+
+
+_shared: Dict[str, tuple] = {}
+_shared_lock = threading.Lock()
+
+
+def load_shared(path: str = DEFAULT_PATH) -> Optional[TeamFeatureStore]:
+    """
+    Store de solo lectura para servir predicciones, compartido en el proceso y recargado
+    cuando cambia el archivo (el re-entrenamiento diario lo actualiza). None si no existe.
+    """
+    if not os.path.exists(path):
+        return None
+    mtime = os.path.getmtime(path)
+    with _shared_lock:
+        cached = _shared.get(path)
+        if cached is None or cached[0] != mtime:
+            cached = (mtime, TeamFeatureStore.load(path))
+            _shared[path] = cached
+        return cached[1]
+
+
+def update_store_file(end_date: str, start_date: str = None, path: str = DEFAULT_PATH,
+                      workers: int = 4) -> Optional[TeamFeatureStore]:
+    """
+    Carga el store de `path`, ingiere lo que falte hasta end_date y lo guarda.
+    Retorna None si el archivo no existe: el store se construye una vez con este script
+    desde el inicio de temporada (ver Uso) y de ahí en más se actualiza solo.
+    """
+    if not os.path.exists(path):
+        return None
+    store = TeamFeatureStore.load(path)
+    ingested = store.update_to(end_date, start_date, workers)
+    if ingested:
+        store.save(path)
+    return store
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Construye el feature store de equipos")
+    parser.add_argument('--start', required=True, help="Fecha inicial YYYY-MM-DD")
+    parser.add_argument('--end', required=True, help="Fecha final YYYY-MM-DD")
+    parser.add_argument('--path', default=DEFAULT_PATH)
+    parser.add_argument('--workers', type=int, default=4)
+    args = parser.parse_args(argv)
+
+    store = TeamFeatureStore.load(args.path) if os.path.exists(args.path) else TeamFeatureStore()
+    ingested = store.ingest_range(args.start, args.end, args.workers)
+    store.save(args.path)
+    print(f"{ingested} juegos ingeridos; {len(store.snapshot_dates)} fechas en {args.path}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
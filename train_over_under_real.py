@@ -6,47 +6,31 @@ Script para entrenar el modelo Over/Under con datos reales de MLB.
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-from over_under_model import OverUnderModel, create_over_under_dataset
+from over_under_model import OverUnderModel
+from backfill_over_under import DEFAULT_WORKERS, run_backfill
+from data_manager.over_under_store import load_training_frame
+from team_feature_store import update_store_file
 import os
 
-def collect_historical_data(start_date: str, end_date: str) -> pd.DataFrame:
+def collect_historical_data(start_date: str, end_date: str, workers: int = DEFAULT_WORKERS) -> pd.DataFrame:
     """
     Recolecta datos históricos de Over/Under para entrenar el modelo.
+    Las fechas se descargan en paralelo y se guardan en el almacén SQLite con checkpoint,
+    así una ejecución interrumpida retoma donde quedó. El resultado se lee del almacén
+    en bloques a arreglos float32 compactos.
+    Si existe el TeamFeatureStore, las stats de equipo son point-in-time (igual que en
+    retrain_daily y en el slate del dashboard).
     """
     print(f"Recolectando datos desde {start_date} hasta {end_date}...")
-    
-    all_data = []
-    current_date = datetime.strptime(start_date, '%Y-%m-%d')
-    end_date = datetime.strptime(end_date, '%Y-%m-%d')
-    
-    while current_date <= end_date:
-        fecha_str = current_date.strftime('%Y-%m-%d')
-        print(f"Procesando fecha: {fecha_str}")
-        
-        try:
-            dataset = create_over_under_dataset(fecha_str)
-            if not dataset.empty:
-                # Solo incluir juegos finalizados con total_runs válido
-                dataset_clean = dataset.dropna(subset=['total_runs'])
-                if not dataset_clean.empty:
-                    all_data.append(dataset_clean)
-                    print(f"  - {len(dataset_clean)} juegos válidos encontrados")
-                else:
-                    print(f"  - No hay juegos finalizados válidos")
-            else:
-                print(f"  - No hay datos disponibles")
-        except Exception as e:
-            print(f"  - Error procesando {fecha_str}: {e}")
-        
-        current_date += timedelta(days=1)
-    
-    if all_data:
-        combined_data = pd.concat(all_data, ignore_index=True)
-        print(f"\nTotal de juegos recolectados: {len(combined_data)}")
-        return combined_data
-    else:
+    feature_store = update_store_file(end_date, start_date, workers=workers)
+    run_backfill(start_date, end_date, workers=workers, feature_store=feature_store)
+
+    combined_data = load_training_frame(OverUnderModel.FEATURE_COLUMNS, start_date, end_date)
+    if combined_data.empty:
         print("No se pudieron recolectar datos históricos")
         return pd.DataFrame()
+    print(f"\nTotal de juegos recolectados: {len(combined_data)}")
+    return combined_data
 
 def train_model_with_real_data():
     """
@@ -64,7 +48,7 @@ def train_model_with_real_data():
     if historical_data.empty:
         print("No hay datos suficientes para entrenar. Usando datos simulados...")
         model = OverUnderModel()
-        model._train_basic_model()
+        model._train_basic_model(save=True)
         return
     
     # Mostrar estadísticas de los datos
@@ -85,7 +69,7 @@ def train_model_with_real_data():
         print(f"Columnas faltantes: {missing_columns}")
         print("Usando datos simulados como fallback...")
         model = OverUnderModel()
-        model._train_basic_model()
+        model._train_basic_model(save=True)
         return
     
     # Entrenar el modelo
@@ -105,12 +89,12 @@ def train_model_with_real_data():
         else:
             print(f"❌ Error entrenando modelo: {result.get('error', 'Desconocido')}")
             print("Usando datos simulados como fallback...")
-            model._train_basic_model()
+            model._train_basic_model(save=True)
             
     except Exception as e:
         print(f"❌ Error durante el entrenamiento: {e}")
         print("Usando datos simulados como fallback...")
-        model._train_basic_model()
+        model._train_basic_model(save=True)
 
 if __name__ == "__main__":
     train_model_with_real_data() 
\ No newline at end of file
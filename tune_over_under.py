@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Búsqueda de hiperparámetros del modelo Over/Under con validación walk-forward.
+Los folds se arman por fecha (entrenar con el pasado, evaluar con las fechas siguientes),
+las matrices de cada fold se cachean en disco como .npz y cada combinación del grid
+se evalúa en un pool de procesos. El resultado es un leaderboard CSV con tiempo de
+ajuste, latencia de predicción, MAE y RMSE.
+
+Uso:
+    python tune_over_under.py --start 2025-04-01 --end 2025-06-30 --folds 4 --workers 4
+    python tune_over_under.py --start 2025-04-01 --end 2025-06-30 --persist
+"""
+
+import argparse
+import hashlib
+import itertools
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+from data_manager.db import DB_PATH
+from data_manager.over_under_store import SOURCE_FEATURE_STORE, get_feature_sources, load_training_frame
+
+PARAM_GRID = {
+    'n_estimators': [50, 100, 200],
+    'max_depth': [6, 10, None],
+    'min_samples_leaf': [1, 5],
+    'max_features': [1.0, 0.5]
+}
+CACHE_DIR = os.path.join('data', 'tuning_cache')
+DEFAULT_FOLDS = 4
+DEFAULT_WORKERS = 4
+
+
+def expand_grid(grid: Dict[str, List]) -> List[Dict]:
+    """Todas las combinaciones de un grid {param: [valores]}."""
+    keys = list(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*(grid[k] for k in keys))]
+
+
+def walk_forward_folds(dates: np.ndarray, n_folds: int = DEFAULT_FOLDS, min_train_frac: float = 0.5) -> List[Dict]:
+    """
+    Folds walk-forward por fecha: la primera fracción min_train_frac de las fechas es
+    el entrenamiento inicial y el resto se divide en n_folds bloques de test consecutivos.
+    Cada fold entrena con todas las fechas anteriores a su bloque (ventana expansiva).
+    """
+    unique_dates = np.unique(dates)
+    start = int(len(unique_dates) * min_train_frac)
+    if start < 1 or len(unique_dates) - start < n_folds:
+        raise ValueError(f"No hay suficientes fechas ({len(unique_dates)}) para {n_folds} folds")
+    blocks = np.array_split(unique_dates[start:], n_folds)
+    return [{'train_end': str(block[0]), 'test_start': str(block[0]), 'test_end': str(block[-1])}
+            for block in blocks]
+
+
+def cache_folds(frame: pd.DataFrame, feature_columns: List[str], folds: List[Dict],
+                cache_dir: str = CACHE_DIR) -> List[str]:
+    """
+    Guarda X/y de train y test de cada fold como .npz. La carpeta se identifica con un
+    hash de los datos y de los folds, así una re-ejecución con los mismos datos reutiliza el cache.
+    """
+    digest = hashlib.sha256()
+    digest.update(pd.util.hash_pandas_object(frame, index=False).to_numpy().tobytes())
+    digest.update(json.dumps([feature_columns, folds]).encode())
+    fold_dir = os.path.join(cache_dir, digest.hexdigest()[:16])
+    os.makedirs(fold_dir, exist_ok=True)
+
+    dates = frame['date'].to_numpy()
+    X = frame[feature_columns].to_numpy(dtype=np.float32)
+    y = frame['total_runs'].to_numpy(dtype=np.float32)
+    paths = []
+    for i, fold in enumerate(folds):
+        path = os.path.join(fold_dir, f"fold_{i}.npz")
+        if not os.path.exists(path):
+            train = dates < fold['train_end']
+            test = (dates >= fold['test_start']) & (dates <= fold['test_end'])
+            np.savez(path, X_train=X[train], y_train=y[train], X_test=X[test], y_test=y[test])
+        paths.append(path)
+    return paths
+
+
+def evaluate_params(params: Dict, fold_paths: List[str]) -> Dict:
+    """
+    Entrena y evalúa una combinación en todos los folds (se ejecuta en un proceso del pool).
+    Cada modelo usa un solo núcleo para no competir con los demás procesos.
+    """
+    from sklearn.ensemble import RandomForestRegressor
+
+    fit_s, latency_ms, maes, rmses = [], [], [], []
+    for path in fold_paths:
+        with np.load(path) as fold:
+            X_train, y_train = fold['X_train'], fold['y_train']
+            X_test, y_test = fold['X_test'], fold['y_test']
+        model = RandomForestRegressor(random_state=42, n_jobs=1, **params)
+        start = time.perf_counter()
+        model.fit(X_train, y_train)
+        fit_s.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        y_pred = model.predict(X_test)
+        latency_ms.append((time.perf_counter() - start) * 1000 / max(len(X_test), 1))
+        errors = y_pred - y_test
+        maes.append(float(np.mean(np.abs(errors))))
+        rmses.append(float(np.sqrt(np.mean(errors ** 2))))
+
+    return {
+        'params': json.dumps(params),
+        'mae': round(float(np.mean(maes)), 4),
+        'mae_std': round(float(np.std(maes)), 4),
+        'rmse': round(float(np.mean(rmses)), 4),
+        'fit_s': round(float(np.mean(fit_s)), 4),
+        'predict_ms_per_game': round(float(np.mean(latency_ms)), 5),
+        'folds': len(fold_paths)
+    }
+
+
+def run_tuning(frame: pd.DataFrame, feature_columns: List[str], grid: Dict[str, List] = None,
+               n_folds: int = DEFAULT_FOLDS, workers: int = DEFAULT_WORKERS,
+               cache_dir: str = CACHE_DIR) -> pd.DataFrame:
+    """Ejecuta la búsqueda y retorna el leaderboard ordenado por MAE."""
+    folds = walk_forward_folds(frame['date'].to_numpy(), n_folds)
+    fold_paths = cache_folds(frame, feature_columns, folds, cache_dir)
+    candidates = expand_grid(grid or PARAM_GRID)
+    print(f"{len(candidates)} combinaciones x {len(folds)} folds en {workers} procesos")
+
+    rows = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(evaluate_params, params, fold_paths): params for params in candidates}
+        for future in as_completed(futures):
+            try:
+                rows.append(future.result())
+            except Exception as e:
+                print(f"  - Error evaluando {futures[future]}: {e}")
+    leaderboard = pd.DataFrame(rows)
+    if not leaderboard.empty:
+        leaderboard = leaderboard.sort_values(['mae', 'fit_s']).reset_index(drop=True)
+    return leaderboard
+
+
+def persist_best(frame: pd.DataFrame, leaderboard: pd.DataFrame) -> Dict:
+    """Entrena la mejor combinación con todos los datos y la registra como nueva versión."""
+    from sklearn.ensemble import RandomForestRegressor
+    from over_under_model import OverUnderModel
+
+    best = leaderboard.iloc[0]
+    params = json.loads(best['params'])
+    model = OverUnderModel()
+    # Los parámetros ganadores reemplazan a los de la versión cargada del registro
+    model.model_params = dict(OverUnderModel.DEFAULT_PARAMS, **params)
+    model.model = RandomForestRegressor(**model.model_params)
+    model.model.fit(frame[model.feature_columns].to_numpy(dtype=np.float32),
+                    frame['total_runs'].to_numpy(dtype=np.float32))
+    model.is_trained = True
+    model.save_model({
+        'training_window': [str(frame['date'].min()), str(frame['date'].max())],
+        'n_rows': int(len(frame)),
+        'metrics': {'cv_mae': float(best['mae']), 'cv_rmse': float(best['rmse']),
+                    'cv_folds': int(best['folds'])},
+        'tuning': {'fit_s': float(best['fit_s']), 'predict_ms_per_game': float(best['predict_ms_per_game'])}
+    })
+    return {'version': model.version, 'params': params}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Tuning walk-forward del modelo Over/Under")
+    parser.add_argument('--start', default=None, help="Fecha inicial YYYY-MM-DD (por defecto, todo el almacén)")
+    parser.add_argument('--end', default=None, help="Fecha final YYYY-MM-DD")
+    parser.add_argument('--folds', type=int, default=DEFAULT_FOLDS)
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS)
+    parser.add_argument('--grid', default=None, help="JSON con el grid, p. ej. '{\"max_depth\": [8, 12]}'")
+    parser.add_argument('--db', default=DB_PATH, help="Ruta de la base SQLite")
+    parser.add_argument('--cache-dir', default=CACHE_DIR)
+    parser.add_argument('--output', default=None, help="Ruta del leaderboard CSV")
+    parser.add_argument('--persist', action='store_true', help="Registrar la mejor configuración")
+    args = parser.parse_args(argv)
+
+    from over_under_model import OverUnderModel
+    feature_columns = OverUnderModel.FEATURE_COLUMNS
+    frame = load_training_frame(feature_columns, args.start, args.end, db_path=args.db)
+    if frame.empty:
+        print("No hay juegos en el almacén para ese rango; ejecuta backfill_over_under.py primero")
+        return 1
+    sources = get_feature_sources(args.start, args.end, db_path=args.db)
+    if set(sources) - {SOURCE_FEATURE_STORE}:
+        # El modelo servido usa stats point-in-time cuando existe el TeamFeatureStore
+        print(f"Aviso: fechas por origen de stats {sources}; para tunear sin fuga re-procesa el rango con "
+              f"backfill_over_under.py --feature-store data/team_feature_store.npz")
+
+    grid = json.loads(args.grid) if args.grid else PARAM_GRID
+    start = time.perf_counter()
+    leaderboard = run_tuning(frame, feature_columns, grid, args.folds, args.workers, args.cache_dir)
+    if leaderboard.empty:
+        print("Ninguna combinación terminó correctamente")
+        return 1
+
+    output = args.output or os.path.join('data', f"tuning_leaderboard_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv")
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    leaderboard.to_csv(output, index=False)
+    print(f"\nLeaderboard ({len(frame)} juegos, {time.perf_counter() - start:.1f}s) guardado en {output}")
+    print(leaderboard.head(10).to_string(index=False))
+
+    if args.persist:
+        result = persist_best(frame, leaderboard)
+        print(f"\nMejor configuración registrada como versión {result['version']}: {result['params']}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())